@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: mide la petición completa (latencia, BD, Server-Timing)
+    'weather.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -157,3 +159,99 @@ CITY_PHOTO_BASE_URL = config(
     "CITY_PHOTO_BASE_URL",
     default="https://cdn.example.com/cities/",
 )
+
+# Caché de modelos Prophet entrenados (uno por ciudad).
+# PROPHET_MODEL_MAX_AGE: segundos durante los que se reutiliza un modelo aunque
+# hayan llegado observaciones nuevas (0 = reentrenar en cuanto cambian los datos).
+PROPHET_MODEL_CACHE_DIR = config(
+    "PROPHET_MODEL_CACHE_DIR",
+    default=str(BASE_DIR / "prophet_models"),
+)
+
+PROPHET_MODEL_MAX_AGE = config("PROPHET_MODEL_MAX_AGE", default=0, cast=int)
+
+# Tablas de orto/ocaso precalculadas por ciudad (comando build_solar_ephemeris).
+# Sin tabla para el año o la ciudad se calcula al vuelo.
+SOLAR_EPHEMERIS_DIR = config(
+    "SOLAR_EPHEMERIS_DIR",
+    default=str(BASE_DIR / "solar_ephemeris"),
+)
+
+# Horizonte (en horas) que guarda el job refresh_forecasts en ForecastPoint
+FORECAST_PRECOMPUTED_PERIODS = config("FORECAST_PRECOMPUTED_PERIODS", default=72, cast=int)
+
+# Antigüedad máxima (en horas) de una predicción precalculada; más vieja se calcula en vivo
+FORECAST_PRECOMPUTED_MAX_AGE_HOURS = config("FORECAST_PRECOMPUTED_MAX_AGE_HOURS", default=6, cast=int)
+
+# Procesos del pool de build_forecasts_batch (0 = número de CPUs)
+FORECAST_BATCH_WORKERS = config("FORECAST_BATCH_WORKERS", default=0, cast=int)
+
+# Hilos para entrenar a la vez las variables de una predicción multivariable (0 = número de CPUs)
+FORECAST_VARIABLE_WORKERS = config("FORECAST_VARIABLE_WORKERS", default=0, cast=int)
+
+# Hilos que entrenan/predicen para las vistas asíncronas (api/async/...)
+FORECAST_ASYNC_WORKERS = config("FORECAST_ASYNC_WORKERS", default=4, cast=int)
+
+# Tamaño de lote para bulk_create / bulk_update de observaciones
+OBSERVATION_BULK_CHUNK_SIZE = config("OBSERVATION_BULK_CHUNK_SIZE", default=1000, cast=int)
+
+# Máximo de filas aceptadas por petición en /api/weather/observations/bulk/
+OBSERVATION_BULK_MAX_ROWS = config("OBSERVATION_BULK_MAX_ROWS", default=50000, cast=int)
+
+# Retención (comando apply_retention): días de observaciones en bruto que se
+# conservan; lo anterior queda solo en los agregados y, con --archive, en
+# ficheros Parquet por mes dentro de OBSERVATION_ARCHIVE_DIR.
+OBSERVATION_RETENTION_DAYS = config("OBSERVATION_RETENTION_DAYS", default=365, cast=int)
+OBSERVATION_ARCHIVE_DIR = config(
+    "OBSERVATION_ARCHIVE_DIR",
+    default=str(BASE_DIR / "observation_archive"),
+)
+
+# Caché de respuestas de clima actual / condiciones.
+# Memoria local por defecto; con REDIS_URL se usa Redis (requiere el paquete redis).
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "atmos-weather",
+        }
+    }
+
+WEATHER_CACHE_ALIAS = "default"
+WEATHER_CACHE_TIMEOUT = config("WEATHER_CACHE_TIMEOUT", default=300, cast=int)
+
+# Ventana de entrenamiento de las predicciones: últimos N días desde la última
+# observación (0 = todo el histórico), remuestreados a FORECAST_TRAINING_FREQ
+# ("" = sin remuestrear)
+FORECAST_TRAINING_WINDOW_DAYS = config("FORECAST_TRAINING_WINDOW_DAYS", default=90, cast=int)
+FORECAST_TRAINING_FREQ = config("FORECAST_TRAINING_FREQ", default="H")
+
+# Token opcional para /api/metrics/ (vacío = abierto, p.ej. si solo se expone en la red interna)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Distancia máxima (km) para resolver ?lat=&lon= a la ciudad más cercana (0 = sin límite)
+NEAREST_CITY_MAX_DISTANCE_KM = config("NEAREST_CITY_MAX_DISTANCE_KM", default=0, cast=float)
+
+# Interpolación espacial (IDW) entre ciudades: vecinos, exponente de la distancia,
+# gradiente térmico (ºC/m) para la corrección por altitud y segundos que se
+# reutiliza la foto en memoria de las últimas observaciones
+INTERPOLATION_NEIGHBOURS = config("INTERPOLATION_NEIGHBOURS", default=8, cast=int)
+INTERPOLATION_POWER = config("INTERPOLATION_POWER", default=2.0, cast=float)
+INTERPOLATION_LAPSE_RATE = config("INTERPOLATION_LAPSE_RATE", default=0.0065, cast=float)
+INTERPOLATION_SNAPSHOT_TTL = config("INTERPOLATION_SNAPSHOT_TTL", default=60, cast=int)
+
+# Actualizaciones en directo por SSE (/api/weather/stream/): broker entre procesos
+# ("weather.live.RedisBroker" con varios workers ASGI, usa REDIS_URL), segundos
+# entre comentarios keepalive y eventos pendientes por cliente lento
+LIVE_UPDATES_BROKER = config("LIVE_UPDATES_BROKER", default="weather.live.LocalBroker")
+LIVE_UPDATES_HEARTBEAT = config("LIVE_UPDATES_HEARTBEAT", default=15, cast=int)
+LIVE_UPDATES_QUEUE_SIZE = config("LIVE_UPDATES_QUEUE_SIZE", default=16, cast=int)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WeatherObservation, City
+from .models import WeatherObservation, City, ForecastPoint, ObservationRollup, PhotoCatalogEntry, RetentionRun
 
 # Register your models here.
 @admin.register(City)
@@ -27,4 +27,31 @@ class WeatherObservationAdmin(admin.ModelAdmin):
         'wind_chill',
         'dew_point',
         'heat_index'
-    ]
\ No newline at end of file
+    ]
+
+
+@admin.register(ForecastPoint)
+class ForecastPointAdmin(admin.ModelAdmin):
+    # Columnas visibles
+    list_display = ['city', 'ts', 'yhat', 'yhat_lower', 'yhat_upper', 'model_version', 'generated_at']
+    list_filter = ['city']
+
+
+@admin.register(ObservationRollup)
+class ObservationRollupAdmin(admin.ModelAdmin):
+    # Columnas visibles
+    list_display = ['city', 'resolution', 'bucket_start', 'count', 'temperature_min', 'temperature_max', 'precipitation_sum']
+    list_filter = ['resolution', 'city']
+
+
+@admin.register(PhotoCatalogEntry)
+class PhotoCatalogEntryAdmin(admin.ModelAdmin):
+    # Columnas visibles
+    list_display = ['code', 'kind', 'city', 'city_name', 'condition', 'daylight', 'temperature_band', 'priority', 'active']
+    list_filter = ['kind', 'active', 'condition']
+
+
+@admin.register(RetentionRun)
+class RetentionRunAdmin(admin.ModelAdmin):
+    # Columnas visibles
+    list_display = ['started_at', 'cutoff', 'purged_before', 'observations_deleted', 'observations_archived', 'finished_at']
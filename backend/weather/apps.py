@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class WeatherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'weather'
+
+    def ready(self):
+        # Registrar receptores de señales (invalidación de cachés)
+        from . import signals  # noqa: F401
+
+        # Contar consultas y tiempo de BD por petición (ver weather.metrics)
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from .metrics import install_db_wrapper
+
+        connection_created.connect(install_db_wrapper, dispatch_uid="weather-metrics-db")
+        for connection in connections.all(initialized_only=True):
+            install_db_wrapper(connection)
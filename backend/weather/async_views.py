@@ -0,0 +1,261 @@
+# backend/weather/async_views.py
+#
+# Variantes asíncronas (ASGI) de los endpoints de clima actual, condiciones y
+# predicción. Leen con el ORM asíncrono de Django y mandan el entrenamiento de
+# los modelos a un ThreadPoolExecutor propio, de modo que un proceso ASGI puede
+# tener muchas predicciones lentas en vuelo sin bloquear las peticiones baratas.
+#
+# Devuelven los mismos cuerpos que las vistas síncronas y comparten con ellas
+# la caché de respuestas.
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from . import live
+from .model_cache import DEFAULT_VARIABLE
+from .models import City, WeatherObservation
+from .prophet_service import (
+    aget_precomputed_forecast,
+    aplan_multi_variable_forecast,
+    run_forecast_plan,
+)
+from .response_cache import acached_response, city_scope
+from .serializers import CurrentWeatherSerializer
+from .views import (
+    conditions_city_id,
+    conditions_payload,
+    conditions_scopes,
+    current_weather_data,
+    nearest_city_id,
+    parse_coordinates,
+    parse_forecast_params,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def forecast_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos para entrenar/predecir. Va aparte del executor por defecto del
+    bucle para que las predicciones lentas no dejen sin hilos a sync_to_async.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "FORECAST_ASYNC_WORKERS", 4),
+                thread_name_prefix="forecast",
+            )
+        return _executor
+
+
+def _bad_request(detail: str) -> JsonResponse:
+    return JsonResponse({"detail": detail}, status=400)
+
+
+class AsyncCurrentWeatherView(View):
+    """
+    GET /api/async/weather/current/?city_id=1
+    GET /api/async/weather/current/?lat=40.42&lon=-3.70
+
+    Igual que CurrentWeatherView (una sola ciudad) pero sin ocupar un hilo
+    mientras espera a la caché o a la base de datos.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        coordinates, error = parse_coordinates(request.GET)
+        if error:
+            return _bad_request(error)
+        if coordinates is not None:
+            # Solo consulta la BD si hay que reconstruir el índice
+            city_id = await sync_to_async(nearest_city_id)(*coordinates)
+            if city_id is None:
+                return JsonResponse({"detail": "No hay ninguna ciudad cerca de esas coordenadas"}, status=404)
+        else:
+            city_id = request.GET.get("city_id")
+
+        if city_id is None:
+            return _bad_request("city_id (o lat y lon) es obligatorio")
+        try:
+            city_id = int(city_id)
+        except ValueError:
+            return _bad_request("city_id debe ser un entero")
+
+        return await acached_response(
+            request,
+            "current",
+            [city_scope(city_id)],
+            build=lambda: self.build_payload(city_id),
+        )
+
+    async def build_payload(self, city_id):
+        city = await City.objects.select_related("latest_observation").filter(id=city_id).afirst()
+        if city is None:
+            return JsonResponse({"detail": "Ciudad no encontrada"}, status=404)
+
+        # Sin puntero se busca la última observación (la vista síncrona lo repara)
+        latest_observation = city.latest_observation or await (
+            WeatherObservation.objects.filter(city_id=city_id).order_by("-timestamp").afirst()
+        )
+        if latest_observation is None:
+            return JsonResponse(
+                {
+                    "detail": f"No hay datos meteorológicos para la ciudad '{city.name}'",
+                    "city_id": city_id,
+                    "city_name": city.name,
+                },
+                status=404,
+            )
+
+        serializer = CurrentWeatherSerializer(current_weather_data(city, latest_observation))
+        return dict(serializer.data), latest_observation.updated_at.timestamp()
+
+
+class AsyncCurrentConditionsView(View):
+    """GET /api/async/weather/conditions/?city_id=1&city_name=Madrid"""
+
+    async def get(self, request, *args, **kwargs):
+        city_name = request.GET.get("city_name")
+        city_id, scopes = conditions_scopes(request.GET.get("city_id"), city_name)
+
+        return await acached_response(
+            request,
+            "conditions",
+            scopes,
+            build=lambda: self.build_payload(city_id, city_name),
+            key_parts=(city_id, city_name),
+        )
+
+    async def build_payload(self, city_id, city_name):
+        # El índice de nombres puede necesitar (re)construirse desde la BD
+        resolved_id = await sync_to_async(conditions_city_id)(city_id, city_name)
+        city = (
+            await City.objects.select_related("latest_observation").filter(id=resolved_id).afirst()
+            if resolved_id is not None else None
+        )
+        if city is None:
+            return JsonResponse({"detail": "Ciudad no encontrada"}, status=404)
+
+        latest_observation = city.latest_observation or await (
+            WeatherObservation.objects.filter(city_id=city.id).order_by("-timestamp").afirst()
+        )
+        if latest_observation is None:
+            return JsonResponse(
+                {
+                    "detail": f"No hay datos meteorológicos para la ciudad '{city.name}'",
+                    "city_id": city.id,
+                    "city_name": city.name,
+                },
+                status=404,
+            )
+        # conditions_data puede tener que (re)cargar el catálogo de fotos desde la BD
+        return await sync_to_async(conditions_payload)(city, latest_observation)
+
+
+class AsyncForecastView(View):
+    """
+    GET /api/async/forecast/?city_id=1&periods=24&engine=prophet&variables=temperature,humidity
+
+    Mismos parámetros y respuesta que ProphetForecastView. Las lecturas usan el
+    ORM asíncrono y el entrenamiento corre en forecast_executor().
+    """
+
+    async def get(self, request, *args, **kwargs):
+        params, error = parse_forecast_params(request.GET)
+        if error is not None:
+            return _bad_request(error)
+
+        variables = params.variables or [DEFAULT_VARIABLE]
+        series = await self.forecast_series(params.city_id, params.periods, params.engine, variables)
+
+        data = {"city_id": params.city_id, "periods": params.periods, "engine": params.engine}
+        if params.variables is None:
+            data.update(series[DEFAULT_VARIABLE])
+        else:
+            data["series"] = series
+        return JsonResponse(data)
+
+    @staticmethod
+    async def forecast_series(city_id, periods, engine, variables):
+        series = {}
+        live_variables = list(variables)
+        # refresh_forecasts solo precalcula la temperatura
+        if engine == "prophet" and "temperature" in live_variables:
+            points = await aget_precomputed_forecast(city_id=city_id, periods=periods)
+            if points is not None:
+                series["temperature"] = {"source": "precomputed", "points": points}
+                live_variables.remove("temperature")
+
+        if live_variables:
+            plan = await aplan_multi_variable_forecast(city_id, live_variables, engine)
+            loop = asyncio.get_running_loop()
+            # copy_context: el hilo sigue sumando al Server-Timing de esta petición
+            forecasts = await loop.run_in_executor(
+                forecast_executor(),
+                partial(contextvars.copy_context().run, run_forecast_plan, plan, periods),
+            )
+            for variable, points in forecasts.items():
+                series[variable] = {"source": "live", "points": points}
+
+        # Mismo orden que en la petición
+        return {variable: series[variable] for variable in variables}
+
+
+class CityStreamView(View):
+    """
+    GET /api/weather/stream/?city_id=1
+
+    Server-Sent Events: envía al conectar el clima actual de la ciudad (evento
+    "current", mismo cuerpo que /api/weather/current/) y uno nuevo cada vez que
+    llega una observación más reciente. Comentarios periódicos mantienen viva
+    la conexión a través de proxies. Pensado para servirse por ASGI: cada cliente
+    es una corrutina dormida, no un hilo.
+
+        const source = new EventSource("/api/weather/stream/?city_id=1");
+        source.addEventListener("current", (e) => render(JSON.parse(e.data)));
+    """
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            city_id = int(request.GET.get("city_id", ""))
+        except ValueError:
+            return _bad_request("city_id es obligatorio y debe ser un entero")
+
+        if not await City.objects.filter(id=city_id).aexists():
+            return JsonResponse({"detail": "Ciudad no encontrada"}, status=404)
+
+        response = StreamingHttpResponse(self.events(city_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Que nginx no acumule los eventos en su búfer
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    async def events(city_id):
+        live.get_broker().start()
+        # Suscribirse antes de leer el estado inicial para no perder nada entre
+        # medias (en el peor caso la misma observación llega dos veces)
+        subscription = live.hub.subscribe(city_id)
+        heartbeat = getattr(settings, "LIVE_UPDATES_HEARTBEAT", 15)
+        try:
+            yield "retry: 5000\n\n"
+            city = await City.objects.select_related("latest_observation").filter(id=city_id).afirst()
+            if city is not None and city.latest_observation is not None:
+                yield await sync_to_async(live.current_event)(city, city.latest_observation)
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            live.hub.unsubscribe(subscription)
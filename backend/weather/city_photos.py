@@ -3,22 +3,11 @@
 from dataclasses import dataclass
 from typing import Optional
 
-CITY_ID_TO_PHOTO_CODE = {
-    1: "barcelona_skyline_01.jpg",
-    2: "madrid_skyline_01.jpg",
-    3: "paris_skyline_01.jpg",
-    4: "london_skyline_01.jpg",
-}
+from .emblem_photos import temperature_band
+from .photo_catalog import get_photo_catalog
 
-CITY_NAME_TO_PHOTO_CODE = {
-    "barcelona": "barcelona_skyline_01.jpg",
-    "madrid": "madrid_skyline_01.jpg",
-    "paris": "paris_skyline_01.jpg",
-    "london": "london_skyline_01.jpg",
-}
 
-
-@dataclass
+@dataclass(frozen=True)
 class CityPhoto:
     """
     Representa la foto de la ciudad elegida para el dashboard.
@@ -30,25 +19,19 @@ class CityPhoto:
 def select_city_photo(
     city_id: Optional[int] = None,
     city_name: Optional[str] = None,
+    condition: Optional[str] = None,
+    temp_c: Optional[float] = None,
+    is_daytime: bool = True,
+    variant: int = 0,
 ) -> CityPhoto:
     """
     Devuelve la foto de ciudad adecuada según city_id o city_name.
-    - Si encuentra match por ID, usa ese.
-    - Si no, prueba por nombre (case-insensitive).
-    - Si no encuentra nada, devuelve una foto genérica por defecto.
+    - Si el catálogo tiene fotos para ese ID, usa esas.
+    - Si no, prueba por nombre (sin distinguir mayúsculas ni tildes).
+    - Si no encuentra nada, devuelve la foto genérica.
+    condition / temp_c / is_daytime permiten fotos distintas según el tiempo.
     """
-    # 1) Intentar por ID
-    if city_id is not None:
-        code = CITY_ID_TO_PHOTO_CODE.get(city_id)
-        if code:
-            return CityPhoto(code=code)
-
-    # 2) Intentar por nombre
-    if city_name:
-        key = city_name.lower().strip()
-        code = CITY_NAME_TO_PHOTO_CODE.get(key)
-        if code:
-            return CityPhoto(code=code)
-
-    # 3) Fallback genérico
-    return CityPhoto(code="default_city_01.jpg")
+    condition = (condition or "").lower().strip() or "*"
+    band = temperature_band(temp_c) if temp_c is not None else "mild"
+    code = get_photo_catalog().city(city_id, city_name, condition, bool(is_daytime), band, variant)
+    return CityPhoto(code=code)
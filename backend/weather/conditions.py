@@ -0,0 +1,64 @@
+# backend/weather/conditions.py
+#
+# Condición del cielo a partir de una observación y URLs de las fotos del
+# dashboard. Son funciones puras y baratas; las que dependen solo de un
+# puñado de valores distintos (fotos, URLs) se memorizan por proceso.
+
+from functools import lru_cache
+from typing import Optional
+
+# Umbrales (mm/h, km/h, km, %)
+HEAVY_PRECIPITATION = 7.5
+STORM_GUST = 60.0
+DRIZZLE_MAX = 0.5
+FOG_VISIBILITY = 1.0
+OVERCAST_CLOUD_COVER = 85.0
+CLOUDY_CLOUD_COVER = 40.0
+
+
+def derive_condition(
+    temperature: float,
+    precipitation: Optional[float] = None,
+    cloud_cover: Optional[float] = None,
+    visibility: Optional[float] = None,
+    wind_gust: Optional[float] = None,
+) -> str:
+    """
+    Código de condición ("clear", "clouds", "overcast", "fog", "drizzle",
+    "rain", "sleet", "snow", "storm") con el vocabulario de select_emblem_photo.
+    Los campos que falten no descartan nada: sin nubosidad se asume despejado.
+    """
+    precipitation = precipitation or 0.0
+    if precipitation > 0:
+        if precipitation >= HEAVY_PRECIPITATION and (wind_gust or 0) >= STORM_GUST:
+            return "storm"
+        if temperature <= 0:
+            return "snow"
+        if temperature <= 2:
+            return "sleet"
+        return "drizzle" if precipitation < DRIZZLE_MAX else "rain"
+
+    # visibility tiene 0 por defecto en el modelo: 0 es "sin medir", no niebla cerrada
+    if visibility and visibility < FOG_VISIBILITY:
+        return "fog"
+    if cloud_cover is not None:
+        if cloud_cover >= OVERCAST_CLOUD_COVER:
+            return "overcast"
+        if cloud_cover >= CLOUDY_CLOUD_COVER:
+            return "clouds"
+    return "clear"
+
+
+def observation_condition(observation) -> str:
+    return derive_condition(
+        observation.temperature,
+        precipitation=observation.precipitation,
+        cloud_cover=observation.cloud_cover,
+        visibility=observation.visibility,
+        wind_gust=observation.wind_gust,
+    )
+
+
+@lru_cache(maxsize=4096)
+def photo_url(base_url: str, code: str) -> str:
+    return base_url.rstrip("/") + "/" + code
@@ -0,0 +1,93 @@
+# backend/weather/derived_fields.py
+#
+# Versiones vectorizadas (NumPy) de los cálculos de WeatherObservation:
+# wind_chill_calculator, heat_index_calculator y dew_point_calculator.
+# Operan sobre arrays completos y devuelven NaN donde el método original devuelve None.
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+DERIVED_FIELDS = ("wind_chill", "dew_point", "heat_index")
+
+
+def heat_index_array(temperature, humidity) -> np.ndarray:
+    """Índice de calor (Steadman); NaN si T < 27 ºC o humedad <= 0."""
+    T = np.asarray(temperature, dtype=float)
+    H = np.asarray(humidity, dtype=float)
+
+    hi = -8.78469475556 + 1.61139411 * T + 2.33854883889 * H
+    hi += -0.14611605 * T * H + -0.012308094 * (T ** 2)
+    hi += -0.0164248277778 * (H ** 2) + 0.002211732 * (T ** 2) * H
+    hi += 0.00072546 * T * (H ** 2) + -0.000003582 * (T ** 2) * (H ** 2)
+
+    return np.where((T >= 27) & (H > 0), np.round(hi, 2), np.nan)
+
+
+def dew_point_array(temperature, humidity) -> np.ndarray:
+    """Punto de rocío (Magnus-Tetens); NaN si humedad <= 0."""
+    T = np.asarray(temperature, dtype=float)
+    H = np.asarray(humidity, dtype=float)
+
+    a = 17.27
+    b = 237.7
+
+    valid = H > 0
+    # Evitar log(0) en las posiciones que luego se descartan
+    safe_h = np.where(valid, H, 100.0)
+    alpha = ((a * T) / (b + T)) + np.log(safe_h / 100.0)
+    dew_point = (b * alpha) / (a - alpha)
+
+    return np.where(valid, np.round(dew_point, 2), np.nan)
+
+
+def wind_chill_array(temperature, humidity, wind_speed) -> np.ndarray:
+    """
+    Sensación térmica: wind chill con frío y viento, índice de calor con calor,
+    y la propia temperatura en el resto de casos.
+    """
+    T = np.asarray(temperature, dtype=float)
+    W = np.asarray(wind_speed, dtype=float)
+
+    wind_pow = np.power(np.maximum(W, 0.0), 0.16)
+    wc = np.round(13.12 + 0.6215 * T - 11.37 * wind_pow + 0.3965 * T * wind_pow, 2)
+
+    hi = heat_index_array(T, humidity)
+    # Sin índice de calor aplicable (humedad <= 0) se queda la temperatura
+    hot = np.where(np.isnan(hi), T, hi)
+
+    return np.where((T <= 10) & (W > 4.8), wc, np.where(T >= 27, hot, T))
+
+
+def compute_derived_fields(temperature, humidity, wind_speed) -> Dict[str, np.ndarray]:
+    """Calcula los tres campos derivados de golpe para arrays del mismo tamaño."""
+    return {
+        "wind_chill": wind_chill_array(temperature, humidity, wind_speed),
+        "dew_point": dew_point_array(temperature, humidity),
+        "heat_index": heat_index_array(temperature, humidity),
+    }
+
+
+def _to_optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def apply_derived_fields(observations: Iterable) -> List:
+    """
+    Rellena wind_chill, dew_point y heat_index en una lista de WeatherObservation
+    (sin guardarlas), con un único cálculo vectorizado. Devuelve la lista.
+    """
+    observations = list(observations)
+    if not observations:
+        return observations
+
+    derived = compute_derived_fields(
+        [obs.temperature for obs in observations],
+        [obs.humidity for obs in observations],
+        [obs.wind_speed for obs in observations],
+    )
+    columns = [derived[name].tolist() for name in DERIVED_FIELDS]
+    for obs, values in zip(observations, zip(*columns)):
+        for name, value in zip(DERIVED_FIELDS, values):
+            setattr(obs, name, _to_optional(value))
+    return observations
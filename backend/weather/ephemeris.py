@@ -0,0 +1,197 @@
+# backend/weather/ephemeris.py
+#
+# Tabla precalculada de orto/ocaso/mediodía solar por ciudad y día.
+#
+# El comando build_solar_ephemeris calcula un año entero para todas las
+# ciudades de una vez (solar.sun_times vectorizado) y lo guarda en
+# SOLAR_EPHEMERIS_DIR/ephemeris_<año>.npz: minutos UTC en int16 (unos 4 bytes
+# por ciudad y día con el indicador polar). En una petición, consultar una
+# ciudad es un acceso a dict + índice de array, sin trigonometría.
+#
+# Si la ciudad no está en la tabla (creada después) o sus coordenadas han
+# cambiado desde que se generó, se calcula al vuelo con solar.py.
+
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from . import solar
+from .models import City
+
+
+def _ephemeris_dir() -> Optional[Path]:
+    path = getattr(settings, "SOLAR_EPHEMERIS_DIR", None)
+    return Path(path) if path else None
+
+
+def ephemeris_path(year: int) -> Optional[Path]:
+    directory = _ephemeris_dir()
+    return directory / f"ephemeris_{year}.npz" if directory else None
+
+
+@dataclass
+class EphemerisTable:
+    """
+    Un año de efemérides: arrays (ciudades, días) alineados con city_ids.
+    Los minutos de días polares no tienen significado (ver polar).
+    """
+    year: int
+    city_ids: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    sunrise: np.ndarray
+    sunset: np.ndarray
+    solar_noon: np.ndarray
+    polar: np.ndarray
+    mtime: float = 0.0
+
+    def __post_init__(self):
+        self._rows: Dict[int, int] = {int(city_id): row for row, city_id in enumerate(self.city_ids.tolist())}
+
+    def row(self, city_id: int, latitude: float, longitude: float) -> Optional[int]:
+        """Fila de la ciudad, o None si no está o se generó con otras coordenadas."""
+        row = self._rows.get(city_id)
+        if row is None:
+            return None
+        if abs(self.latitudes[row] - latitude) > 1e-6 or abs(self.longitudes[row] - longitude) > 1e-6:
+            return None
+        return row
+
+
+def compute_table(
+    year: int,
+    city_ids: Sequence[int],
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+) -> EphemerisTable:
+    days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    times = solar.sun_times(latitudes[:, None], longitudes[:, None], solar.day_of_year(days)[None, :])
+
+    def minutes(values):
+        return np.rint(np.nan_to_num(values, nan=0.0)).astype(np.int16)
+
+    return EphemerisTable(
+        year=year,
+        city_ids=np.asarray(city_ids, dtype=np.int64),
+        latitudes=latitudes,
+        longitudes=longitudes,
+        sunrise=minutes(times.sunrise),
+        sunset=minutes(times.sunset),
+        solar_noon=minutes(times.solar_noon),
+        polar=times.polar.astype(np.int8),
+    )
+
+
+def build_ephemeris(year: int) -> Tuple[Path, EphemerisTable]:
+    """Calcula el año para todas las ciudades y lo guarda (escritura atómica)."""
+    path = ephemeris_path(year)
+    if path is None:
+        raise ValueError("SOLAR_EPHEMERIS_DIR no está configurado")
+
+    rows = list(City.objects.order_by("id").values_list("id", "latitud", "longitud"))
+    table = compute_table(year, [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+    np.savez_compressed(
+        tmp_path,
+        city_ids=table.city_ids,
+        latitudes=table.latitudes,
+        longitudes=table.longitudes,
+        sunrise=table.sunrise,
+        sunset=table.sunset,
+        solar_noon=table.solar_noon,
+        polar=table.polar,
+    )
+    os.replace(tmp_path, path)
+    _tables.pop(year, None)
+    return path, table
+
+
+_tables: Dict[int, Optional[EphemerisTable]] = {}
+_lock = threading.Lock()
+
+
+def load_table(year: int) -> Optional[EphemerisTable]:
+    """Tabla del año, cargada una vez por proceso y recargada si el fichero cambia."""
+    path = ephemeris_path(year)
+    try:
+        mtime = path.stat().st_mtime if path else None
+    except OSError:
+        mtime = None
+
+    table = _tables.get(year)
+    if table is not None and table.mtime == mtime:
+        return table
+    if mtime is None:
+        return None
+
+    with _lock:
+        table = _tables.get(year)
+        if table is None or table.mtime != mtime:
+            try:
+                with np.load(path) as data:
+                    table = EphemerisTable(year=year, mtime=mtime, **{name: data[name] for name in data.files})
+            except (OSError, ValueError, KeyError, TypeError):
+                # Fichero corrupto o de otra versión: se calcula al vuelo
+                return None
+            _tables[year] = table
+        return table
+
+
+def sun_times_for(city: City, day: date) -> Tuple[Optional[float], Optional[float], Optional[float], int]:
+    """(orto, ocaso, mediodía, polar) en minutos UTC del día, de la tabla o calculados."""
+    table = load_table(day.year)
+    row = table.row(city.id, city.latitud, city.longitud) if table is not None else None
+    if row is not None:
+        column = day.timetuple().tm_yday - 1
+        polar = int(table.polar[row, column])
+        if polar:
+            return None, None, None, polar
+        return (
+            float(table.sunrise[row, column]),
+            float(table.sunset[row, column]),
+            float(table.solar_noon[row, column]),
+            0,
+        )
+
+    times = solar.sun_times(city.latitud, city.longitud, day.timetuple().tm_yday)
+    polar = int(times.polar)
+    if polar:
+        return None, None, None, polar
+    return float(times.sunrise), float(times.sunset), float(times.solar_noon), 0
+
+
+def is_daytime(city: City, when: datetime) -> bool:
+    when = when.astimezone(dt_timezone.utc)
+    sunrise, sunset, _, polar = sun_times_for(city, when.date())
+    if polar:
+        return polar > 0
+    minutes = when.hour * 60 + when.minute + when.second / 60
+    return bool(solar.daytime_mask(sunrise, sunset, 0, minutes))
+
+
+def sun_events(city: City, when: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    (último, siguiente) orto u ocaso alrededor de `when`: el intervalo en el que
+    is_daytime no cambia. None si no lo hay en los días vecinos (día o noche polar).
+    """
+    when = when.astimezone(dt_timezone.utc)
+    events = []
+    for offset in (-1, 0, 1):
+        day = when.date() + timedelta(days=offset)
+        sunrise, sunset, _, polar = sun_times_for(city, day)
+        if not polar:
+            # Minutos sin normalizar: pueden caer en el día UTC anterior o siguiente
+            events.extend(solar.minutes_to_datetime(day, minutes) for minutes in (sunrise, sunset))
+    previous = max((event for event in events if event <= when), default=None)
+    following = min((event for event in events if event > when), default=None)
+    return previous, following
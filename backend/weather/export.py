@@ -0,0 +1,190 @@
+# backend/weather/export.py
+#
+# Exportación de observaciones con memoria constante: se leen con
+# values_list().iterator(chunk_size) y se emiten en streaming (CSV, NDJSON,
+# Parquet), o por páginas con cursor por clave (timestamp, id) en JSON.
+
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from django.db.models import Q
+
+from .models import WeatherObservation
+
+EXPORT_FIELDS = [
+    "id",
+    "city_id",
+    "timestamp",
+    "temperature",
+    "max_temperature",
+    "min_temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "wind_direction",
+    "wind_gust",
+    "precipitation",
+    "visibility",
+    "cloud_cover",
+    "wind_chill",
+    "dew_point",
+    "heat_index",
+]
+
+# Posición del timestamp en cada fila (se serializa a ISO 8601)
+_TIMESTAMP_INDEX = EXPORT_FIELDS.index("timestamp")
+
+
+def _ordered(qs):
+    # Orden total y estable: timestamp + id como desempate
+    return qs.order_by("timestamp", "id")
+
+
+def iter_rows(qs, chunk_size: int) -> Iterator[tuple]:
+    """Filas como tuplas, leídas de la BD en bloques de `chunk_size`."""
+    return _ordered(qs).values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _row_dict(row: tuple) -> dict:
+    data = dict(zip(EXPORT_FIELDS, row))
+    data["timestamp"] = data["timestamp"].isoformat()
+    return data
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(qs, chunk_size: int) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_rows(qs, chunk_size):
+        row = list(row)
+        row[_TIMESTAMP_INDEX] = row[_TIMESTAMP_INDEX].isoformat()
+        yield writer.writerow(row)
+
+
+def ndjson_stream(qs, chunk_size: int) -> Iterator[str]:
+    for row in iter_rows(qs, chunk_size):
+        yield json.dumps(_row_dict(row)) + "\n"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino de escritura que acumula bytes hasta que el generador los recoge."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_stream(qs, chunk_size: int) -> Iterator[bytes]:
+    """
+    Parquet en streaming: cada bloque de `chunk_size` filas es un row group que se
+    emite en cuanto se escribe. Requiere pyarrow (dependencia opcional).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("city_id", pa.int64()),
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+        ]
+        + [(name, pa.float64()) for name in EXPORT_FIELDS[3:]]
+    )
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        batch: List[tuple] = []
+        for row in iter_rows(qs, chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                writer.write_table(_parquet_table(pa, schema, batch))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(_parquet_table(pa, schema, batch))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _parquet_table(pa, schema, rows: List[tuple]):
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def encode_cursor(timestamp: datetime, obs_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), obs_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Devuelve (timestamp, id) o None si el cursor no es válido."""
+    try:
+        timestamp, obs_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(obs_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(qs, after: Optional[Tuple[datetime, int]], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """
+    Una página de observaciones posteriores a `after` = (timestamp, id).
+    Usa WHERE por clave en lugar de OFFSET: el coste no crece con la página.
+    """
+    if after is not None:
+        timestamp, obs_id = after
+        qs = qs.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=obs_id))
+
+    rows = list(_ordered(qs).values_list(*EXPORT_FIELDS)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[_TIMESTAMP_INDEX], last[0])
+    return [_row_dict(row) for row in rows], next_cursor
+
+
+def export_queryset(city_id=None, date_from=None, date_to=None):
+    qs = WeatherObservation.objects.all()
+    if city_id is not None:
+        qs = qs.filter(city_id=city_id)
+    if date_from is not None:
+        qs = qs.filter(timestamp__gte=date_from)
+    if date_to is not None:
+        qs = qs.filter(timestamp__lte=date_to)
+    return qs
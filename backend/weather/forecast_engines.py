@@ -0,0 +1,213 @@
+# backend/weather/forecast_engines.py
+#
+# Motores de predicción intercambiables. Todos reciben una serie (ds, y) y
+# devuelven puntos con la misma forma que build_prophet_forecast:
+# {"ts", "yhat", "yhat_lower", "yhat_upper"}, con las marcas de tiempo sobre la
+# rejilla regular de `freq` que sigue al último tramo con datos.
+
+import abc
+import itertools
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Paso de cada frecuencia admitida
+FREQ_STEPS = {
+    "H": np.timedelta64(1, "h"),
+    "h": np.timedelta64(1, "h"),
+    "D": np.timedelta64(1, "D"),
+    "min": np.timedelta64(1, "m"),
+}
+
+# Longitud de la estacionalidad por frecuencia: ciclo diario en datos horarios,
+# semanal en datos diarios
+SEASON_LENGTHS = {
+    "H": 24,
+    "h": 24,
+    "D": 7,
+    "min": 60 * 24,
+}
+
+# z para un intervalo del 80 % (el mismo interval_width por defecto que Prophet)
+Z_80 = 1.2816
+
+
+def freq_step(freq: str) -> np.timedelta64:
+    try:
+        return FREQ_STEPS[freq]
+    except KeyError:
+        raise ValueError(f"Frecuencia no soportada: {freq}")
+
+
+def floor_to_step(ts: np.datetime64, step: np.timedelta64) -> np.datetime64:
+    """Redondea `ts` hacia abajo al múltiplo de `step` (horas en punto, medianoche...)."""
+    ts = np.datetime64(ts, "ns")
+    return ts - (ts - np.datetime64(0, "ns")) % step
+
+
+def regularize(
+    ds: np.ndarray,
+    y: np.ndarray,
+    freq: str,
+    fill_gaps: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lleva la serie a una rejilla regular de paso `freq` alineada al reloj: media
+    por tramo y huecos rellenados con el último valor conocido. Con
+    fill_gaps=False los tramos sin datos se descartan en vez de rellenarse.
+    """
+    step = freq_step(freq)
+    ds = np.asarray(ds, dtype="datetime64[ns]")
+    y = np.asarray(y, dtype=float)
+
+    start = floor_to_step(ds.min(), step)
+    slots = ((ds - start) // step).astype(np.int64)
+    size = int(slots.max()) + 1
+
+    sums = np.bincount(slots, weights=y, minlength=size)
+    counts = np.bincount(slots, minlength=size)
+    values = np.full(size, np.nan)
+    filled = counts > 0
+    values[filled] = sums[filled] / counts[filled]
+    grid = start + np.arange(size) * step
+
+    if not fill_gaps:
+        return grid[filled], values[filled]
+
+    # Forward fill vectorizado: índice del último tramo con datos
+    last_filled = np.where(filled, np.arange(size), 0)
+    np.maximum.accumulate(last_filled, out=last_filled)
+    return grid, values[last_filled]
+
+
+def _points(start: np.datetime64, step: np.timedelta64, yhat, lower, upper) -> List[Dict]:
+    timestamps = (start + np.arange(1, len(yhat) + 1) * step).astype("datetime64[us]")
+    return [
+        {
+            # Mismo formato ISO que los puntos de Prophet
+            "ts": ts.item().isoformat(),
+            "yhat": float(mean),
+            "yhat_lower": float(lo),
+            "yhat_upper": float(hi),
+        }
+        for ts, mean, lo, hi in zip(timestamps, yhat, lower, upper)
+    ]
+
+
+class ForecastEngine(abc.ABC):
+    """Interfaz común de los motores."""
+    name = ""
+
+    @abc.abstractmethod
+    def forecast(self, ds: np.ndarray, y: np.ndarray, periods: int, freq: str = "H") -> List[Dict]:
+        """Entrena con la serie (ds, y) y predice `periods` pasos de `freq` tras el último tramo."""
+
+
+class ProphetEngine(ForecastEngine):
+    """Prophet completo: el más preciso con historiales largos, pero tarda segundos."""
+    name = "prophet"
+
+    def forecast(self, ds, y, periods, freq="H"):
+        import pandas as pd
+
+        from .forecast_worker import fit_prophet, predict_points
+
+        # Misma rejilla que el entrenamiento de prophet_service: el horizonte de
+        # make_future_dataframe arranca en el último tramo, no en la hora cruda
+        ds, y = regularize(ds, y, freq, fill_gaps=False)
+        df = pd.DataFrame({"ds": pd.to_datetime(ds), "y": y})
+        return predict_points(fit_prophet(df), periods, freq)
+
+
+class HoltWintersEngine(ForecastEngine):
+    """
+    Holt-Winters aditivo en NumPy (nivel + tendencia amortiguada + estacionalidad).
+    Los parámetros se eligen por rejilla minimizando el error a un paso, evaluando
+    todas las combinaciones a la vez sobre arrays. Con menos de dos ciclos de datos
+    se desactiva la estacionalidad, y con menos de tres puntos se repite el último valor.
+    """
+    name = "holt_winters"
+
+    ALPHAS = (0.1, 0.3, 0.5, 0.8)
+    BETAS = (0.01, 0.1, 0.3)
+    GAMMAS = (0.05, 0.2, 0.4)
+    PHI = 0.98  # amortiguación de la tendencia
+
+    def forecast(self, ds, y, periods, freq="H"):
+        grid, values = regularize(ds, y, freq)
+        step = freq_step(freq)
+        # Anclado a la rejilla, igual que Prophet (no a la última hora cruda)
+        last_ts = grid[-1]
+
+        if len(values) < 3:
+            yhat = np.full(periods, values[-1])
+            spread = np.std(values) if len(values) > 1 else 0.0
+            return _points(last_ts, step, yhat, yhat - Z_80 * spread, yhat + Z_80 * spread)
+
+        season = SEASON_LENGTHS.get(freq, 0)
+        if len(values) < 2 * season:
+            season = 0
+
+        yhat, sigma = self._fit_predict(values, periods, season)
+        horizon = np.arange(1, periods + 1)
+        spread = Z_80 * sigma * np.sqrt(horizon)
+        return _points(last_ts, step, yhat, yhat - spread, yhat + spread)
+
+    def _fit_predict(self, values: np.ndarray, periods: int, season: int) -> Tuple[np.ndarray, float]:
+        gammas = self.GAMMAS if season else (0.0,)
+        params = np.array(list(itertools.product(self.ALPHAS, self.BETAS, gammas)))
+        alpha, beta, gamma = params[:, 0], params[:, 1], params[:, 2]
+        k = len(params)
+        phi = self.PHI
+
+        # Estado inicial común a todas las combinaciones
+        if season:
+            first, second = values[:season], values[season:2 * season]
+            level = np.full(k, first.mean())
+            trend = np.full(k, (second.mean() - first.mean()) / season)
+            seasonal = np.tile(first - first.mean(), (k, 1))
+            start = season
+        else:
+            level = np.full(k, values[0])
+            trend = np.full(k, values[1] - values[0])
+            seasonal = np.zeros((k, 1))
+            start = 1
+
+        sse = np.zeros(k)
+        residuals = np.zeros((k, len(values) - start))
+        for t in range(start, len(values)):
+            s_idx = t % season if season else 0
+            s_prev = seasonal[:, s_idx]
+            prediction = level + phi * trend + s_prev
+            error = values[t] - prediction
+            residuals[:, t - start] = error
+            sse += error * error
+
+            new_level = alpha * (values[t] - s_prev) + (1 - alpha) * (level + phi * trend)
+            trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            level = new_level
+            if season:
+                seasonal[:, s_idx] = gamma * (values[t] - level) + (1 - gamma) * s_prev
+
+        best = int(np.argmin(sse))
+        horizon = np.arange(1, periods + 1)
+        damped = np.cumsum(phi ** horizon)
+        yhat = level[best] + damped * trend[best]
+        if season:
+            yhat = yhat + seasonal[best, (len(values) + horizon - 1) % season]
+
+        sigma = float(np.std(residuals[best])) if residuals.shape[1] else 0.0
+        return yhat, sigma
+
+
+ENGINES: Dict[str, ForecastEngine] = {
+    engine.name: engine
+    for engine in (ProphetEngine(), HoltWintersEngine())
+}
+
+
+def get_engine(name: str) -> ForecastEngine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Motor desconocido: {name}. Opciones: {', '.join(sorted(ENGINES))}")
@@ -0,0 +1,81 @@
+# backend/weather/forecast_worker.py
+#
+# Funciones de entrenamiento/predicción sin dependencias de Django.
+# Se ejecutan dentro de los procesos del pool de build_forecasts_batch,
+# así que no deben tocar la base de datos ni importar modelos.
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+
+def fit_prophet(df: pd.DataFrame) -> Prophet:
+    """Entrena un Prophet sobre un DataFrame con columnas ds / y."""
+    model = Prophet()
+    model.fit(df)
+    return model
+
+
+def predict_points(model: Prophet, periods: int, freq: str) -> List[Dict]:
+    """Predice solo el horizonte futuro y lo devuelve como lista de puntos."""
+    future = model.make_future_dataframe(periods=periods, freq=freq, include_history=False)
+    forecast = model.predict(future)
+
+    result = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+    return [
+        {
+            "ts": row["ds"].isoformat(),
+            "yhat": float(row["yhat"]),
+            "yhat_lower": float(row["yhat_lower"]),
+            "yhat_upper": float(row["yhat_upper"]),
+        }
+        for _, row in result.iterrows()
+    ]
+
+
+@dataclass
+class ForecastJobResult:
+    """
+    Resultado de predecir una ciudad en un worker.
+    - model_json: modelo recién entrenado serializado (None si se reutilizó uno cacheado)
+    - error: mensaje si la ciudad falló; el resto del lote sigue adelante
+    """
+    city_id: int
+    points: List[Dict] = field(default_factory=list)
+    model_json: Optional[str] = None
+    fit_seconds: float = 0.0
+    total_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def fit_predict_job(
+    city_id: int,
+    periods: int,
+    freq: str,
+    df: Optional[pd.DataFrame] = None,
+    cached_model_json: Optional[str] = None,
+) -> ForecastJobResult:
+    """
+    Trabajo de un worker: reutiliza `cached_model_json` si llega, o entrena con `df`,
+    y predice `periods` pasos.
+    """
+    started = time.perf_counter()
+    result = ForecastJobResult(city_id=city_id)
+    try:
+        if cached_model_json is not None:
+            model = model_from_json(cached_model_json)
+        else:
+            fit_started = time.perf_counter()
+            model = fit_prophet(df)
+            result.fit_seconds = time.perf_counter() - fit_started
+            result.model_json = model_to_json(model)
+        result.points = predict_points(model, periods, freq)
+    except Exception as exc:  # noqa: BLE001 - un fallo no debe tumbar el lote
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.total_seconds = time.perf_counter() - started
+    return result
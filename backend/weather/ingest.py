@@ -0,0 +1,199 @@
+# backend/weather/ingest.py
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .derived_fields import apply_derived_fields
+from .live import publish_latest_observations
+from .models import City, WeatherObservation
+from .response_cache import invalidate_city_on_commit
+from .rollups import add_to_rollups
+
+# Campos numéricos opcionales aceptados por la ingesta en bloque: nombre -> (mínimo, máximo)
+OPTIONAL_FLOAT_FIELDS = {
+    "max_temperature": (None, None),
+    "min_temperature": (None, None),
+    "humidity": (0, 100),
+    "pressure": (0, None),
+    "wind_speed": (0, None),
+    "wind_direction": (0, 360),
+    "wind_gust": (0, None),
+    "precipitation": (0, None),
+    "visibility": (0, None),
+    "cloud_cover": (0, 100),
+}
+
+
+class InvalidRow:
+    """Marca una fila que ni siquiera se pudo decodificar (p.ej. una línea NDJSON rota)."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def bulk_chunk_size(chunk_size: Optional[int] = None) -> int:
+    if chunk_size is None:
+        chunk_size = getattr(settings, "OBSERVATION_BULK_CHUNK_SIZE", 1000)
+    return max(1, chunk_size)
+
+
+def bulk_create_observations(
+    observations: Iterable[WeatherObservation],
+    chunk_size: Optional[int] = None,
+    rollups: bool = True,
+) -> List[WeatherObservation]:
+    """
+    Inserta observaciones en bloque con los campos derivados ya calculados.
+
+    bulk_create no llama a save(), así que wind_chill, dew_point y heat_index
+    se calculan aquí de forma vectorizada antes de insertar, y también se
+    actualizan aquí el puntero de última observación y los agregados
+    (rollups=False los omite para cargas masivas seguidas de rebuild_rollups)
+    y se publican las actualizaciones en directo (live.py).
+    """
+    observations = apply_derived_fields(observations)
+    created = WeatherObservation.objects.bulk_create(
+        observations,
+        batch_size=bulk_chunk_size(chunk_size),
+    )
+    update_latest_observations(created)
+    if rollups:
+        add_to_rollups(created)
+    publish_latest_observations(created)
+
+    # bulk_create no emite post_save: invalidar aquí las respuestas cacheadas
+    # (al confirmar la transacción del llamante)
+    city_ids = {obs.city_id for obs in created}
+    for city_id, name in City.objects.filter(id__in=city_ids).values_list("id", "name"):
+        invalidate_city_on_commit(city_id, name)
+    return created
+
+
+def update_latest_observations(observations: Iterable[WeatherObservation]) -> None:
+    """
+    Avanza City.latest_observation con la observación más reciente de cada ciudad
+    del lote: una UPDATE por ciudad, no por fila.
+    """
+    newest: Dict[int, WeatherObservation] = {}
+    for obs in observations:
+        current = newest.get(obs.city_id)
+        if current is None or obs.timestamp >= current.timestamp:
+            newest[obs.city_id] = obs
+
+    for city_id, obs in newest.items():
+        if obs.pk is None:
+            # El backend no devolvió ids en bulk_create: recalcular por consulta
+            City(pk=city_id).refresh_latest_observation()
+        else:
+            City.advance_latest_observation(city_id, obs)
+
+
+def _parse_float(value, name: str, errors: Dict[str, str], minimum=None, maximum=None) -> Optional[float]:
+    # bool es subclase de int: no lo aceptamos como número
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        errors[name] = "Debe ser un número"
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        errors[name] = "Debe ser un número"
+        return None
+    if number != number or number in (float("inf"), float("-inf")):
+        errors[name] = "Debe ser un número finito"
+        return None
+    if minimum is not None and number < minimum:
+        errors[name] = f"Debe ser >= {minimum}"
+        return None
+    if maximum is not None and number > maximum:
+        errors[name] = f"Debe ser <= {maximum}"
+        return None
+    return number
+
+
+def _parse_timestamp(value, errors: Dict[str, str]) -> Optional[datetime]:
+    if value is None:
+        return timezone.now()
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        # Bien formada pero inexistente (p.ej. 30 de febrero)
+        errors["timestamp"] = "Fecha u hora inexistente"
+        return None
+    if parsed is None:
+        errors["timestamp"] = "Debe ser una fecha ISO 8601"
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def validate_observation_row(row, known_city_ids) -> Tuple[Optional[dict], Dict[str, str]]:
+    """
+    Valida una fila de la ingesta en bloque sin pasar por un ModelSerializer.
+    Devuelve (kwargs para WeatherObservation, errores por campo).
+    """
+    if isinstance(row, InvalidRow):
+        return None, {"non_field_errors": row.message}
+    if not isinstance(row, dict):
+        return None, {"non_field_errors": "Se esperaba un objeto JSON"}
+
+    errors: Dict[str, str] = {}
+    data = {}
+
+    city_id = row.get("city_id", row.get("city"))
+    if city_id is None:
+        errors["city_id"] = "Campo obligatorio"
+    elif isinstance(city_id, bool) or not isinstance(city_id, int):
+        errors["city_id"] = "Debe ser un entero"
+    elif city_id not in known_city_ids:
+        errors["city_id"] = f"La ciudad {city_id} no existe"
+    else:
+        data["city_id"] = city_id
+
+    if row.get("temperature") is None:
+        errors["temperature"] = "Campo obligatorio"
+    else:
+        data["temperature"] = _parse_float(row["temperature"], "temperature", errors)
+
+    for name, (minimum, maximum) in OPTIONAL_FLOAT_FIELDS.items():
+        if row.get(name) is not None:
+            data[name] = _parse_float(row[name], name, errors, minimum, maximum)
+
+    data["timestamp"] = _parse_timestamp(row.get("timestamp"), errors)
+
+    if errors:
+        return None, errors
+    return data, errors
+
+
+def ingest_observation_rows(rows: List, chunk_size: Optional[int] = None) -> Tuple[int, List[dict]]:
+    """
+    Valida e inserta una lista de filas crudas (dicts) en una sola transacción.
+    Las filas inválidas no abortan el lote: se devuelven como errores por índice.
+    Devuelve (número de observaciones creadas, errores).
+    """
+    # Una sola consulta para comprobar todas las ciudades referenciadas
+    referenced_ids = {
+        city_id
+        for city_id in (row.get("city_id", row.get("city")) for row in rows if isinstance(row, dict))
+        if isinstance(city_id, int) and not isinstance(city_id, bool)
+    }
+    known_city_ids = set(City.objects.filter(id__in=referenced_ids).values_list("id", flat=True))
+
+    observations = []
+    errors = []
+    for index, row in enumerate(rows):
+        data, row_errors = validate_observation_row(row, known_city_ids)
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+        else:
+            observations.append(WeatherObservation(**data))
+
+    with transaction.atomic():
+        created = bulk_create_observations(observations, chunk_size=chunk_size)
+    return len(created), errors
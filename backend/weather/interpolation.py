@@ -0,0 +1,195 @@
+# backend/weather/interpolation.py
+#
+# Interpolación espacial del tiempo actual entre ciudades: ponderación por
+# inverso de la distancia (IDW) sobre las k ciudades más cercanas, con
+# corrección opcional de la temperatura por altitud (gradiente térmico).
+#
+# Trabaja sobre una "foto" en memoria de la última observación de cada ciudad
+# (una consulta, renovada como mucho cada INTERPOLATION_SNAPSHOT_TTL segundos o
+# al cambiar las ciudades) y calcula todos los puntos pedidos a la vez con
+# NumPy, así que una rejilla de miles de celdas cuesta una sola petición.
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import City
+from .spatial import EARTH_RADIUS_KM, cities_version, to_unit_vectors
+
+INTERPOLATION_VARIABLES = ("temperature", "humidity", "pressure", "wind_speed", "precipitation", "cloud_cover")
+
+# Tamaño máximo (consultas x ciudades) de la matriz de distancias por bloque
+_MAX_BLOCK_ELEMENTS = 2_000_000
+
+
+@dataclass
+class LatestSnapshot:
+    """Última observación de cada ciudad, en arrays alineados por ciudad."""
+    city_ids: np.ndarray
+    points: np.ndarray          # (n, 3) vectores unitarios
+    altitudes: np.ndarray       # NaN si la ciudad no tiene altitud
+    values: Dict[str, np.ndarray]  # NaN si la observación no trae el campo
+    built_at: datetime
+    version: object = None
+
+    def __len__(self):
+        return len(self.city_ids)
+
+
+def _column(rows, position) -> np.ndarray:
+    return np.array([np.nan if row[position] is None else row[position] for row in rows], dtype=float)
+
+
+def build_snapshot() -> LatestSnapshot:
+    rows = list(
+        City.objects
+        .filter(latest_observation__isnull=False)
+        .order_by("id")
+        .values_list(
+            "id", "latitud", "longitud", "altitud",
+            *(f"latest_observation__{variable}" for variable in INTERPOLATION_VARIABLES),
+        )
+    )
+    return LatestSnapshot(
+        city_ids=np.array([row[0] for row in rows], dtype=np.int64),
+        points=to_unit_vectors(_column(rows, 1), _column(rows, 2)).reshape(-1, 3),
+        altitudes=_column(rows, 3),
+        values={variable: _column(rows, 4 + i) for i, variable in enumerate(INTERPOLATION_VARIABLES)},
+        built_at=timezone.now(),
+    )
+
+
+_snapshot: Optional[LatestSnapshot] = None
+_snapshot_monotonic = 0.0
+_lock = threading.Lock()
+
+
+def get_snapshot() -> LatestSnapshot:
+    """Foto de este proceso; se rehace si caduca o si cambian las ciudades."""
+    global _snapshot, _snapshot_monotonic
+    ttl = getattr(settings, "INTERPOLATION_SNAPSHOT_TTL", 60)
+    version = cities_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version and time.monotonic() - _snapshot_monotonic < ttl:
+        return snapshot
+
+    with _lock:
+        if (
+            _snapshot is None
+            or _snapshot.version != version
+            or time.monotonic() - _snapshot_monotonic >= ttl
+        ):
+            _snapshot = build_snapshot()
+            _snapshot.version = version
+            _snapshot_monotonic = time.monotonic()
+        return _snapshot
+
+
+def reset_snapshot() -> None:
+    global _snapshot
+    _snapshot = None
+
+
+@dataclass
+class Interpolation:
+    """
+    Resultado para m puntos:
+    - values: variable -> array (m,), NaN donde no hay ningún vecino con dato
+    - neighbours / distances_km: (m, k) índices en la foto y distancias, de menor a mayor
+    """
+    values: Dict[str, np.ndarray]
+    neighbours: np.ndarray
+    distances_km: np.ndarray
+
+
+def _nearest(snapshot: LatestSnapshot, targets: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """k vecinos por fuerza bruta vectorizada (producto escalar en la esfera), por bloques."""
+    n = len(snapshot)
+    block = max(1, _MAX_BLOCK_ELEMENTS // n)
+    neighbours = np.empty((len(targets), k), dtype=np.int64)
+    chords2 = np.empty((len(targets), k))
+
+    for start in range(0, len(targets), block):
+        # |p - q|² = 2 - 2 p·q para vectores unitarios
+        d2 = np.maximum(2 - 2 * targets[start:start + block] @ snapshot.points.T, 0)
+        idx = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < n else np.broadcast_to(np.arange(n), d2.shape)
+        nearest_d2 = np.take_along_axis(d2, idx, axis=1)
+        order = np.argsort(nearest_d2, axis=1)
+        neighbours[start:start + block] = np.take_along_axis(idx, order, axis=1)
+        chords2[start:start + block] = np.take_along_axis(nearest_d2, order, axis=1)
+
+    return neighbours, 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(chords2) / 2, 1.0))
+
+
+def interpolate(
+    snapshot: LatestSnapshot,
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    variables: Sequence[str] = INTERPOLATION_VARIABLES,
+    altitudes: Optional[Sequence[float]] = None,
+    k: Optional[int] = None,
+    power: Optional[float] = None,
+) -> Optional[Interpolation]:
+    """
+    IDW sobre los k vecinos más cercanos de cada punto. Con `altitudes`, la
+    temperatura de cada vecino se lleva a la altitud del punto con
+    INTERPOLATION_LAPSE_RATE (ºC/m) antes de promediar. None si no hay ciudades.
+    """
+    if not len(snapshot):
+        return None
+    k = min(k or getattr(settings, "INTERPOLATION_NEIGHBOURS", 8), len(snapshot))
+    power = power if power is not None else getattr(settings, "INTERPOLATION_POWER", 2.0)
+
+    targets = to_unit_vectors(latitudes, longitudes).reshape(-1, 3)
+    neighbours, distances = _nearest(snapshot, targets, k)
+
+    # Un vecino en el mismo punto se lleva todo el peso
+    exact = distances < 1e-6
+    weights = np.where(
+        exact.any(axis=1, keepdims=True),
+        exact.astype(float),
+        1.0 / np.maximum(distances, 1e-6) ** power,
+    )
+
+    values = {}
+    for variable in variables:
+        neighbour_values = snapshot.values[variable][neighbours]
+        if variable == "temperature" and altitudes is not None:
+            target_altitudes = np.asarray(altitudes, dtype=float).reshape(-1, 1)
+            station_altitudes = snapshot.altitudes[neighbours]
+            # Sin altitud de la ciudad no se corrige
+            offset = np.where(np.isnan(station_altitudes), 0.0, station_altitudes - target_altitudes)
+            neighbour_values = neighbour_values + getattr(settings, "INTERPOLATION_LAPSE_RATE", 0.0065) * offset
+
+        valid = ~np.isnan(neighbour_values)
+        used = np.where(valid, weights, 0.0)
+        total = used.sum(axis=1)
+        weighted = np.where(valid, neighbour_values, 0.0) * used
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[variable] = np.where(total > 0, weighted.sum(axis=1) / total, np.nan)
+
+    return Interpolation(values=values, neighbours=neighbours, distances_km=distances)
+
+
+def grid_axes(bbox: Tuple[float, float, float, float], rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Centros de celda de una rejilla sobre bbox = (lon_min, lat_min, lon_max, lat_max).
+    Las filas van de norte a sur, como los píxeles de una imagen.
+    """
+    lon_min, lat_min, lon_max, lat_max = bbox
+    lats = lat_max - (np.arange(rows) + 0.5) * (lat_max - lat_min) / rows
+    lons = lon_min + (np.arange(cols) + 0.5) * (lon_max - lon_min) / cols
+    return lats, lons
+
+
+def to_json_values(array: np.ndarray, decimals: int = 2):
+    """Array -> listas anidadas con NaN como None (JSON no admite NaN)."""
+    rounded = np.round(array, decimals).astype(object)
+    rounded[np.isnan(array)] = None
+    return rounded.tolist()
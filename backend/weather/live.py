@@ -0,0 +1,205 @@
+# backend/weather/live.py
+#
+# Actualizaciones en directo por Server-Sent Events (ver CityStreamView).
+#
+# Al guardarse una observación que pasa a ser la última de su ciudad se publica
+# su payload de clima actual, ya formateado como evento SSE, en el broker
+# configurado (LIVE_UPDATES_BROKER). El broker lo entrega al LiveHub de cada
+# proceso, que lo reparte a las colas asyncio de los clientes suscritos a esa
+# ciudad. Un cliente inactivo solo cuesta una cola vacía y una corrutina dormida.
+#
+# - LocalBroker: un solo proceso (runserver, un worker ASGI); no hace nada si
+#   nadie escucha a esa ciudad
+# - RedisBroker: varios workers; reparte por pub/sub de Redis (paquete redis)
+
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import City, WeatherObservation
+
+
+def format_event(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    """Trama SSE: se serializa una vez y se envía igual a todos los clientes."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, cls=DjangoJSONEncoder))
+    return "\n".join(lines) + "\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Cola de un cliente conectado, ligada al bucle de eventos que la lee."""
+    city_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default=None)
+
+    def __post_init__(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=getattr(settings, "LIVE_UPDATES_QUEUE_SIZE", 16))
+
+    def offer(self, message: str) -> None:
+        # Cliente lento: se descarta el evento más antiguo, el último es el que importa
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class LiveHub:
+    """Suscripciones de este proceso por ciudad. dispatch() se puede llamar desde cualquier hilo."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, city_id: int) -> Subscription:
+        subscription = Subscription(city_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(city_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.city_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.city_id]
+
+    def has_subscribers(self, city_id: int) -> bool:
+        return city_id in self._subscribers
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def dispatch(self, city_id: int, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(city_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # Bucle ya cerrado: el cliente se fue sin pasar por unsubscribe
+                self.unsubscribe(subscription)
+
+
+class LocalBroker:
+    """Broker en memoria: publicar es repartir directamente en el hub de este proceso."""
+
+    def __init__(self, hub: LiveHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    def has_subscribers(self, city_id: int) -> bool:
+        return self.hub.has_subscribers(city_id)
+
+    def publish(self, city_id: int, message: str) -> None:
+        self.hub.dispatch(city_id, message)
+
+
+class RedisBroker:
+    """
+    Broker entre procesos con pub/sub de Redis (LIVE_UPDATES_REDIS_URL o REDIS_URL).
+    Cada proceso escucha en un hilo propio y reparte en su hub.
+    """
+    CHANNEL_PREFIX = "atmos:live:city:"
+
+    def __init__(self, hub: LiveHub):
+        import redis  # dependencia opcional
+
+        self.hub = hub
+        url = getattr(settings, "LIVE_UPDATES_REDIS_URL", "") or settings.REDIS_URL
+        self.client = redis.Redis.from_url(url)
+        self._listener: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="live-updates", daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.CHANNEL_PREFIX + "*")
+        for item in pubsub.listen():
+            channel = item["channel"].decode()
+            self.hub.dispatch(int(channel[len(self.CHANNEL_PREFIX):]), item["data"].decode())
+
+    def has_subscribers(self, city_id: int) -> bool:
+        # Puede haber clientes en otros procesos
+        return True
+
+    def publish(self, city_id: int, message: str) -> None:
+        self.client.publish(f"{self.CHANNEL_PREFIX}{city_id}", message)
+
+
+hub = LiveHub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_class = import_string(getattr(settings, "LIVE_UPDATES_BROKER", "weather.live.LocalBroker"))
+            _broker = broker_class(hub)
+        return _broker
+
+
+def reset_broker() -> None:
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def current_event(city: City, observation: WeatherObservation) -> str:
+    """Evento "current" con el mismo cuerpo que /api/weather/current/?city_id=..."""
+    from .serializers import CurrentWeatherSerializer
+    from .views import current_weather_data
+
+    data = CurrentWeatherSerializer(current_weather_data(city, observation)).data
+    return format_event("current", dict(data), event_id=observation.updated_at.isoformat())
+
+
+def publish_latest_observations(observations: Iterable[WeatherObservation]) -> None:
+    """
+    Publica, al confirmar la transacción, la observación más reciente de cada
+    ciudad del lote si sigue siendo la última de esa ciudad (las cargas de
+    histórico antiguo no generan eventos).
+    """
+    broker = get_broker()
+    newest: Dict[int, WeatherObservation] = {}
+    for obs in observations:
+        if obs.pk is None or not broker.has_subscribers(obs.city_id):
+            continue
+        current = newest.get(obs.city_id)
+        if current is None or obs.timestamp >= current.timestamp:
+            newest[obs.city_id] = obs
+    if newest:
+        transaction.on_commit(lambda: _publish(broker, newest))
+
+
+def _publish(broker, newest: Dict[int, WeatherObservation]) -> None:
+    # Una consulta: nombre de la ciudad y fecha de su última observación. Se
+    # compara la fecha y no el id del puntero: en un save() normal post_save se
+    # dispara (y on_commit se ejecuta, fuera de transacción) antes de que
+    # WeatherObservation.save avance el puntero.
+    rows = City.objects.filter(pk__in=newest).values_list("id", "name", "latest_observation__timestamp")
+    for city_id, name, latest_ts in rows:
+        obs = newest[city_id]
+        if latest_ts is None or obs.timestamp >= latest_ts:
+            broker.publish(city_id, current_event(City(id=city_id, name=name), obs))
@@ -0,0 +1,67 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.export import parquet_available
+from weather.retention import (
+    apply_retention,
+    default_archive_dir,
+    default_retention_days,
+    months_to_purge,
+    retention_cutoff,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica la política de retención: completa los agregados y borra en lotes las "
+        "observaciones en bruto más antiguas que la ventana configurada "
+        "(OBSERVATION_RETENTION_DAYS), opcionalmente archivándolas antes en Parquet por mes. "
+        "Nunca borra la última observación de cada ciudad."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Días en bruto que se conservan (por defecto, el ajuste)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Filas por lote de borrado")
+        parser.add_argument("--archive", action="store_true", help="Archivar cada mes a Parquet antes de borrarlo")
+        parser.add_argument("--archive-dir", help="Directorio del archivo (por defecto OBSERVATION_ARCHIVE_DIR)")
+        parser.add_argument("--dry-run", action="store_true", help="Solo mostrar qué se purgaría")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else default_retention_days()
+        if days < 1:
+            raise CommandError("La ventana de retención debe ser de al menos 1 día")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size debe ser positivo")
+
+        archive_dir = None
+        if options["archive"] or options["archive_dir"]:
+            if not parquet_available():
+                raise CommandError("Archivar a Parquet requiere pyarrow")
+            archive_dir = Path(options["archive_dir"]) if options["archive_dir"] else default_archive_dir()
+
+        cutoff = retention_cutoff(days)
+        self.stdout.write(f"Purgando observaciones anteriores a {cutoff:%Y-%m-%d} ({days} días de retención)")
+
+        if options["dry_run"]:
+            total = 0
+            for month, count in months_to_purge(cutoff):
+                self.stdout.write(f"  {month:%Y-%m}: {count} observaciones")
+                total += count
+            self.stdout.write(self.style.SUCCESS(f"✓ Se purgarían {total} observaciones"))
+            return
+
+        started = time.perf_counter()
+        total = 0
+        for result in apply_retention(cutoff, archive_dir=archive_dir, chunk_size=options["chunk_size"]):
+            line = f"  {result.month:%Y-%m}: {result.deleted} borradas"
+            if result.rollups_rebuilt:
+                line += f", {result.rollups_rebuilt} tramos de agregados recalculados"
+            if result.archive_path is not None:
+                line += f", {result.archived} archivadas en {result.archive_path}"
+            self.stdout.write(line)
+            total += result.deleted
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} observaciones purgadas en {elapsed:.1f}s"))
@@ -0,0 +1,76 @@
+import math
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from weather.derived_fields import DERIVED_FIELDS, compute_derived_fields
+from weather.ingest import bulk_chunk_size
+from weather.models import WeatherObservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula wind_chill, dew_point y heat_index de las observaciones existentes "
+        "por lotes, con cálculo vectorizado y bulk_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Observaciones leídas y actualizadas por lote",
+        )
+        parser.add_argument(
+            "--city-id",
+            type=int,
+            default=None,
+            help="Limitar a las observaciones de esta ciudad",
+        )
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Procesar solo filas sin campos derivados (p.ej. cargadas con bulk_create)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = bulk_chunk_size(options["chunk_size"])
+
+        qs = WeatherObservation.objects.order_by("id")
+        if options["city_id"] is not None:
+            qs = qs.filter(city_id=options["city_id"])
+        if options["only_missing"]:
+            # wind_chill nunca queda a NULL tras calcularse: marca las filas pendientes
+            qs = qs.filter(wind_chill__isnull=True)
+
+        total = 0
+        last_id = 0
+        while True:
+            # Paginación por clave (id > último) en vez de OFFSET
+            rows = list(
+                qs.filter(id__gt=last_id)
+                .values_list("id", "temperature", "humidity", "wind_speed")[:chunk_size]
+            )
+            if not rows:
+                break
+
+            ids, temperature, humidity, wind_speed = zip(*rows)
+            derived = compute_derived_fields(temperature, humidity, wind_speed)
+            columns = [derived[name].tolist() for name in DERIVED_FIELDS]
+
+            updates = []
+            for obs_id, values in zip(ids, zip(*columns)):
+                obs = WeatherObservation(id=obs_id)
+                for name, value in zip(DERIVED_FIELDS, values):
+                    # NaN -> NULL
+                    setattr(obs, name, None if math.isnan(value) else value)
+                updates.append(obs)
+
+            with transaction.atomic():
+                WeatherObservation.objects.bulk_update(updates, DERIVED_FIELDS, batch_size=1000)
+
+            total += len(rows)
+            last_id = ids[-1]
+            self.stdout.write(f"  {total} observaciones recalculadas")
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Campos derivados recalculados: {total}"))
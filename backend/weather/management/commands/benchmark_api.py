@@ -0,0 +1,272 @@
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+import django
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from weather.ingest import bulk_create_observations
+from weather.models import WeatherObservation
+from weather.synthetic import create_cities, write_observations
+
+
+@dataclass
+class Scenario:
+    """
+    Un camino a medir.
+    - run(i): ejecuta la iteración i y devuelve el código HTTP (o 200 si no es HTTP)
+    - before(i): preparación fuera del cronómetro (p.ej. vaciar la caché)
+    - units: elementos procesados por iteración (filas en las escrituras en bloque)
+    """
+    name: str
+    run: Callable[[int], int]
+    before: Optional[Callable[[int], None]] = None
+    units: int = 1
+
+
+def seed_data(cities: int, hours: int, seed: int) -> List[int]:
+    """Crea `cities` ciudades con `hours` observaciones horarias sintéticas cada una."""
+    city_ids, profiles = create_cities(cities, seed)
+    start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+    for _ in write_observations(city_ids, profiles, start, hours, seed):
+        pass
+    return city_ids
+
+
+def percentile_summary(name: str, timings: List[float], elapsed: float, units: int = 1, errors: int = 0) -> Dict:
+    values = np.array(timings) * 1000
+    summary = {
+        "scenario": name,
+        "requests": len(timings),
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "throughput_rps": round(len(timings) / elapsed, 2) if elapsed else None,
+    }
+    if units > 1:
+        summary["rows_per_second"] = round(len(timings) * units / elapsed, 1) if elapsed else None
+    return summary
+
+
+def run_scenario(scenario: Scenario, iterations: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        if scenario.before:
+            scenario.before(i)
+        scenario.run(i)
+
+    timings = []
+    errors = 0
+    elapsed = 0.0
+    for i in range(warmup, warmup + iterations):
+        if scenario.before:
+            scenario.before(i)
+        started = time.perf_counter()
+        status_code = scenario.run(i)
+        duration = time.perf_counter() - started
+        timings.append(duration)
+        elapsed += duration
+        if status_code >= 400:
+            errors += 1
+    return percentile_summary(scenario.name, timings, elapsed, scenario.units, errors)
+
+
+def build_scenarios(client: APIClient, city_ids: List[int], bulk_rows: int, seed: int) -> Dict[str, Scenario]:
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(city_ids, size=100_000)
+    batch = [int(c) for c in city_ids[:50]]
+    new_ts = timezone.now()
+
+    def get(name, params):
+        return lambda i: client.get(reverse(name), params(i)).status_code
+
+    def city(i):
+        return int(picks[i % len(picks)])
+
+    def bulk_rows_for(i):
+        return [
+            {
+                "city_id": city(i * bulk_rows + j),
+                "timestamp": (new_ts + timedelta(seconds=i * bulk_rows + j)).isoformat(),
+                "temperature": 20.0,
+                "humidity": 55.0,
+            }
+            for j in range(bulk_rows)
+        ]
+
+    def post_bulk(i):
+        return client.post(reverse("observations-bulk"), bulk_rows_for(i), format="json").status_code
+
+    def save_one(i):
+        WeatherObservation(city_id=city(i), timestamp=new_ts - timedelta(minutes=i + 1), temperature=20.0).save()
+        return 200
+
+    def bulk_create(i):
+        bulk_create_observations(
+            [
+                WeatherObservation(city_id=city(j), timestamp=new_ts - timedelta(seconds=i * bulk_rows + j + 1), temperature=20.0)
+                for j in range(bulk_rows)
+            ]
+        )
+        return 200
+
+    scenarios = [
+        Scenario("current_cached", get("current-weather", lambda i: {"city_id": city(i % 10)})),
+        Scenario(
+            "current_uncached",
+            get("current-weather", lambda i: {"city_id": city(i)}),
+            before=lambda i: cache.clear(),
+        ),
+        Scenario("current_batch_50", get("current-weather", lambda i: {"city_ids": ",".join(map(str, batch))})),
+        Scenario("conditions", get("current-conditions", lambda i: {"city_id": city(i), "city_name": "Madrid"})),
+        Scenario(
+            "forecast_holt_winters",
+            get("prophet-forecast", lambda i: {"city_id": city(i), "periods": 24, "engine": "holt_winters"}),
+        ),
+        # Pocas ciudades: mide sobre todo el camino con el modelo ya cacheado
+        Scenario("forecast_prophet", get("prophet-forecast", lambda i: {"city_id": city(i % 3), "periods": 24})),
+        Scenario("observation_save", save_one),
+        Scenario("bulk_create_observations", bulk_create, units=bulk_rows),
+        Scenario("bulk_ingest_api", post_bulk, units=bulk_rows),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+SCENARIO_NAMES = [
+    "current_cached",
+    "current_uncached",
+    "current_batch_50",
+    "conditions",
+    "forecast_holt_winters",
+    "forecast_prophet",
+    "observation_save",
+    "bulk_create_observations",
+    "bulk_ingest_api",
+]
+
+# Escenarios lentos por petición: usan --slow-requests en lugar de --requests
+SLOW_SCENARIOS = {"forecast_prophet", "bulk_create_observations", "bulk_ingest_api"}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmark(options: Dict) -> Dict:
+    """
+    Siembra datos y mide los escenarios elegidos sobre la base de datos activa.
+    Devuelve el informe que el comando guarda en JSON.
+    """
+    cache.clear()
+    seeded = time.perf_counter()
+    city_ids = seed_data(options["cities"], options["hours"], options["seed"])
+    seed_seconds = time.perf_counter() - seeded
+
+    client = APIClient()
+    user = get_user_model().objects.create_user(username="benchmark", password="benchmark")
+    client.force_authenticate(user=user)
+    scenarios = build_scenarios(client, city_ids, options["bulk_rows"], options["seed"])
+
+    results = []
+    for name in options.get("scenarios") or SCENARIO_NAMES:
+        iterations = options["slow_requests"] if name in SLOW_SCENARIOS else options["requests"]
+        results.append(run_scenario(scenarios[name], iterations, options["warmup"]))
+
+    observations = options["cities"] * options["hours"]
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+        },
+        "dataset": {
+            "cities": options["cities"],
+            "hours": options["hours"],
+            "observations": observations,
+            "seed_seconds": round(seed_seconds, 3),
+            "seed_rows_per_second": round(observations / seed_seconds, 1) if seed_seconds else None,
+        },
+        "options": {key: options[key] for key in ("requests", "slow_requests", "warmup", "bulk_rows", "seed")},
+        "results": results,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide p50/p95 y rendimiento de los endpoints calientes de la API sobre una base "
+        "de datos de pruebas desechable con datos generados. Guarda el informe en JSON "
+        "para comparar entre commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cities", type=int, default=50, help="Ciudades a generar")
+        parser.add_argument("--hours", type=int, default=24 * 30, help="Observaciones horarias por ciudad")
+        parser.add_argument("--requests", type=int, default=200, help="Peticiones medidas por escenario")
+        parser.add_argument(
+            "--slow-requests", type=int, default=20,
+            help="Peticiones medidas en los escenarios lentos (Prophet y escrituras en bloque)",
+        )
+        parser.add_argument("--warmup", type=int, default=5, help="Peticiones previas no medidas")
+        parser.add_argument("--bulk-rows", type=int, default=500, help="Filas por lote en las escrituras en bloque")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=SCENARIO_NAMES,
+            help="Escenario a medir (se puede repetir; por defecto todos)",
+        )
+        parser.add_argument("--output", help="Guardar el informe en este fichero JSON")
+
+    def handle(self, *args, **options):
+        # BD de pruebas desechable (en memoria con SQLite): nunca toca los datos reales
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            with tempfile.TemporaryDirectory() as model_dir, override_settings(PROPHET_MODEL_CACHE_DIR=model_dir):
+                report = run_benchmark(options)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        dataset = report["dataset"]
+        self.stdout.write(
+            f"Datos: {dataset['cities']} ciudades x {dataset['hours']} h = {dataset['observations']} observaciones "
+            f"({dataset['seed_rows_per_second']} filas/s)"
+        )
+        self.stdout.write(f"{'escenario':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}{'errores':>9}")
+        for row in report["results"]:
+            self.stdout.write(
+                f"{row['scenario']:<28}{row['requests']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+                f"{row['throughput_rps']:>10}{row['errors']:>9}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✓ Informe guardado en {options['output']}"))
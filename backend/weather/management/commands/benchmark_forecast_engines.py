@@ -0,0 +1,75 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from weather.forecast_engines import ENGINES
+
+
+def synthetic_series(days, seed):
+    """Serie horaria con ciclo diario, deriva lenta y ruido (temperatura ficticia)."""
+    rng = np.random.default_rng(seed)
+    hours = np.arange(days * 24)
+    y = (
+        15
+        + 6 * np.sin(2 * np.pi * (hours - 9) / 24)
+        + 0.01 * hours / 24
+        + rng.normal(0, 0.8, size=len(hours))
+    )
+    ds = np.datetime64("2025-01-01T00:00") + hours.astype("timedelta64[h]")
+    return ds, y
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara latencia y error de los motores de predicción sobre la misma serie "
+        "sintética, reservando las últimas `--horizon` horas como validación."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Días de histórico de entrenamiento")
+        parser.add_argument("--horizon", type=int, default=24, help="Horas a predecir y validar")
+        parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por motor (se toma la mediana)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--engine",
+            action="append",
+            dest="engines",
+            choices=sorted(ENGINES),
+            help="Motor a medir (se puede repetir; por defecto todos)",
+        )
+        parser.add_argument("--output", help="Guardar los resultados en este fichero JSON")
+
+    def handle(self, *args, **options):
+        horizon = options["horizon"]
+        ds, y = synthetic_series(options["days"] + horizon // 24 + 1, options["seed"])
+        train_ds, train_y = ds[:-horizon], y[:-horizon]
+        actual = y[-horizon:]
+
+        results = []
+        for name in options["engines"] or sorted(ENGINES):
+            engine = ENGINES[name]
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                points = engine.forecast(train_ds, train_y, horizon, "H")
+                timings.append(time.perf_counter() - started)
+
+            predicted = np.array([p["yhat"] for p in points])
+            errors = predicted - actual
+            results.append({
+                "engine": name,
+                "median_ms": round(float(np.median(timings)) * 1000, 2),
+                "mae": round(float(np.mean(np.abs(errors))), 3),
+                "rmse": round(float(np.sqrt(np.mean(errors ** 2))), 3),
+            })
+
+        self.stdout.write(f"{'motor':<14}{'mediana ms':>12}{'MAE':>10}{'RMSE':>10}")
+        for row in results:
+            self.stdout.write(f"{row['engine']:<14}{row['median_ms']:>12}{row['mae']:>10}{row['rmse']:>10}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({"days": options["days"], "horizon": horizon, "results": results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✓ Resultados guardados en {options['output']}"))
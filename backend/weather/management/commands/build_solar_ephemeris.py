@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from weather.ephemeris import build_ephemeris
+
+
+class Command(BaseCommand):
+    help = (
+        "Precalcula orto, ocaso y mediodía solar de todas las ciudades para un año "
+        "(SOLAR_EPHEMERIS_DIR/ephemeris_<año>.npz). Volver a lanzarlo tras añadir "
+        "o mover ciudades; mientras tanto esas ciudades se calculan al vuelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Primer año (por defecto, el actual)")
+        parser.add_argument("--years", type=int, default=1, help="Número de años consecutivos (por defecto 1)")
+
+    def handle(self, *args, **options):
+        first = options["year"] or timezone.now().year
+        if options["years"] < 1:
+            raise CommandError("--years debe ser al menos 1")
+
+        for year in range(first, first + options["years"]):
+            try:
+                path, table = build_ephemeris(year)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            size_kb = path.stat().st_size / 1024
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {year}: {len(table.city_ids)} ciudades × {table.sunrise.shape[1]} días "
+                f"-> {path} ({size_kb:.1f} KB)"
+            ))
@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from weather.synthetic import DEFAULT_BBOX, create_cities, write_observations
+from weather.views import parse_datetime_param
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera ciudades y observaciones horarias sintéticas (ciclos diario y estacional, "
+        "frentes, humedad/presión/viento correlacionados) para pruebas de carga y "
+        "benchmarks. Sustituye al antiguo seed_data.py: con los valores por defecto "
+        "crea 5 ciudades con una semana de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cities", type=int, default=5, help="Ciudades a crear (se saltan los nombres que ya existen)",
+        )
+        parser.add_argument("--days", type=int, default=7, help="Días de histórico por ciudad")
+        parser.add_argument("--years", type=float, help="Años de histórico (sustituye a --days)")
+        parser.add_argument("--end", help="Fecha de la última observación (ISO 8601, por defecto ahora)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Filas por executemany (una transacción por lote)")
+        parser.add_argument(
+            "--rollups",
+            choices=["rebuild", "none"],
+            default="rebuild",
+            help=(
+                "rebuild: calcular los agregados de cada bloque generado junto con sus filas; "
+                "none: no tocarlos (p.ej. para lanzar rebuild_rollups después)"
+            ),
+        )
+        parser.add_argument(
+            "--bbox",
+            type=float,
+            nargs=4,
+            metavar=("LAT_MIN", "LAT_MAX", "LON_MIN", "LON_MAX"),
+            default=list(DEFAULT_BBOX),
+            help="Zona donde situar las ciudades (por defecto, la península ibérica)",
+        )
+
+    def handle(self, *args, **options):
+        if options["cities"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--cities y --chunk-size deben ser positivos")
+        hours = int(round((options["years"] * 365 if options["years"] else options["days"]) * 24))
+        if hours < 1:
+            raise CommandError("El histórico debe cubrir al menos una hora")
+
+        end = timezone.now()
+        if options["end"]:
+            end = parse_datetime_param(options["end"])
+            if end is None:
+                raise CommandError("--end debe ser una fecha ISO 8601")
+        end = end.replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(hours=hours - 1)
+
+        started = time.perf_counter()
+        city_ids, profiles = create_cities(options["cities"], options["seed"], tuple(options["bbox"]))
+
+        total = options["cities"] * hours
+        written = 0
+        for rows in write_observations(
+            city_ids,
+            profiles,
+            start,
+            hours,
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            rollups=options["rollups"] == "rebuild",
+        ):
+            written += rows
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {written}/{total} observaciones")
+
+        elapsed = time.perf_counter() - started
+        rate = f"{written / elapsed:.0f}" if elapsed else "-"
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(city_ids)} ciudades y {written} observaciones ({start:%Y-%m-%d %H:%M} → "
+            f"{end:%Y-%m-%d %H:%M}) en {elapsed:.1f} s ({rate} filas/s)"
+        ))
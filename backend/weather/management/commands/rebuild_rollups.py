@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.rollups import rebuild_rollups
+from weather.views import parse_datetime_param
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los agregados horarios/diarios/mensuales desde las observaciones. "
+        "Útil tras cargas masivas sin agregados o tras editar/borrar observaciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--city-id",
+            type=int,
+            action="append",
+            dest="city_ids",
+            help="Limitar a esta ciudad (se puede repetir)",
+        )
+        parser.add_argument("--from", dest="date_from", help="Fecha inicial (se amplía al inicio de mes)")
+        parser.add_argument("--to", dest="date_to", help="Fecha final (se amplía al final de mes)")
+
+    def handle(self, *args, **options):
+        start = end = None
+        if options["date_from"]:
+            start = parse_datetime_param(options["date_from"])
+            if start is None:
+                raise CommandError("--from debe ser una fecha ISO 8601")
+        if options["date_to"]:
+            end = parse_datetime_param(options["date_to"])
+            if end is None:
+                raise CommandError("--to debe ser una fecha ISO 8601")
+
+        written = rebuild_rollups(city_ids=options["city_ids"], start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"✓ Agregados reconstruidos: {written} tramos"))
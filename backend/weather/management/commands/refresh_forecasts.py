@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from weather.prophet_service import build_forecasts_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las predicciones Prophet de las ciudades en paralelo y las guarda "
+        "en ForecastPoint. Con --interval se queda en bucle y refresca cada N segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--periods",
+            type=int,
+            default=getattr(settings, "FORECAST_PRECOMPUTED_PERIODS", 72),
+            help="Horas de predicción a guardar por ciudad",
+        )
+        parser.add_argument(
+            "--city-id",
+            type=int,
+            action="append",
+            dest="city_ids",
+            help="Limitar a esta ciudad (se puede repetir)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Procesos para entrenar en paralelo (por defecto FORECAST_BATCH_WORKERS o nº de CPUs)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Segundos entre refrescos; 0 ejecuta una sola vez",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self._refresh(options["periods"], options["city_ids"], options["workers"])
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
+
+    def _refresh(self, periods, city_ids, workers):
+        started = time.perf_counter()
+        results = build_forecasts_batch(city_ids=city_ids, periods=periods, workers=workers)
+
+        for result in results:
+            if result.error is not None:
+                self.stdout.write(self.style.ERROR(f"  ciudad {result.city_id}: {result.error}"))
+            elif result.version is None:
+                self.stdout.write(f"  ciudad {result.city_id}: sin observaciones")
+            else:
+                origin = "entrenado" if result.refitted else "caché"
+                self.stdout.write(
+                    f"  ciudad {result.city_id}: {len(result.points)} puntos "
+                    f"({origin}, fit {result.fit_seconds:.2f}s, total {result.total_seconds:.2f}s)"
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Predicciones actualizadas: {len(results)} ciudades en {elapsed:.1f}s")
+        )
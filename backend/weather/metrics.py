@@ -0,0 +1,233 @@
+# backend/weather/metrics.py
+#
+# Métricas de rendimiento en memoria del proceso, expuestas en formato de texto
+# de Prometheus en /api/metrics/. Cada worker (gunicorn/uvicorn) lleva sus
+# propios contadores; Prometheus los agrega al raspar cada instancia.
+#
+# Además de los agregados globales, cada petición lleva un RequestTimings en un
+# ContextVar con el tiempo por fase (db, fit, render) que MetricsMiddleware
+# devuelve en la cabecera Server-Timing.
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Tramos por defecto (segundos): de 5 ms a 30 s, pensados para vistas y entrenamientos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+@dataclass
+class _HistogramState:
+    buckets: List[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+        self._states: Dict[LabelValues, _HistogramState] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _HistogramState(buckets=[0] * len(self.upper_bounds))
+            if index < len(self.upper_bounds):
+                state.buckets[index] += 1
+            state.total += value
+            state.count += 1
+
+    def count(self, **labels) -> int:
+        state = self._states.get(tuple(str(labels[name]) for name in self.labelnames))
+        return state.count if state else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._states.items()):
+                cumulative = 0
+                for bound, hits in zip(self.upper_bounds, state.buckets):
+                    cumulative += hits
+                    le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {state.count}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(state.total)}")
+                lines.append(f"{self.name}_count{labels} {state.count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+REQUEST_DURATION = Histogram(
+    "atmos_http_request_duration_seconds",
+    "Latencia de las peticiones por vista.",
+    ("view", "method", "status"),
+)
+DB_QUERIES = Counter(
+    "atmos_db_queries_total",
+    "Consultas SQL ejecutadas por vista.",
+    ("view",),
+)
+DB_DURATION = Counter(
+    "atmos_db_query_duration_seconds_total",
+    "Tiempo total en consultas SQL por vista.",
+    ("view",),
+)
+CACHE_REQUESTS = Counter(
+    "atmos_cache_requests_total",
+    "Consultas a las cachés de la aplicación (result = hit | miss).",
+    ("cache", "result"),
+)
+FORECAST_FIT_DURATION = Histogram(
+    "atmos_forecast_fit_duration_seconds",
+    "Duración de los entrenamientos de modelos de predicción.",
+    ("engine", "variable"),
+)
+
+REGISTRY = [REQUEST_DURATION, DB_QUERIES, DB_DURATION, CACHE_REQUESTS, FORECAST_FIT_DURATION]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_fit(seconds: float, engine: str = "prophet", variable: str = "temperature") -> None:
+    FORECAST_FIT_DURATION.observe(seconds, engine=engine, variable=variable)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add("fit", seconds)
+
+
+@dataclass
+class RequestTimings:
+    """Tiempo acumulado por fase de la petición en curso (segundos)."""
+    phases: Dict[str, float] = field(default_factory=dict)
+    db_queries: int = 0
+    # Los modelos de varias variables se entrenan en hilos de la misma petición
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.phases["db"] = self.phases.get("db", 0.0) + seconds
+            self.db_queries += 1
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("atmos_request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def track_request() -> Iterator[RequestTimings]:
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """
+    execute_wrapper instalado en todas las conexiones (ver WeatherConfig.ready):
+    cuenta consultas y tiempo de BD de la petición en curso. Fuera de una
+    petición no hace nada. Como usa un ContextVar, también funciona con el ORM
+    asíncrono (sync_to_async copia el contexto al hilo que ejecuta la consulta).
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def install_db_wrapper(connection, **kwargs) -> None:
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
@@ -0,0 +1,75 @@
+# backend/weather/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+
+def _view_name(request) -> str:
+    # Nombre de la ruta (acotado) en vez del path, para no disparar la cardinalidad
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.view_name or "unnamed"
+
+
+def _server_timing(timings: metrics.RequestTimings, total: float) -> str:
+    parts = [f'db;dur={timings.phases.get("db", 0.0) * 1000:.1f};desc="{timings.db_queries} queries"']
+    for phase in ("fit", "render"):
+        if phase in timings.phases:
+            parts.append(f"{phase};dur={timings.phases[phase] * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Mide cada petición: latencia por vista, consultas y tiempo de BD, y las fases
+    que registran las vistas (entrenamiento de modelos, renderizado de DRF).
+    Añade la cabecera Server-Timing para verlo desde las herramientas del navegador.
+    Funciona con vistas síncronas y asíncronas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with metrics.track_request() as timings:
+            response = self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with metrics.track_request() as timings:
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    def process_template_response(self, request, response):
+        # Las respuestas de DRF se renderizan (serializan a JSON) después de la vista
+        timings = metrics.current_timings()
+        if timings is not None:
+            render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: timings.add("render", time.perf_counter() - render_started)
+            )
+        return response
+
+    def _finish(self, request, response, timings, started):
+        total = time.perf_counter() - started
+        view = _view_name(request)
+
+        metrics.REQUEST_DURATION.observe(total, view=view, method=request.method, status=response.status_code)
+        metrics.DB_QUERIES.inc(timings.db_queries, view=view)
+        metrics.DB_DURATION.inc(timings.phases.get("db", 0.0), view=view)
+
+        response["Server-Timing"] = _server_timing(timings, total)
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_alter_weatherobservation_city'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ts', models.DateTimeField(help_text='Instante previsto')),
+                ('yhat', models.FloatField(help_text='Temperatura prevista en grados Celsius')),
+                ('yhat_lower', models.FloatField(help_text='Límite inferior del intervalo')),
+                ('yhat_upper', models.FloatField(help_text='Límite superior del intervalo')),
+                ('model_version', models.CharField(max_length=64)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_points', to='weather.city')),
+            ],
+            options={
+                'verbose_name': 'Punto de Predicción',
+                'verbose_name_plural': 'Puntos de Predicción',
+                'ordering': ['city', 'ts'],
+                'constraints': [models.UniqueConstraint(fields=('city', 'ts'), name='unique_forecast_point_per_city_ts')],
+            },
+        ),
+    ]
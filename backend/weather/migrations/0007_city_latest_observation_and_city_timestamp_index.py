@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_latest_observation(apps, schema_editor):
+    # Rellenar el puntero de las ciudades que ya tienen observaciones
+    City = apps.get_model('weather', 'City')
+    WeatherObservation = apps.get_model('weather', 'WeatherObservation')
+    latest = (
+        WeatherObservation.objects
+        .filter(city=OuterRef('pk'))
+        .order_by('-timestamp')
+        .values('pk')[:1]
+    )
+    City.objects.update(latest_observation=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0006_forecastpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='latest_observation',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='weather.weatherobservation'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherobservation',
+            index=models.Index(fields=['city', '-timestamp'], name='weather_wea_city_id_4d5517_idx'),
+        ),
+        migrations.RunPython(fill_latest_observation, migrations.RunPython.noop),
+    ]
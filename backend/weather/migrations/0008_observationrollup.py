@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0007_city_latest_observation_and_city_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObservationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('hour', 'Hora'), ('day', 'Día'), ('month', 'Mes')], max_length=5)),
+                ('bucket_start', models.DateTimeField(help_text='Inicio del tramo (UTC)')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('temperature_sum', models.FloatField(default=0)),
+                ('humidity_sum', models.FloatField(default=0)),
+                ('pressure_sum', models.FloatField(default=0)),
+                ('wind_speed_sum', models.FloatField(default=0)),
+                ('wind_gust_max', models.FloatField(blank=True, null=True)),
+                ('precipitation_sum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='weather.city')),
+            ],
+            options={
+                'verbose_name': 'Agregado de Observaciones',
+                'verbose_name_plural': 'Agregados de Observaciones',
+                'ordering': ['city', 'resolution', 'bucket_start'],
+                'constraints': [models.UniqueConstraint(fields=('city', 'resolution', 'bucket_start'), name='unique_rollup_per_city_resolution_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0008_observationrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('emblem', 'Emblemática (según el tiempo)'), ('city', 'Ciudad')], max_length=10)),
+                ('code', models.CharField(help_text='Nombre del archivo en el CDN', max_length=200)),
+                ('city_name', models.CharField(blank=True, max_length=100)),
+                ('condition', models.CharField(blank=True, help_text='Código de condition (en blanco = cualquiera)', max_length=40)),
+                ('daylight', models.CharField(blank=True, choices=[('day', 'Día'), ('night', 'Noche')], max_length=5)),
+                ('temperature_band', models.CharField(blank=True, choices=[('heat', 'Calor'), ('mild', 'Templado'), ('freezing', 'Helada')], max_length=10)),
+                ('priority', models.IntegerField(default=0)),
+                ('active', models.BooleanField(default=True)),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='weather.city')),
+            ],
+            options={
+                'verbose_name': 'Foto del Catálogo',
+                'verbose_name_plural': 'Catálogo de Fotos',
+                'ordering': ['kind', '-priority', 'id'],
+            },
+        ),
+    ]
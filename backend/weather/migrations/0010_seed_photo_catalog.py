@@ -0,0 +1,66 @@
+# Siembra el catálogo de fotos con las reglas que antes estaban en código
+# (emblem_photos.select_emblem_photo y los diccionarios de city_photos).
+
+from django.db import migrations
+
+# (code, condition, daylight, temperature_band, priority); el orden de
+# prioridades reproduce la cadena de ifs original
+EMBLEM_PHOTOS = [
+    ("heatwave_city_01.jpg", "", "", "heat", 60),
+    ("snow_city_01.jpg", "snow", "", "", 50),
+    ("snow_city_01.jpg", "sleet", "", "", 50),
+    ("snow_city_01.jpg", "", "", "freezing", 50),
+    ("rain_city_01.jpg", "rain", "", "", 40),
+    ("rain_city_01.jpg", "drizzle", "", "", 40),
+    ("storm_city_01.jpg", "thunderstorm", "", "", 30),
+    ("storm_city_01.jpg", "storm", "", "", 30),
+    ("cloudy_city_01.jpg", "clouds", "", "", 20),
+    ("cloudy_city_01.jpg", "overcast", "", "", 20),
+    ("cloudy_city_01.jpg", "broken clouds", "", "", 20),
+    ("cloudy_city_01.jpg", "scattered clouds", "", "", 20),
+    ("clear_day_city_01.jpg", "clear", "day", "", 10),
+    ("clear_night_city_01.jpg", "clear", "night", "", 10),
+    ("default_city_01.jpg", "", "", "", 0),
+]
+
+CITY_PHOTOS = [
+    ("barcelona_skyline_01.jpg", "barcelona"),
+    ("madrid_skyline_01.jpg", "madrid"),
+    ("paris_skyline_01.jpg", "paris"),
+    ("london_skyline_01.jpg", "london"),
+]
+
+
+def seed_catalog(apps, schema_editor):
+    PhotoCatalogEntry = apps.get_model("weather", "PhotoCatalogEntry")
+    PhotoCatalogEntry.objects.bulk_create(
+        [
+            PhotoCatalogEntry(
+                kind="emblem",
+                code=code,
+                condition=condition,
+                daylight=daylight,
+                temperature_band=band,
+                priority=priority,
+            )
+            for code, condition, daylight, band, priority in EMBLEM_PHOTOS
+        ]
+        + [PhotoCatalogEntry(kind="city", code=code, city_name=name) for code, name in CITY_PHOTOS]
+    )
+
+
+def unseed_catalog(apps, schema_editor):
+    PhotoCatalogEntry = apps.get_model("weather", "PhotoCatalogEntry")
+    PhotoCatalogEntry.objects.filter(kind="emblem", code__in={row[0] for row in EMBLEM_PHOTOS}).delete()
+    PhotoCatalogEntry.objects.filter(kind="city", code__in={row[0] for row in CITY_PHOTOS}).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_photocatalogentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_catalog, unseed_catalog),
+    ]
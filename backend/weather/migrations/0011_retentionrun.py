@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0010_seed_photo_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoff', models.DateTimeField(help_text='Se purgan las observaciones anteriores (UTC)')),
+                ('purged_before', models.DateTimeField(blank=True, help_text='Meses ya purgados hasta aquí', null=True)),
+                ('observations_deleted', models.PositiveIntegerField(default=0)),
+                ('observations_archived', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Ejecución de Retención',
+                'verbose_name_plural': 'Ejecuciones de Retención',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
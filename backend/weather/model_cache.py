@@ -0,0 +1,225 @@
+# backend/weather/model_cache.py
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from . import metrics
+from .models import WeatherObservation
+
+
+@dataclass
+class CachedModel:
+    """
+    Modelo Prophet ya entrenado para una ciudad.
+    - fingerprint: huella de las observaciones con las que se entrenó
+    - fitted_at: instante (epoch) del entrenamiento
+    """
+    model: Prophet
+    fingerprint: str
+    fitted_at: float
+
+
+# Variable que se predice si no se indica otra
+DEFAULT_VARIABLE = "temperature"
+
+# Un modelo por ciudad y variable
+ModelKey = Tuple[int, str]
+
+# Caché en memoria del proceso: (city_id, variable) -> CachedModel
+_memory_cache: Dict[ModelKey, CachedModel] = {}
+_locks: Dict[ModelKey, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _model_lock(key: ModelKey) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _cache_dir() -> Optional[Path]:
+    path = getattr(settings, "PROPHET_MODEL_CACHE_DIR", None)
+    return Path(path) if path else None
+
+
+def _max_age() -> float:
+    return float(getattr(settings, "PROPHET_MODEL_MAX_AGE", 0))
+
+
+_FINGERPRINT_AGGREGATES = {
+    "n": Count("id"),
+    "last_ts": Max("timestamp"),
+    "last_update": Max("updated_at"),
+}
+
+
+def _format_fingerprint(stats: dict) -> Optional[str]:
+    if not stats["n"]:
+        return None
+    return "{n}|{last_ts}|{last_update}".format(
+        n=stats["n"],
+        last_ts=stats["last_ts"].isoformat(),
+        last_update=stats["last_update"].isoformat(),
+    )
+
+
+def observations_fingerprint(city_id: int) -> Optional[str]:
+    """
+    Huella barata de las observaciones de una ciudad (una sola agregación).
+    Cambia cuando llegan filas nuevas o se modifica alguna existente.
+    Devuelve None si la ciudad no tiene observaciones.
+    """
+    stats = WeatherObservation.objects.filter(city_id=city_id).aggregate(**_FINGERPRINT_AGGREGATES)
+    return _format_fingerprint(stats)
+
+
+async def aobservations_fingerprint(city_id: int) -> Optional[str]:
+    """Versión asíncrona de observations_fingerprint."""
+    stats = await WeatherObservation.objects.filter(city_id=city_id).aaggregate(**_FINGERPRINT_AGGREGATES)
+    return _format_fingerprint(stats)
+
+
+def _is_valid(entry: CachedModel, fingerprint: str) -> bool:
+    # Mismos datos -> el modelo sigue siendo válido
+    if entry.fingerprint == fingerprint:
+        return True
+    # Datos nuevos, pero dentro de la ventana de obsolescencia tolerada
+    return (time.time() - entry.fitted_at) < _max_age()
+
+
+def _model_path(key: ModelKey) -> Optional[Path]:
+    directory = _cache_dir()
+    if directory is None:
+        return None
+    city_id, variable = key
+    # La temperatura conserva el nombre de fichero de antes de haber más variables
+    if variable == DEFAULT_VARIABLE:
+        return directory / f"city_{city_id}.json"
+    return directory / f"city_{city_id}_{variable}.json"
+
+
+def _load_from_disk(key: ModelKey) -> Optional[CachedModel]:
+    path = _model_path(key)
+    if path is None or not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text())
+        return CachedModel(
+            model=model_from_json(payload["model"]),
+            fingerprint=payload["fingerprint"],
+            fitted_at=float(payload["fitted_at"]),
+        )
+    except (OSError, ValueError, KeyError):
+        # Fichero corrupto o de una versión incompatible: se reentrena
+        return None
+
+
+def _save_to_disk(key: ModelKey, entry: CachedModel) -> None:
+    path = _model_path(key)
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "fingerprint": entry.fingerprint,
+        "fitted_at": entry.fitted_at,
+        "model": model_to_json(entry.model),
+    }
+    # Escritura atómica para que otro worker nunca lea un fichero a medias
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(payload))
+    os.replace(tmp_path, path)
+
+
+def lookup_model(
+    city_id: int,
+    fingerprint: str,
+    variable: str = DEFAULT_VARIABLE,
+) -> Optional[CachedModel]:
+    """
+    Busca un modelo válido para la ciudad y variable en memoria y, si no, en disco.
+    No entrena nunca; devuelve None si hay que entrenar.
+    """
+    key = (city_id, variable)
+    entry = _memory_cache.get(key)
+    if entry is not None and _is_valid(entry, fingerprint):
+        return entry
+
+    entry = _load_from_disk(key)
+    if entry is not None and _is_valid(entry, fingerprint):
+        _memory_cache[key] = entry
+        return entry
+    return None
+
+
+def store_model(
+    city_id: int,
+    fingerprint: str,
+    model: Prophet,
+    fitted_at: Optional[float] = None,
+    variable: str = DEFAULT_VARIABLE,
+) -> CachedModel:
+    """Guarda un modelo recién entrenado en memoria y en disco."""
+    key = (city_id, variable)
+    entry = CachedModel(
+        model=model,
+        fingerprint=fingerprint,
+        fitted_at=time.time() if fitted_at is None else fitted_at,
+    )
+    _save_to_disk(key, entry)
+    _memory_cache[key] = entry
+    return entry
+
+
+def get_or_fit_model(
+    city_id: int,
+    fingerprint: str,
+    fit: Callable[[], Prophet],
+    variable: str = DEFAULT_VARIABLE,
+) -> Prophet:
+    """
+    Devuelve el modelo Prophet de la ciudad para `variable`:
+    1) desde memoria, 2) desde disco, o 3) llamando a `fit()` y guardándolo.
+    """
+    key = (city_id, variable)
+    entry = _memory_cache.get(key)
+    if entry is not None and _is_valid(entry, fingerprint):
+        metrics.record_cache("prophet_model", hit=True)
+        return entry.model
+
+    # Un único entrenamiento por modelo y proceso aunque lleguen peticiones a la vez
+    with _model_lock(key):
+        entry = lookup_model(city_id, fingerprint, variable)
+        metrics.record_cache("prophet_model", hit=entry is not None)
+        if entry is None:
+            started = time.perf_counter()
+            model = fit()
+            metrics.record_fit(time.perf_counter() - started, engine="prophet", variable=variable)
+            entry = store_model(city_id, fingerprint, model, variable=variable)
+        return entry.model
+
+
+def invalidate_model(city_id: Optional[int] = None) -> None:
+    """
+    Elimina los modelos cacheados de una ciudad, de todas sus variables (o de
+    todas las ciudades si city_id es None), tanto en memoria como en disco.
+    """
+    for key in list(_memory_cache):
+        if city_id is None or key[0] == city_id:
+            _memory_cache.pop(key, None)
+
+    directory = _cache_dir()
+    if directory is None or not directory.exists():
+        return
+    patterns = ["city_*.json"] if city_id is None else [f"city_{city_id}.json", f"city_{city_id}_*.json"]
+    for pattern in patterns:
+        for path in directory.glob(pattern):
+            path.unlink(missing_ok=True)
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery
 from django.utils import timezone
 import math
 
@@ -8,10 +9,71 @@ class City(models.Model):
     latitud = models.FloatField(help_text="Latitud de la ciudad", default=0)
     longitud = models.FloatField(help_text="Longitud de la ciudad", default=0)
     altitud = models.FloatField(null=True, blank=True, help_text="Metros sobre el nivel del mar")
+    # Puntero desnormalizado a la observación más reciente (se mantiene al ingerir)
+    latest_observation = models.ForeignKey(
+        "WeatherObservation",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def advance_latest_observation(cls, city_id, observation):
+        """
+        Apunta latest_observation de la ciudad a `observation` si es más reciente
+        que la actual (una sola UPDATE condicional, segura con ingestas concurrentes).
+        """
+        cls.objects.filter(pk=city_id).filter(
+            Q(latest_observation__isnull=True)
+            | Q(latest_observation__timestamp__lte=observation.timestamp)
+        ).update(latest_observation=observation)
+
+    @classmethod
+    def with_latest_observations(cls, city_ids):
+        """
+        Devuelve las ciudades pedidas con su última observación cargada, usando
+        una consulta con JOIN al puntero (más una subconsulta única para las
+        ciudades a las que les falta el puntero), nunca una consulta por ciudad.
+        """
+        cities = list(cls.objects.filter(pk__in=city_ids).select_related("latest_observation"))
+
+        missing = [city for city in cities if city.latest_observation is None]
+        if missing:
+            latest = (
+                WeatherObservation.objects
+                .filter(city=OuterRef("pk"))
+                .order_by("-timestamp")
+                .values("pk")[:1]
+            )
+            latest_ids = (
+                cls.objects
+                .filter(pk__in=[city.pk for city in missing])
+                .annotate(latest_id=Subquery(latest))
+                .values("latest_id")
+            )
+            found = {obs.city_id: obs for obs in WeatherObservation.objects.filter(pk__in=latest_ids)}
+            for city in missing:
+                city.latest_observation = found.get(city.pk)
+                if city.latest_observation is not None:
+                    # Reparar el puntero para la próxima vez
+                    cls.objects.filter(pk=city.pk).update(latest_observation=city.latest_observation)
+
+        return cities
+
+    def refresh_latest_observation(self):
+        """
+        Recalcula el puntero consultando las observaciones (camino lento, solo
+        cuando falta el puntero). Devuelve la observación o None.
+        """
+        self.latest_observation = self.observations.order_by("-timestamp").first()
+        City.objects.filter(pk=self.pk).update(latest_observation=self.latest_observation)
+        return self.latest_observation
+
 
 class WeatherObservation(models.Model):
     # Modelo para observar y almacenar datos meteorológicos
@@ -60,6 +122,8 @@ class WeatherObservation(models.Model):
         # Índices para mejorar consultas
         indexes = [
             models.Index(fields=['-timestamp']),
+            # Última observación de una ciudad sin recorrer las del resto
+            models.Index(fields=['city', '-timestamp']),
         ]
     
 
@@ -84,6 +148,9 @@ class WeatherObservation(models.Model):
         # Índice de Calor (para temp >= 27°C)
         elif temp >= 27:
             hi = self.heat_index_calculator()
+            # Sin humedad no hay índice de calor: la sensación es la temperatura
+            if hi is None:
+                return temp
             return round(hi, 2)
         
         # Si no aplica ninguna fórmula, la sensación térmica es igual a la temperatura
@@ -152,4 +219,141 @@ class WeatherObservation(models.Model):
         if self.temperature >= 27:
             self.heat_index = self.heat_index_calculator()
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+        # Mantener el puntero a la observación más reciente de la ciudad
+        City.advance_latest_observation(self.city_id, self)
+
+
+class ForecastPoint(models.Model):
+    # Predicción precalculada por el job de refresco (ver refresh_forecasts)
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="forecast_points")
+    ts = models.DateTimeField(help_text="Instante previsto")
+    yhat = models.FloatField(help_text="Temperatura prevista en grados Celsius")
+    yhat_lower = models.FloatField(help_text="Límite inferior del intervalo")
+    yhat_upper = models.FloatField(help_text="Límite superior del intervalo")
+    # Versión del modelo que generó el punto (huella de los datos de entrenamiento)
+    model_version = models.CharField(max_length=64)
+    generated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Punto de Predicción"
+        verbose_name_plural = "Puntos de Predicción"
+        ordering = ['city', 'ts']
+        # La restricción única crea el índice (city, ts) que usa la lectura del endpoint
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'ts'], name='unique_forecast_point_per_city_ts'),
+        ]
+
+    def __str__(self):
+        return f"{self.city.name} @ {self.ts.strftime('%Y-%m-%d %H:%M')} -> {self.yhat:.2f}ºC ({self.model_version})"
+
+
+class ObservationRollup(models.Model):
+    # Agregados por ciudad y tramo de tiempo, mantenidos al ingerir (ver rollups.py)
+    RESOLUTION_HOUR = "hour"
+    RESOLUTION_DAY = "day"
+    RESOLUTION_MONTH = "month"
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_HOUR, "Hora"),
+        (RESOLUTION_DAY, "Día"),
+        (RESOLUTION_MONTH, "Mes"),
+    ]
+
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="rollups")
+    resolution = models.CharField(max_length=5, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField(help_text="Inicio del tramo (UTC)")
+
+    # Se guardan sumas y no medias para poder acumular de forma incremental
+    count = models.PositiveIntegerField(default=0)
+    temperature_min = models.FloatField()
+    temperature_max = models.FloatField()
+    temperature_sum = models.FloatField(default=0)
+    humidity_sum = models.FloatField(default=0)
+    pressure_sum = models.FloatField(default=0)
+    wind_speed_sum = models.FloatField(default=0)
+    wind_gust_max = models.FloatField(null=True, blank=True)
+    precipitation_sum = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Agregado de Observaciones"
+        verbose_name_plural = "Agregados de Observaciones"
+        ordering = ['city', 'resolution', 'bucket_start']
+        # La restricción única es también el índice de las lecturas por rango
+        constraints = [
+            models.UniqueConstraint(
+                fields=['city', 'resolution', 'bucket_start'],
+                name='unique_rollup_per_city_resolution_bucket',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.city.name} [{self.resolution}] {self.bucket_start.strftime('%Y-%m-%d %H:%M')} ({self.count} obs)"
+
+
+class PhotoCatalogEntry(models.Model):
+    # Catálogo de fotos del dashboard (ver photo_catalog.py). Los criterios en
+    # blanco valen para cualquier valor; entre las filas que encajan gana la de
+    # mayor prioridad y, a igualdad, la más específica. Varias filas ganadoras
+    # con los mismos criterios son variantes de la misma foto.
+    KIND_EMBLEM = "emblem"
+    KIND_CITY = "city"
+    KIND_CHOICES = [
+        (KIND_EMBLEM, "Emblemática (según el tiempo)"),
+        (KIND_CITY, "Ciudad"),
+    ]
+
+    DAYLIGHT_CHOICES = [
+        ("day", "Día"),
+        ("night", "Noche"),
+    ]
+
+    TEMPERATURE_BAND_CHOICES = [
+        ("heat", "Calor"),
+        ("mild", "Templado"),
+        ("freezing", "Helada"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    code = models.CharField(max_length=200, help_text="Nombre del archivo en el CDN")
+
+    # Fotos de ciudad: por ciudad concreta o por nombre (sin tildes ni mayúsculas)
+    city = models.ForeignKey(City, null=True, blank=True, on_delete=models.CASCADE, related_name="photos")
+    city_name = models.CharField(max_length=100, blank=True)
+
+    condition = models.CharField(max_length=40, blank=True, help_text="Código de condition (en blanco = cualquiera)")
+    daylight = models.CharField(max_length=5, blank=True, choices=DAYLIGHT_CHOICES)
+    temperature_band = models.CharField(max_length=10, blank=True, choices=TEMPERATURE_BAND_CHOICES)
+
+    priority = models.IntegerField(default=0)
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Foto del Catálogo"
+        verbose_name_plural = "Catálogo de Fotos"
+        ordering = ['kind', '-priority', 'id']
+
+    def __str__(self):
+        return f"[{self.kind}] {self.code}"
+
+
+class RetentionRun(models.Model):
+    # Registro de cada ejecución de apply_retention (ver retention.py).
+    # purged_before avanza mes a mes: por debajo ya no quedan observaciones en
+    # bruto y los agregados son la única fuente (rebuild_rollups no los toca).
+    cutoff = models.DateTimeField(help_text="Se purgan las observaciones anteriores (UTC)")
+    purged_before = models.DateTimeField(null=True, blank=True, help_text="Meses ya purgados hasta aquí")
+    observations_deleted = models.PositiveIntegerField(default=0)
+    observations_archived = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Ejecución de Retención"
+        verbose_name_plural = "Ejecuciones de Retención"
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Retención < {self.cutoff.strftime('%Y-%m-%d')} ({self.observations_deleted} borradas)"
@@ -0,0 +1,34 @@
+# backend/weather/parsers.py
+
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+from .ingest import InvalidRow
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parser para application/x-ndjson: un objeto JSON por línea.
+    Lee el cuerpo línea a línea; una línea inválida se convierte en InvalidRow
+    para que la vista la reporte sin descartar el resto del lote.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        reader = codecs.getreader(encoding)(stream)
+
+        rows = []
+        for line_number, line in enumerate(reader, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as exc:
+                rows.append(InvalidRow(f"Línea {line_number}: JSON inválido ({exc})"))
+        return rows
@@ -0,0 +1,191 @@
+# backend/weather/photo_catalog.py
+#
+# Índice en memoria del catálogo de fotos (modelo PhotoCatalogEntry).
+#
+# Al construirlo se resuelven de antemano todas las combinaciones de condición,
+# día/noche y franja de temperatura para cada "ámbito" (las fotos emblemáticas,
+# cada ciudad con fotos propias y las fotos genéricas de ciudad), aplicando
+# prioridad y especificidad. Elegir una foto en una petición es una búsqueda en
+# un dict, sin consultar la BD. Las condiciones que no aparecen en el catálogo
+# de un ámbito comparten la entrada "*" (solo filas sin condición).
+#
+# Como el índice espacial, cada proceso guarda el suyo y lo reconstruye cuando
+# cambia la versión del catálogo en la caché compartida (ver signals.py).
+
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from .models import PhotoCatalogEntry
+from .response_cache import get_cache, invalidate_scopes
+from .search import normalize_name
+
+DEFAULT_PHOTO_CODE = "default_city_01.jpg"
+
+DAYLIGHTS = ("day", "night")
+TEMPERATURE_BANDS = ("heat", "mild", "freezing")
+ANY_CONDITION = "*"
+
+_VERSION_KEY = "weather:photos:version"
+
+# Ámbito de response_cache de las respuestas que incluyen fotos
+PHOTO_CATALOG_SCOPE = "photos"
+
+Scope = Optional[Tuple[str, Hashable]]
+
+
+@dataclass
+class _Row:
+    code: str
+    condition: str
+    daylight: str
+    temperature_band: str
+    priority: int
+
+    def matches(self, condition: str, daylight: str, band: str) -> bool:
+        return (
+            self.condition in ("", condition)
+            and self.daylight in ("", daylight)
+            and self.temperature_band in ("", band)
+        )
+
+    @property
+    def specificity(self) -> int:
+        return bool(self.condition) + bool(self.daylight) + bool(self.temperature_band)
+
+
+@dataclass
+class ScopeRules:
+    """Fotos resueltas de un ámbito: (condición, día/noche, franja) -> variantes."""
+    conditions: FrozenSet[str]
+    table: Dict[Tuple[str, str, str], Tuple[str, ...]]
+
+    def get(self, condition: str, daylight: str, band: str) -> Tuple[str, ...]:
+        if condition not in self.conditions:
+            condition = ANY_CONDITION
+        return self.table.get((condition, daylight, band), ())
+
+
+def resolve_rules(rows: List[_Row]) -> ScopeRules:
+    conditions = frozenset(row.condition for row in rows if row.condition)
+    table = {}
+    for condition in conditions | {ANY_CONDITION}:
+        for daylight in DAYLIGHTS:
+            for band in TEMPERATURE_BANDS:
+                candidates = [row for row in rows if row.matches(condition, daylight, band)]
+                if not candidates:
+                    continue
+                best = max((row.priority, row.specificity) for row in candidates)
+                # Las empatadas son variantes (sin repetir, en orden de alta)
+                variants = dict.fromkeys(
+                    row.code for row in candidates if (row.priority, row.specificity) == best
+                )
+                table[(condition, daylight, band)] = tuple(variants)
+    return ScopeRules(conditions=conditions, table=table)
+
+
+class PhotoCatalog:
+    """Índice inmutable; se sustituye entero cuando cambia el catálogo."""
+
+    def __init__(self, rules: Dict[Tuple[str, Scope], ScopeRules]):
+        self._rules = rules
+
+    def __len__(self):
+        return len(self._rules)
+
+    def codes(self, kind: str, scope: Scope, condition: str, daylight: str, band: str) -> Tuple[str, ...]:
+        rules = self._rules.get((kind, scope))
+        return rules.get(condition, daylight, band) if rules is not None else ()
+
+    def emblem(self, condition: str, is_daytime: bool, band: str, variant: int = 0) -> str:
+        codes = self.codes(PhotoCatalogEntry.KIND_EMBLEM, None, condition, _daylight(is_daytime), band)
+        return codes[variant % len(codes)] if codes else DEFAULT_PHOTO_CODE
+
+    def city(
+        self,
+        city_id: Optional[int],
+        city_name: Optional[str],
+        condition: str,
+        is_daytime: bool,
+        band: str,
+        variant: int = 0,
+    ) -> str:
+        """Foto propia de la ciudad (por id y luego por nombre), o la genérica."""
+        scopes: List[Scope] = []
+        if city_id is not None:
+            scopes.append(("id", city_id))
+        if city_name:
+            scopes.append(("name", normalize_name(city_name)))
+        scopes.append(None)
+
+        daylight = _daylight(is_daytime)
+        for scope in scopes:
+            codes = self.codes(PhotoCatalogEntry.KIND_CITY, scope, condition, daylight, band)
+            if codes:
+                return codes[variant % len(codes)]
+        return DEFAULT_PHOTO_CODE
+
+
+def _daylight(is_daytime: bool) -> str:
+    return "day" if is_daytime else "night"
+
+
+def _scope(city_id: Optional[int], city_name: str) -> Scope:
+    if city_id is not None:
+        return ("id", city_id)
+    if city_name:
+        return ("name", normalize_name(city_name))
+    return None
+
+
+def build_photo_catalog() -> PhotoCatalog:
+    groups: Dict[Tuple[str, Scope], List[_Row]] = defaultdict(list)
+    entries = (
+        PhotoCatalogEntry.objects.filter(active=True)
+        .order_by("id")
+        .values_list("kind", "city_id", "city_name", "code", "condition", "daylight", "temperature_band", "priority")
+    )
+    for kind, city_id, city_name, code, condition, daylight, band, priority in entries:
+        scope = _scope(city_id, city_name) if kind == PhotoCatalogEntry.KIND_CITY else None
+        groups[(kind, scope)].append(
+            _Row(code, (condition or "").lower().strip(), daylight, band, priority)
+        )
+    return PhotoCatalog({key: resolve_rules(rows) for key, rows in groups.items()})
+
+
+_catalog: Optional[PhotoCatalog] = None
+_catalog_version = None
+_lock = threading.Lock()
+
+
+def catalog_version():
+    """Versión compartida del catálogo; cambia al crear, editar o borrar una foto."""
+    version = get_cache().get(_VERSION_KEY)
+    if version is None:
+        get_cache().add(_VERSION_KEY, time.time_ns(), None)
+        version = get_cache().get(_VERSION_KEY)
+    return version
+
+
+def get_photo_catalog() -> PhotoCatalog:
+    global _catalog, _catalog_version
+    version = catalog_version()
+    catalog = _catalog
+    if catalog is not None and _catalog_version == version:
+        return catalog
+
+    with _lock:
+        if _catalog is None or _catalog_version != version:
+            _catalog = build_photo_catalog()
+            _catalog_version = version
+        return _catalog
+
+
+def invalidate_photo_catalog() -> None:
+    """Todos los procesos rehacen el índice y se descartan las respuestas cacheadas con fotos."""
+    global _catalog
+    get_cache().set(_VERSION_KEY, time.time_ns(), None)
+    invalidate_scopes([PHOTO_CATALOG_SCOPE])
+    _catalog = None
@@ -1,55 +1,524 @@
-from typing import List, Dict
+import contextvars
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
 from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
 
-from .models import WeatherObservation
+from . import metrics
+from .forecast_engines import get_engine, regularize
+from .forecast_worker import fit_predict_job, fit_prophet, predict_points
+from .models import City, ForecastPoint, WeatherObservation
+from .model_cache import (
+    DEFAULT_VARIABLE,
+    aobservations_fingerprint,
+    get_or_fit_model,
+    lookup_model,
+    observations_fingerprint,
+    store_model,
+)
 
 
-def build_prophet_forecast(
+def training_window_days() -> int:
+    return getattr(settings, "FORECAST_TRAINING_WINDOW_DAYS", 90)
+
+
+def training_freq() -> str:
+    return getattr(settings, "FORECAST_TRAINING_FREQ", "H")
+
+
+def training_signature() -> str:
+    """Parámetros de la ventana de entrenamiento; forman parte de la huella del modelo."""
+    return f"window={training_window_days()}d|freq={training_freq() or 'raw'}"
+
+
+# Variables de WeatherObservation que se pueden predecir
+FORECAST_VARIABLES = (
+    "temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "precipitation",
+    "cloud_cover",
+)
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+def _empty_series() -> Series:
+    return np.array([], dtype="datetime64[us]"), np.array([], dtype=float)
+
+
+def _window_queryset(qs, last_ts):
+    window = training_window_days()
+    if window:
+        qs = qs.filter(timestamp__gte=last_ts - timedelta(days=window))
+    return qs.order_by("timestamp")
+
+
+def _series_from_rows(rows: Sequence[tuple], variables: Sequence[str]) -> Dict[str, Series]:
+    """Filas (timestamp, *variables) -> una serie remuestreada por variable."""
+    if not rows:
+        return {variable: _empty_series() for variable in variables}
+
+    columns = list(zip(*rows))
+    ds = np.array([ts.replace(tzinfo=None) for ts in columns[0]], dtype="datetime64[us]")
+    freq = training_freq()
+
+    series = {}
+    for variable, values in zip(variables, columns[1:]):
+        # None -> NaN al convertir a float
+        y = np.array(values, dtype=float)
+        present = ~np.isnan(y)
+        var_ds, y = ds[present], y[present]
+        if freq and len(y):
+            var_ds, y = regularize(var_ds, y, freq, fill_gaps=False)
+            var_ds = var_ds.astype("datetime64[us]")
+        series[variable] = (var_ds, y)
+    return series
+
+
+def load_training_arrays(city_id: int, variables: Sequence[str] = (DEFAULT_VARIABLE,)) -> Dict[str, Series]:
+    """
+    Histórico de la ciudad como arrays NumPy (ds naive en UTC, y), una serie por variable.
+
+    Solo se leen los últimos FORECAST_TRAINING_WINDOW_DAYS días (contados desde la
+    última observación, 0 = todo el histórico) y cada serie se remuestrea a
+    FORECAST_TRAINING_FREQ promediando por tramo. Así el coste del entrenamiento
+    queda acotado aunque la ciudad acumule años de datos.
+
+    Todas las variables salen de una única lectura y una sola conversión de
+    timestamps; los valores nulos se descartan por variable.
+    """
+    qs = WeatherObservation.objects.filter(city_id=city_id)
+    last_ts = None
+    if training_window_days():
+        last_ts = qs.aggregate(last_ts=Max("timestamp"))["last_ts"]
+        if last_ts is None:
+            return _series_from_rows([], variables)
+
+    # values_list -> arrays sin pasar por diccionarios ni DataFrame intermedio
+    rows = list(_window_queryset(qs, last_ts).values_list("timestamp", *variables))
+    return _series_from_rows(rows, variables)
+
+
+async def aload_training_arrays(city_id: int, variables: Sequence[str] = (DEFAULT_VARIABLE,)) -> Dict[str, Series]:
+    """Versión asíncrona de load_training_arrays (ORM asíncrono de Django)."""
+    qs = WeatherObservation.objects.filter(city_id=city_id)
+    last_ts = None
+    if training_window_days():
+        last_ts = (await qs.aaggregate(last_ts=Max("timestamp")))["last_ts"]
+        if last_ts is None:
+            return _series_from_rows([], variables)
+
+    rows = [row async for row in _window_queryset(qs, last_ts).values_list("timestamp", *variables)]
+    return _series_from_rows(rows, variables)
+
+
+def load_training_series(city_id: int, variable: str = DEFAULT_VARIABLE) -> Series:
+    """Serie de entrenamiento de una sola variable (ver load_training_arrays)."""
+    return load_training_arrays(city_id, (variable,))[variable]
+
+
+def _training_frame(series: Series) -> pd.DataFrame:
+    # Prophet espera ds (fecha naive) y y (valor)
+    ds, y = series
+    return pd.DataFrame({"ds": pd.to_datetime(ds), "y": y})
+
+
+def _load_training_frame(city_id: int, variable: str = DEFAULT_VARIABLE) -> pd.DataFrame:
+    return _training_frame(load_training_series(city_id, variable))
+
+
+def _with_training_signature(fingerprint: Optional[str]) -> Optional[str]:
+    if fingerprint is None:
+        return None
+    return f"{fingerprint}|{training_signature()}"
+
+
+def _training_fingerprint(city_id: int) -> Optional[str]:
+    return _with_training_signature(observations_fingerprint(city_id))
+
+
+async def _atraining_fingerprint(city_id: int) -> Optional[str]:
+    return _with_training_signature(await aobservations_fingerprint(city_id))
+
+
+def _fit_model(city_id: int, variable: str = DEFAULT_VARIABLE) -> Prophet:
+    return fit_prophet(_load_training_frame(city_id, variable))
+
+
+def build_forecast(
     city_id: int,
     periods: int = 24,
     freq: str = "H",
+    engine: str = "prophet",
 ) -> List[Dict]:
-    qs = (
-        WeatherObservation.objects
-        .filter(city_id=city_id)
-        .order_by("timestamp")
-    )
+    """
+    Predicción con el motor elegido (ver forecast_engines.ENGINES).
+    Prophet pasa por build_prophet_forecast para aprovechar la caché de modelos.
+    """
+    forecast_engine = get_engine(engine)
+    if forecast_engine.name == "prophet":
+        return build_prophet_forecast(city_id=city_id, periods=periods, freq=freq)
 
-    if not qs.exists():
+    ds, y = load_training_series(city_id)
+    if len(y) == 0:
         return []
+    return _engine_forecast(forecast_engine, ds, y, periods, freq)
 
-    df = pd.DataFrame.from_records(
-        qs.values("timestamp", "temperature"),
-        columns=["timestamp", "temperature"],
+
+def _engine_forecast(forecast_engine, ds, y, periods: int, freq: str, variable: str = DEFAULT_VARIABLE) -> List[Dict]:
+    # Los motores ligeros entrenan y predicen en la misma llamada: se mide entera
+    started = time.perf_counter()
+    points = forecast_engine.forecast(ds, y, periods, freq)
+    metrics.record_fit(time.perf_counter() - started, engine=forecast_engine.name, variable=variable)
+    return points
+
+
+def model_version(fingerprint: str) -> str:
+    """Identificador corto del modelo a partir de la huella de sus datos."""
+    return "prophet-" + hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+
+def _forecast_with_version(
+    city_id: int,
+    periods: int,
+    freq: str,
+) -> Tuple[List[Dict], Optional[str]]:
+    # Una agregación barata decide si hay datos y si el modelo cacheado sigue valiendo
+    fingerprint = _training_fingerprint(city_id)
+    if fingerprint is None:
+        return [], None
+
+    # Solo se lee la ventana de entrenamiento y se entrena si no hay modelo válido
+    model = get_or_fit_model(
+        city_id,
+        fingerprint,
+        fit=lambda: _fit_model(city_id),
     )
 
-    # Prophet espera ds (fecha) y y (valor)
-    df.rename(columns={"timestamp": "ds", "temperature": "y"}, inplace=True)
+    return predict_points(model, periods, freq), model_version(fingerprint)
 
-    # 👇 Quitar timezone de ds (Django usa aware datetimes, Prophet no los soporta)
-    df["ds"] = pd.to_datetime(df["ds"])
-    try:
-        df["ds"] = df["ds"].dt.tz_localize(None)
-    except TypeError:
-        # Si ya era naive, no pasa nada
-        pass
 
-    model = Prophet()
-    model.fit(df)
+def build_prophet_forecast(
+    city_id: int,
+    periods: int = 24,
+    freq: str = "H",
+) -> List[Dict]:
+    points, _ = _forecast_with_version(city_id, periods, freq)
+    return points
+
 
-    future = model.make_future_dataframe(periods=periods, freq=freq)
-    forecast = model.predict(future)
+def _variable_workers(workers: Optional[int], jobs: int) -> int:
+    if workers is None:
+        workers = getattr(settings, "FORECAST_VARIABLE_WORKERS", 0) or os.cpu_count() or 1
+    return max(1, min(workers, jobs))
 
-    result = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(periods)
+
+@dataclass
+class ForecastPlan:
+    """
+    Lo que una predicción multivariable necesita de la base de datos, ya leído.
+    - fingerprint: huella de los datos (solo Prophet; None si no hay observaciones)
+    - series: histórico de las variables que hay que entrenar
+    """
+    city_id: int
+    variables: List[str]
+    engine: str
+    fingerprint: Optional[str] = None
+    series: Dict[str, Series] = field(default_factory=dict)
+    empty: bool = False
+
+
+def _check_variables(variables: Sequence[str]) -> List[str]:
+    variables = list(dict.fromkeys(variables))
+    for variable in variables:
+        if variable not in FORECAST_VARIABLES:
+            raise ValueError(f"Variable no soportada: {variable}")
+    return variables
+
+
+def _pending_variables(plan: ForecastPlan) -> List[str]:
+    if plan.engine != "prophet":
+        return plan.variables
+    # Con Prophet solo se lee el histórico de las variables sin modelo cacheado válido
+    return [v for v in plan.variables if lookup_model(plan.city_id, plan.fingerprint, v) is None]
+
+
+def plan_multi_variable_forecast(city_id: int, variables: Sequence[str], engine: str = "prophet") -> ForecastPlan:
+    """Hace toda la E/S de base de datos de la predicción (ver run_forecast_plan)."""
+    plan = ForecastPlan(city_id=city_id, variables=_check_variables(variables), engine=get_engine(engine).name)
+    if plan.engine == "prophet":
+        plan.fingerprint = _training_fingerprint(city_id)
+        if plan.fingerprint is None:
+            plan.empty = True
+            return plan
+    pending = _pending_variables(plan)
+    if pending:
+        plan.series = load_training_arrays(city_id, pending)
+    return plan
+
+
+async def aplan_multi_variable_forecast(city_id: int, variables: Sequence[str], engine: str = "prophet") -> ForecastPlan:
+    """Versión asíncrona de plan_multi_variable_forecast."""
+    plan = ForecastPlan(city_id=city_id, variables=_check_variables(variables), engine=get_engine(engine).name)
+    if plan.engine == "prophet":
+        plan.fingerprint = await _atraining_fingerprint(city_id)
+        if plan.fingerprint is None:
+            plan.empty = True
+            return plan
+    # lookup_model puede leer el modelo de disco: fuera del bucle de eventos
+    pending = await sync_to_async(_pending_variables, thread_sensitive=False)(plan)
+    if pending:
+        plan.series = await aload_training_arrays(city_id, pending)
+    return plan
+
+
+def run_forecast_plan(
+    plan: ForecastPlan,
+    periods: int = 24,
+    freq: str = "H",
+    workers: Optional[int] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Entrena y predice a partir de un plan ya leído, sin tocar la base de datos.
+    Los modelos de las distintas variables se entrenan a la vez en un
+    ThreadPoolExecutor: Prophet pasa casi todo el entrenamiento en Stan, fuera del GIL.
+    """
+    if plan.empty:
+        return {variable: [] for variable in plan.variables}
+    forecast_engine = get_engine(plan.engine)
+    series = plan.series
+
+    def forecast_variable(variable: str) -> List[Dict]:
+        if forecast_engine.name != "prophet":
+            ds, y = series[variable]
+            return _engine_forecast(forecast_engine, ds, y, periods, freq, variable) if len(y) else []
+        if variable in series and len(series[variable][1]) < 2:
+            # Prophet necesita al menos dos valores no nulos
+            return []
+        model = get_or_fit_model(
+            plan.city_id,
+            plan.fingerprint,
+            # Si el modelo caducó entre la consulta y el entrenamiento, se lee aparte
+            fit=lambda: fit_prophet(
+                _training_frame(series[variable]) if variable in series
+                else _load_training_frame(plan.city_id, variable)
+            ),
+            variable=variable,
+        )
+        return predict_points(model, periods, freq)
+
+    # Cada hilo hereda el contexto de la petición (tiempos de Server-Timing)
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=_variable_workers(workers, len(plan.variables))) as executor:
+        results = executor.map(lambda variable: context.copy().run(forecast_variable, variable), plan.variables)
+        return dict(zip(plan.variables, results))
+
+
+def build_multi_variable_forecast(
+    city_id: int,
+    variables: Sequence[str],
+    periods: int = 24,
+    freq: str = "H",
+    engine: str = "prophet",
+    workers: Optional[int] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Predice varias variables de una ciudad en una sola llamada.
+
+    El histórico se lee una vez para todas las variables que lo necesitan (con
+    Prophet, solo las que no tienen modelo cacheado válido) y después se entrena
+    sin volver a la base de datos.
+    """
+    plan = plan_multi_variable_forecast(city_id, variables, engine)
+    return run_forecast_plan(plan, periods, freq, workers)
+
+
+def _forecast_rows(city_id: int, points: List[Dict], version: str, generated_at) -> List[ForecastPoint]:
+    return [
+        ForecastPoint(
+            city_id=city_id,
+            # Los ts de Prophet son naive en UTC
+            ts=datetime.fromisoformat(point["ts"]).replace(tzinfo=dt_timezone.utc),
+            yhat=point["yhat"],
+            yhat_lower=point["yhat_lower"],
+            yhat_upper=point["yhat_upper"],
+            model_version=version,
+            generated_at=generated_at,
+        )
+        for point in points
+    ]
+
+
+@dataclass
+class CityForecastResult:
+    """
+    Resultado del lote para una ciudad.
+    - refitted: True si hubo que entrenar (False si se reutilizó el modelo cacheado)
+    - version: None si la ciudad no tiene observaciones
+    """
+    city_id: int
+    points: List[Dict] = field(default_factory=list)
+    version: Optional[str] = None
+    refitted: bool = False
+    fit_seconds: float = 0.0
+    total_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _batch_workers(workers: Optional[int]) -> int:
+    if workers is None:
+        workers = getattr(settings, "FORECAST_BATCH_WORKERS", 0) or os.cpu_count() or 1
+    return max(1, workers)
+
+
+def build_forecasts_batch(
+    city_ids: Optional[Iterable[int]] = None,
+    periods: int = 24,
+    freq: str = "H",
+    workers: Optional[int] = None,
+    store: bool = True,
+) -> List[CityForecastResult]:
+    """
+    Predice muchas ciudades en paralelo con un ProcessPoolExecutor.
+
+    El proceso principal hace toda la E/S de base de datos (huellas, lectura del
+    histórico y escritura final en bloque); los workers solo entrenan y predicen.
+    Con workers=1 todo se ejecuta en el propio proceso.
+    """
+    if city_ids is None:
+        city_ids = City.objects.order_by("id").values_list("id", flat=True)
+
+    results: Dict[int, CityForecastResult] = {}
+    fingerprints: Dict[int, str] = {}
+    jobs = []
+    for city_id in city_ids:
+        results[city_id] = CityForecastResult(city_id=city_id)
+        fingerprint = _training_fingerprint(city_id)
+        if fingerprint is None:
+            continue
+        fingerprints[city_id] = fingerprint
+
+        cached = lookup_model(city_id, fingerprint)
+        metrics.record_cache("prophet_model", hit=cached is not None)
+        if cached is not None:
+            jobs.append(dict(city_id=city_id, cached_model_json=model_to_json(cached.model)))
+        else:
+            jobs.append(dict(city_id=city_id, df=_load_training_frame(city_id)))
+
+    workers = _batch_workers(workers)
+    if workers == 1 or len(jobs) <= 1:
+        job_results = [fit_predict_job(periods=periods, freq=freq, **job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [
+                executor.submit(fit_predict_job, periods=periods, freq=freq, **job)
+                for job in jobs
+            ]
+            job_results = [future.result() for future in futures]
+
+    for job in job_results:
+        result = results[job.city_id]
+        result.points = job.points
+        result.fit_seconds = job.fit_seconds
+        result.total_seconds = job.total_seconds
+        result.error = job.error
+        if job.error is not None:
+            continue
+        fingerprint = fingerprints[job.city_id]
+        result.version = model_version(fingerprint)
+        if job.model_json is not None:
+            result.refitted = True
+            metrics.record_fit(job.fit_seconds, engine="prophet")
+            store_model(job.city_id, fingerprint, model_from_json(job.model_json))
+
+    if store:
+        store_forecasts_bulk(results.values())
+    return list(results.values())
+
+
+def store_forecasts_bulk(results: Iterable[CityForecastResult]) -> int:
+    """
+    Escribe en una sola transacción las predicciones de un lote.
+    Las ciudades sin datos se vacían; las que fallaron conservan sus puntos anteriores.
+    """
+    generated_at = timezone.now()
+    replaced_ids = []
+    rows = []
+    for result in results:
+        if result.error is not None:
+            continue
+        replaced_ids.append(result.city_id)
+        if result.version is not None:
+            rows.extend(_forecast_rows(result.city_id, result.points, result.version, generated_at))
+
+    with transaction.atomic():
+        ForecastPoint.objects.filter(city_id__in=replaced_ids).delete()
+        ForecastPoint.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def precomputed_max_age() -> timedelta:
+    return timedelta(hours=getattr(settings, "FORECAST_PRECOMPUTED_MAX_AGE_HOURS", 6))
+
+
+def _precomputed_queryset(city_id: int, periods: int, now: Optional[datetime] = None):
+    # Solo puntos desde la hora en curso de una predicción reciente: si el job
+    # de refresco deja de ejecutarse, el endpoint vuelve al cálculo en vivo en
+    # lugar de servir horas ya pasadas de un modelo antiguo
+    now = now or timezone.now()
+    return (
+        ForecastPoint.objects
+        .filter(
+            city_id=city_id,
+            ts__gte=now.replace(minute=0, second=0, microsecond=0),
+            generated_at__gte=now - precomputed_max_age(),
+        )
+        .order_by("ts")
+        .values_list("ts", "yhat", "yhat_lower", "yhat_upper")[:periods]
+    )
+
+
+def _precomputed_points(rows: Sequence[tuple], periods: int) -> Optional[List[Dict]]:
+    if len(rows) < periods:
+        return None
 
     return [
         {
-            "ts": row["ds"].isoformat(),
-            "yhat": float(row["yhat"]),
-            "yhat_lower": float(row["yhat_lower"]),
-            "yhat_upper": float(row["yhat_upper"]),
+            # Mismo formato que el cálculo en vivo: ISO naive en UTC
+            "ts": timezone.make_naive(ts, dt_timezone.utc).isoformat(),
+            "yhat": yhat,
+            "yhat_lower": yhat_lower,
+            "yhat_upper": yhat_upper,
         }
-        for _, row in result.iterrows()
+        for ts, yhat, yhat_lower, yhat_upper in rows
     ]
+
+
+def get_precomputed_forecast(city_id: int, periods: int) -> Optional[List[Dict]]:
+    """
+    Lee los `periods` primeros puntos precalculados vigentes de la ciudad (desde la
+    hora en curso, generados hace menos de FORECAST_PRECOMPUTED_MAX_AGE_HOURS).
+    Devuelve None si no hay suficientes (el llamador usa entonces el cálculo en vivo).
+    """
+    return _precomputed_points(list(_precomputed_queryset(city_id, periods)), periods)
+
+
+async def aget_precomputed_forecast(city_id: int, periods: int) -> Optional[List[Dict]]:
+    """Versión asíncrona de get_precomputed_forecast."""
+    rows = [row async for row in _precomputed_queryset(city_id, periods)]
+    return _precomputed_points(rows, periods)
@@ -0,0 +1,220 @@
+# backend/weather/response_cache.py
+#
+# Caché de respuestas de los endpoints de clima actual / condiciones.
+# Usa el framework de caché de Django (locmem por defecto, Redis si se configura)
+# con una "versión" por ciudad: guardar una observación cambia la versión y deja
+# inaccesibles las entradas antiguas sin tener que buscarlas y borrarlas.
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+
+
+@dataclass
+class CachedPayload:
+    """
+    Entrada de la caché: cuerpo ya serializado + validadores HTTP.
+    - last_modified: epoch en segundos (None si el payload no tiene fecha)
+    """
+    data: dict
+    etag: str
+    last_modified: Optional[int]
+
+
+def get_cache():
+    return caches[getattr(settings, "WEATHER_CACHE_ALIAS", "default")]
+
+
+def _timeout() -> int:
+    return getattr(settings, "WEATHER_CACHE_TIMEOUT", 300)
+
+
+def city_scope(city_id: int) -> str:
+    return f"city:{city_id}"
+
+
+def name_scope(city_name: str) -> str:
+    # Misma normalización con la que search.find_city_id resuelve el nombre
+    # ("valencia" y "València" comparten ámbito). Import local: search depende
+    # de spatial, que importa este módulo.
+    from .search import normalize_name
+
+    return f"name:{normalize_name(city_name)}"
+
+
+def _version_key(scope: str) -> str:
+    return "weather:version:" + hashlib.md5(scope.encode()).hexdigest()
+
+
+def invalidate_scopes(scopes: Iterable[str]) -> None:
+    """Invalida todas las respuestas cacheadas que dependen de estos ámbitos."""
+    new_version = time.time_ns()
+    get_cache().set_many({_version_key(scope): new_version for scope in scopes}, None)
+
+
+def invalidate_city(city_id: int, city_name: Optional[str] = None) -> None:
+    scopes = [city_scope(city_id)]
+    if city_name:
+        scopes.append(name_scope(city_name))
+    invalidate_scopes(scopes)
+
+
+def invalidate_city_on_commit(city_id: int, city_name: Optional[str] = None) -> None:
+    """
+    Invalida al confirmar la transacción en curso (al momento si no hay). Antes
+    del commit una petición concurrente aún lee las filas antiguas y las
+    guardaría bajo la versión nueva hasta que caducasen.
+    """
+    transaction.on_commit(lambda: invalidate_city(city_id, city_name))
+
+
+def _versioned_key(view_name: str, scopes: List[str], versions: dict, key_parts: Iterable) -> str:
+    raw = "|".join(f"{scope}@{versions.get(_version_key(scope), 0)}" for scope in scopes)
+    raw += "|" + repr(tuple(key_parts))
+    return f"weather:{view_name}:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _entry_key(view_name: str, scopes: List[str], key_parts: Iterable) -> str:
+    versions = get_cache().get_many([_version_key(scope) for scope in scopes])
+    return _versioned_key(view_name, scopes, versions, key_parts)
+
+
+async def _aentry_key(view_name: str, scopes: List[str], key_parts: Iterable) -> str:
+    versions = await get_cache().aget_many([_version_key(scope) for scope in scopes])
+    return _versioned_key(view_name, scopes, versions, key_parts)
+
+
+def make_payload(data: dict, last_modified: Optional[float] = None) -> CachedPayload:
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return CachedPayload(
+        data=data,
+        etag=quote_etag(hashlib.md5(body.encode()).hexdigest()),
+        last_modified=int(last_modified) if last_modified is not None else None,
+    )
+
+
+def _not_modified(request, payload: CachedPayload) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        # If-None-Match manda sobre If-Modified-Since (RFC 9110)
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or payload.etag in candidates or f"W/{payload.etag}" in candidates
+
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    if if_modified_since is not None and payload.last_modified is not None:
+        return payload.last_modified <= if_modified_since
+    return False
+
+
+def _set_validators(response, payload: CachedPayload):
+    response["ETag"] = payload.etag
+    if payload.last_modified is not None:
+        response["Last-Modified"] = http_date(payload.last_modified)
+    # El cliente puede guardar la respuesta pero debe revalidarla en cada sondeo
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def conditional_response(request, payload: CachedPayload) -> Response:
+    """Devuelve 304 si el cliente ya tiene esta versión, o 200 con ETag/Last-Modified."""
+    if _not_modified(request, payload):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload.data, status=status.HTTP_200_OK)
+    return _set_validators(response, payload)
+
+
+def conditional_json_response(request, payload: CachedPayload) -> HttpResponse:
+    """Como conditional_response, pero para vistas de Django sin DRF (vistas async)."""
+    if _not_modified(request, payload):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload.data, encoder=DjangoJSONEncoder)
+    return _set_validators(response, payload)
+
+
+BuildResult = Union[Response, Tuple[dict, Optional[float]], Tuple[dict, Optional[float], Optional[int]]]
+
+
+def _payload_from_build(result: tuple) -> Tuple[CachedPayload, int]:
+    data, last_modified, *rest = result
+    timeout = _timeout()
+    if rest and rest[0] is not None:
+        timeout = max(1, min(timeout, int(rest[0])))
+    return make_payload(data, last_modified), timeout
+
+
+def cached_response(
+    request,
+    view_name: str,
+    scopes: List[str],
+    build: Callable[[], BuildResult],
+    key_parts: Iterable = (),
+) -> Response:
+    """
+    Sirve la respuesta desde la caché o la construye con `build()`.
+
+    - scopes: ámbitos de invalidación de los que depende la respuesta
+    - key_parts: parámetros de la petición que distinguen respuestas del mismo ámbito
+    - build: devuelve (data, last_modified_epoch) para respuestas cacheables,
+      opcionalmente con un tercer elemento: segundos máximos que vale la
+      respuesta (acota WEATHER_CACHE_TIMEOUT), o directamente un Response
+      (p.ej. un error) que no se cachea.
+    """
+    cache = get_cache()
+    key = _entry_key(view_name, scopes, key_parts)
+    payload = cache.get(key)
+    metrics.record_cache("response", hit=payload is not None)
+
+    if payload is None:
+        result = build()
+        if isinstance(result, Response):
+            return result
+        payload, timeout = _payload_from_build(result)
+        cache.set(key, payload, timeout)
+
+    return conditional_response(request, payload)
+
+
+AsyncBuildResult = Union[HttpResponse, Tuple[dict, Optional[float]], Tuple[dict, Optional[float], Optional[int]]]
+
+
+async def acached_response(
+    request,
+    view_name: str,
+    scopes: List[str],
+    build: Callable[[], Awaitable[AsyncBuildResult]],
+    key_parts: Iterable = (),
+) -> HttpResponse:
+    """
+    Versión asíncrona de cached_response para las vistas ASGI: `build` es una
+    corrutina y los errores se devuelven como HttpResponse (no se cachean).
+    Comparte claves con la versión síncrona, así que ambas vistas se reutilizan
+    la caché mutuamente.
+    """
+    cache = get_cache()
+    key = await _aentry_key(view_name, scopes, key_parts)
+    payload = await cache.aget(key)
+    metrics.record_cache("response", hit=payload is not None)
+
+    if payload is None:
+        result = await build()
+        if isinstance(result, HttpResponse):
+            return result
+        payload, timeout = _payload_from_build(result)
+        await cache.aset(key, payload, timeout)
+
+    return conditional_json_response(request, payload)
@@ -0,0 +1,206 @@
+# backend/weather/retention.py
+#
+# Política de retención de WeatherObservation: las observaciones en bruto se
+# guardan OBSERVATION_RETENTION_DAYS y las más antiguas solo sobreviven como
+# agregados horarios/diarios/mensuales (ObservationRollup) y, opcionalmente,
+# en ficheros Parquet por mes en disco.
+#
+# Se trabaja por meses completos, del más antiguo al más reciente, y en cada
+# mes: 1) se completan los agregados que falten, 2) se archiva a Parquet si se
+# pide y 3) se borra en lotes pequeños (una transacción por lote, para no
+# bloquear la tabla ni generar transacciones enormes). Tras cada mes se apunta
+# en RetentionRun.purged_before hasta dónde se ha purgado; rebuild_rollups no
+# recalcula por debajo de ese horizonte, porque ya no hay datos en bruto.
+#
+# Nunca se borra una observación a la que apunte City.latest_observation.
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .export import parquet_stream
+from .models import City, ObservationRollup, RetentionRun, WeatherObservation
+from .response_cache import invalidate_city
+from .rollups import bucket_start, next_month, rebuild_rollups
+
+
+@dataclass
+class MonthResult:
+    month: datetime
+    rollups_rebuilt: int = 0
+    archived: int = 0
+    archive_path: Optional[Path] = None
+    deleted: int = 0
+
+
+def retention_cutoff(days: int, now: Optional[datetime] = None) -> datetime:
+    """
+    Inicio del mes más antiguo que se conserva en bruto: se guardan al menos
+    `days` días (y como mucho un mes más, para purgar solo meses completos).
+    """
+    return bucket_start((now or timezone.now()) - timedelta(days=days), ObservationRollup.RESOLUTION_MONTH)
+
+
+def _latest_pointers():
+    return City.objects.filter(latest_observation__isnull=False).values("latest_observation_id")
+
+
+def purgeable(start: Optional[datetime], end: datetime):
+    """Observaciones de [start, end) que se pueden borrar (no son la última de su ciudad)."""
+    qs = WeatherObservation.objects.filter(timestamp__lt=end).exclude(id__in=_latest_pointers())
+    if start is not None:
+        qs = qs.filter(timestamp__gte=start)
+    return qs
+
+
+def months_to_purge(cutoff: datetime) -> List[Tuple[datetime, int]]:
+    """(mes, observaciones a borrar) de los meses anteriores a `cutoff` con algo que purgar."""
+    first = purgeable(None, cutoff).aggregate(first=Min("timestamp"))["first"]
+    if first is None:
+        return []
+
+    months = []
+    month = bucket_start(first, ObservationRollup.RESOLUTION_MONTH)
+    while month < cutoff:
+        count = purgeable(month, next_month(month)).count()
+        if count:
+            months.append((month, count))
+        month = next_month(month)
+    return months
+
+
+def ensure_rollups(month: datetime) -> int:
+    """
+    Recalcula los agregados del mes de las ciudades a las que les faltan
+    observaciones. Las que tienen menos observaciones que su agregado (mes a
+    medio purgar en una ejecución interrumpida) no se tocan: el agregado es
+    lo único completo que queda.
+    """
+    end = next_month(month)
+    raw = dict(
+        WeatherObservation.objects.filter(timestamp__gte=month, timestamp__lt=end)
+        .order_by()
+        .values("city_id")
+        .annotate(n=Count("id"))
+        .values_list("city_id", "n")
+    )
+    rolled = dict(
+        ObservationRollup.objects.filter(
+            resolution=ObservationRollup.RESOLUTION_MONTH, bucket_start=month
+        ).values_list("city_id", "count")
+    )
+    stale = [city_id for city_id, n in raw.items() if n > rolled.get(city_id, 0)]
+    if not stale:
+        return 0
+    return rebuild_rollups(city_ids=stale, start=month, end=end)
+
+
+def archive_month(month: datetime, directory: Path, chunk_size: int) -> Tuple[Optional[Path], int, Optional[int]]:
+    """
+    Escribe las observaciones purgables del mes en
+    directory/observations_<AAAA-MM>_<primer id>-<último id>.parquet (escritura
+    atómica). Devuelve (ruta, filas, último id archivado).
+    """
+    qs = purgeable(month, next_month(month))
+    bounds = qs.aggregate(first=Min("id"), last=Max("id"), n=Count("id"))
+    if not bounds["n"]:
+        return None, 0, None
+
+    # El rango de ids en el nombre evita pisar el archivo de una ejecución
+    # anterior (p.ej. observaciones que eran la última de su ciudad entonces)
+    qs = qs.filter(id__lte=bounds["last"])
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"observations_{month:%Y-%m}_{bounds['first']}-{bounds['last']}.parquet"
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        for chunk in parquet_stream(qs, chunk_size):
+            handle.write(chunk)
+    os.replace(tmp_path, path)
+    return path, bounds["n"], bounds["last"]
+
+
+def _delete_sql(n: int) -> str:
+    """
+    DELETE directo de `n` ids que respeta los punteros latest_observation.
+
+    Sin pasar por QuerySet.delete(): el Collector y las señales post_delete
+    harían una consulta y una invalidación por fila (se invalida una vez por
+    ciudad). Es seguro porque la única FK hacia WeatherObservation es
+    City.latest_observation (SET_NULL), y esas filas se excluyen aquí mismo;
+    si se añade otra FK hay que revisar este borrado.
+    """
+    quote = connection.ops.quote_name
+    observations = quote(WeatherObservation._meta.db_table)
+    cities = quote(City._meta.db_table)
+    pointer = quote(City._meta.get_field("latest_observation").column)
+    return (
+        f"DELETE FROM {observations} WHERE {quote('id')} IN ({', '.join(['%s'] * n)}) "
+        f"AND {quote('id')} NOT IN (SELECT {pointer} FROM {cities} WHERE {pointer} IS NOT NULL)"
+    )
+
+
+def delete_month(month: datetime, chunk_size: int, max_id: Optional[int] = None) -> int:
+    """Borra las observaciones purgables del mes en lotes de `chunk_size`."""
+    qs = purgeable(month, next_month(month))
+    if max_id is not None:
+        # Solo lo que se ha archivado
+        qs = qs.filter(id__lte=max_id)
+
+    deleted = 0
+    while True:
+        rows = list(qs.order_by("id").values_list("id", "city_id")[:chunk_size])
+        if not rows:
+            return deleted
+        ids = [row[0] for row in rows]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(_delete_sql(len(ids)), ids)
+            deleted += cursor.rowcount
+        for city_id in {row[1] for row in rows}:
+            invalidate_city(city_id)
+
+
+def apply_retention(
+    cutoff: datetime,
+    archive_dir: Optional[Path] = None,
+    chunk_size: int = 5000,
+) -> Iterator[MonthResult]:
+    """
+    Purga las observaciones anteriores a `cutoff` (inicio de mes) mes a mes y
+    devuelve el resultado de cada mes según se completa. Con archive_dir se
+    archivan a Parquet antes de borrarlas (requiere pyarrow).
+    """
+    run = RetentionRun.objects.create(cutoff=cutoff)
+    for month, _ in months_to_purge(cutoff):
+        result = MonthResult(month=month)
+        result.rollups_rebuilt = ensure_rollups(month)
+
+        max_id = None
+        if archive_dir is not None:
+            result.archive_path, result.archived, max_id = archive_month(month, archive_dir, chunk_size)
+
+        result.deleted = delete_month(month, chunk_size, max_id=max_id)
+
+        run.purged_before = next_month(month)
+        run.observations_deleted += result.deleted
+        run.observations_archived += result.archived
+        run.save(update_fields=["purged_before", "observations_deleted", "observations_archived"])
+        yield result
+
+    run.purged_before = max(run.purged_before or cutoff, cutoff)
+    run.finished_at = timezone.now()
+    run.save(update_fields=["purged_before", "finished_at"])
+
+
+def default_archive_dir() -> Path:
+    return Path(getattr(settings, "OBSERVATION_ARCHIVE_DIR", "observation_archive"))
+
+
+def default_retention_days() -> int:
+    return getattr(settings, "OBSERVATION_RETENTION_DAYS", 365)
@@ -0,0 +1,258 @@
+# backend/weather/rollups.py
+#
+# Agregados horarios / diarios / mensuales de WeatherObservation.
+# Se mantienen de forma incremental al ingerir (post_save y la ingesta en bloque)
+# y se pueden reconstruir desde las observaciones con rebuild_rollups().
+
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, Trunc
+
+from .models import ObservationRollup, RetentionRun, WeatherObservation
+
+RESOLUTIONS = (
+    ObservationRollup.RESOLUTION_HOUR,
+    ObservationRollup.RESOLUTION_DAY,
+    ObservationRollup.RESOLUTION_MONTH,
+)
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    """Inicio (UTC) del tramo al que pertenece `ts`."""
+    ts = ts.astimezone(dt_timezone.utc)
+    if resolution == ObservationRollup.RESOLUTION_HOUR:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if resolution == ObservationRollup.RESOLUTION_DAY:
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == ObservationRollup.RESOLUTION_MONTH:
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Resolución desconocida: {resolution}")
+
+
+def next_month(ts: datetime) -> datetime:
+    if ts.month == 12:
+        return ts.replace(year=ts.year + 1, month=1)
+    return ts.replace(month=ts.month + 1)
+
+
+@dataclass
+class _Partial:
+    # Agregado parcial de un tramo calculado en memoria antes de volcarlo
+    count: int = 0
+    temperature_min: float = float("inf")
+    temperature_max: float = float("-inf")
+    temperature_sum: float = 0.0
+    humidity_sum: float = 0.0
+    pressure_sum: float = 0.0
+    wind_speed_sum: float = 0.0
+    wind_gust_max: Optional[float] = None
+    precipitation_sum: float = 0.0
+
+    def add(self, obs: WeatherObservation) -> None:
+        self.count += 1
+        self.temperature_min = min(self.temperature_min, obs.temperature)
+        self.temperature_max = max(self.temperature_max, obs.temperature)
+        self.temperature_sum += obs.temperature
+        self.humidity_sum += obs.humidity or 0
+        self.pressure_sum += obs.pressure or 0
+        self.wind_speed_sum += obs.wind_speed or 0
+        self.precipitation_sum += obs.precipitation or 0
+        if obs.wind_gust is not None:
+            self.wind_gust_max = obs.wind_gust if self.wind_gust_max is None else max(self.wind_gust_max, obs.wind_gust)
+
+
+RollupKey = Tuple[int, str, datetime]
+
+
+def _apply_partial(key: RollupKey, partial: _Partial) -> None:
+    city_id, resolution, start = key
+    updates = {
+        "count": F("count") + partial.count,
+        "temperature_min": Least(F("temperature_min"), Value(partial.temperature_min)),
+        "temperature_max": Greatest(F("temperature_max"), Value(partial.temperature_max)),
+        "temperature_sum": F("temperature_sum") + partial.temperature_sum,
+        "humidity_sum": F("humidity_sum") + partial.humidity_sum,
+        "pressure_sum": F("pressure_sum") + partial.pressure_sum,
+        "wind_speed_sum": F("wind_speed_sum") + partial.wind_speed_sum,
+        "precipitation_sum": F("precipitation_sum") + partial.precipitation_sum,
+    }
+    if partial.wind_gust_max is not None:
+        gust = Value(partial.wind_gust_max)
+        # En SQLite GREATEST(NULL, x) es NULL: partir de x si aún no había ráfaga
+        updates["wind_gust_max"] = Greatest(Coalesce(F("wind_gust_max"), gust), gust)
+
+    qs = ObservationRollup.objects.filter(city_id=city_id, resolution=resolution, bucket_start=start)
+    if qs.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            ObservationRollup.objects.create(
+                city_id=city_id,
+                resolution=resolution,
+                bucket_start=start,
+                count=partial.count,
+                temperature_min=partial.temperature_min,
+                temperature_max=partial.temperature_max,
+                temperature_sum=partial.temperature_sum,
+                humidity_sum=partial.humidity_sum,
+                pressure_sum=partial.pressure_sum,
+                wind_speed_sum=partial.wind_speed_sum,
+                wind_gust_max=partial.wind_gust_max,
+                precipitation_sum=partial.precipitation_sum,
+            )
+    except IntegrityError:
+        # Otra ingesta creó el tramo a la vez: acumular sobre él
+        qs.update(**updates)
+
+
+def add_to_rollups(
+    observations: Iterable[WeatherObservation],
+    resolutions: Sequence[str] = RESOLUTIONS,
+) -> int:
+    """
+    Acumula observaciones nuevas en sus tramos. Agrupa primero en memoria, así
+    que un lote de miles de filas cuesta una escritura por tramo, no por fila.
+    Devuelve el número de tramos tocados.
+    """
+    partials: Dict[RollupKey, _Partial] = {}
+    for obs in observations:
+        for resolution in resolutions:
+            key = (obs.city_id, resolution, bucket_start(obs.timestamp, resolution))
+            partials.setdefault(key, _Partial()).add(obs)
+
+    with transaction.atomic():
+        for key, partial in partials.items():
+            _apply_partial(key, partial)
+    return len(partials)
+
+
+def retention_horizon() -> Optional[datetime]:
+    """Fecha por debajo de la cual retention.py ya purgó las observaciones en bruto."""
+    return RetentionRun.objects.aggregate(horizon=Max("purged_before"))["horizon"]
+
+
+# Ciudades por transacción al reconstruir un mes (744 tramos horarios + 31
+# diarios + 1 mensual por ciudad): acota la memoria y la duración de cada
+# transacción sea cual sea el tamaño de la tabla
+REBUILD_CITY_BATCH = 200
+
+
+def _bucket_rows(observations) -> Iterator[ObservationRollup]:
+    """Agregados de todas las resoluciones calculados en la BD a partir de `observations`."""
+    for resolution in RESOLUTIONS:
+        buckets = (
+            observations
+            .order_by()
+            .annotate(bucket=Trunc("timestamp", resolution, tzinfo=dt_timezone.utc))
+            .values("city_id", "bucket")
+            .annotate(
+                n=Count("id"),
+                t_min=Min("temperature"),
+                t_max=Max("temperature"),
+                t_sum=Sum("temperature"),
+                h_sum=Sum("humidity"),
+                p_sum=Sum("pressure"),
+                w_sum=Sum("wind_speed"),
+                g_max=Max("wind_gust"),
+                pr_sum=Sum("precipitation"),
+            )
+        )
+        for b in buckets.iterator():
+            yield ObservationRollup(
+                city_id=b["city_id"],
+                resolution=resolution,
+                bucket_start=b["bucket"],
+                count=b["n"],
+                temperature_min=b["t_min"],
+                temperature_max=b["t_max"],
+                temperature_sum=b["t_sum"],
+                humidity_sum=b["h_sum"] or 0,
+                pressure_sum=b["p_sum"] or 0,
+                wind_speed_sum=b["w_sum"] or 0,
+                wind_gust_max=b["g_max"],
+                precipitation_sum=b["pr_sum"] or 0,
+            )
+
+
+def _months(observations, rollups, start: Optional[datetime], end: Optional[datetime]) -> List[datetime]:
+    """Inicios de mes entre start y end; sin límites, los que abarcan observaciones y agregados."""
+    if start is None or end is None:
+        obs_bounds = observations.aggregate(first=Min("timestamp"), last=Max("timestamp"))
+        rollup_bounds = rollups.aggregate(first=Min("bucket_start"), last=Max("bucket_start"))
+        if start is None:
+            firsts = [ts for ts in (obs_bounds["first"], rollup_bounds["first"]) if ts is not None]
+            if not firsts:
+                return []
+            start = bucket_start(min(firsts), ObservationRollup.RESOLUTION_MONTH)
+        if end is None:
+            lasts = [ts for ts in (obs_bounds["last"], rollup_bounds["last"]) if ts is not None]
+            if not lasts:
+                return []
+            end = next_month(bucket_start(max(lasts), ObservationRollup.RESOLUTION_MONTH))
+
+    months = []
+    month = start
+    while month < end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def rebuild_rollups(
+    city_ids: Optional[Iterable[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> int:
+    """
+    Recalcula los agregados desde las observaciones (p.ej. tras editar o borrar
+    filas). El rango se amplía a meses completos para que ningún tramo quede a medias.
+    Devuelve el número de tramos escritos.
+
+    Se procesa mes a mes y por lotes de REBUILD_CITY_BATCH ciudades, cada lote en
+    su propia transacción: una reconstrucción completa no carga la tabla entera
+    en memoria ni mantiene abierta una transacción enorme.
+
+    No baja del horizonte de retención (ver retention.py): por debajo ya no hay
+    observaciones en bruto y los agregados son lo único que queda.
+    """
+    horizon = retention_horizon()
+    if horizon is not None and (start is None or start < horizon):
+        start = horizon
+    if start is not None and end is not None and start >= end:
+        return 0
+
+    observations = WeatherObservation.objects.all()
+    rollups = ObservationRollup.objects.all()
+    if city_ids is not None:
+        city_ids = list(city_ids)
+        observations = observations.filter(city_id__in=city_ids)
+        rollups = rollups.filter(city_id__in=city_ids)
+    if start is not None:
+        start = bucket_start(start, ObservationRollup.RESOLUTION_MONTH)
+    if end is not None:
+        aligned_end = bucket_start(end, ObservationRollup.RESOLUTION_MONTH)
+        end = aligned_end if aligned_end == end.astimezone(dt_timezone.utc) else next_month(aligned_end)
+
+    written = 0
+    for month in _months(observations, rollups, start, end):
+        month_end = next_month(month)
+        month_observations = observations.filter(timestamp__gte=month, timestamp__lt=month_end)
+        month_rollups = rollups.filter(bucket_start__gte=month, bucket_start__lt=month_end)
+        # Ciudades con observaciones o con agregados (que quizá sobren) en el mes
+        month_cities = sorted(
+            set(month_observations.order_by().values_list("city_id", flat=True).distinct())
+            | set(month_rollups.order_by().values_list("city_id", flat=True).distinct())
+        )
+        for position in range(0, len(month_cities), REBUILD_CITY_BATCH):
+            batch = month_cities[position:position + REBUILD_CITY_BATCH]
+            rows = list(_bucket_rows(month_observations.filter(city_id__in=batch)))
+            with transaction.atomic():
+                month_rollups.filter(city_id__in=batch).delete()
+                ObservationRollup.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+    return written
@@ -0,0 +1,128 @@
+# backend/weather/search.py
+#
+# Búsqueda de ciudades por prefijo para el autocompletado del dashboard.
+#
+# Índice en memoria con dos listas ordenadas de claves normalizadas (minúsculas,
+# sin tildes ni signos): el nombre completo y cada palabra a partir de la
+# segunda ("coruna" encuentra "A Coruña"). Un prefijo es un rango contiguo de
+# una lista ordenada, así que bisect lo localiza en O(log n) y solo se recorren
+# los k primeros resultados. Se reconstruye con la misma versión compartida de
+# ciudades que el índice espacial (ver spatial.py).
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .models import City
+from .spatial import cities_version
+
+_SEPARATORS = re.compile(r"[\s\-'’.,/()]+")
+
+
+def normalize_name(value: str) -> str:
+    """"València" -> "valencia", "Vitoria-Gasteiz" -> "vitoria gasteiz"."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_marks = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_SEPARATORS.split(without_marks.casefold())).strip()
+
+
+@dataclass(frozen=True)
+class CityMatch:
+    id: int
+    name: str
+    latitud: float
+    longitud: float
+
+
+class CitySearchIndex:
+    """Índice inmutable; se sustituye entero cuando cambian las ciudades."""
+
+    def __init__(self, cities: List[CityMatch]):
+        self.cities = {city.id: city for city in cities}
+        names: List[Tuple[str, int]] = []
+        words: List[Tuple[str, int]] = []
+        for city in cities:
+            key = normalize_name(city.name)
+            names.append((key, city.id))
+            parts = key.split(" ")
+            for position in range(1, len(parts)):
+                words.append((" ".join(parts[position:]), city.id))
+        self._names = sorted(names)
+        self._words = sorted(words)
+
+    def __len__(self):
+        return len(self.cities)
+
+    @staticmethod
+    def _prefix_range(keys: List[Tuple[str, int]], prefix: str):
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys) and keys[position][0].startswith(prefix):
+            yield keys[position]
+            position += 1
+
+    def find(self, name: str) -> Optional[int]:
+        """Id de la ciudad con ese nombre normalizado (la de menor id si se repite)."""
+        key = normalize_name(name)
+        position = bisect_left(self._names, (key,))
+        if position < len(self._names) and self._names[position][0] == key:
+            return self._names[position][1]
+        return None
+
+    def search(self, query: str, limit: int = 10) -> List[CityMatch]:
+        """
+        Hasta `limit` ciudades cuyo nombre, o alguna de sus palabras, empieza por
+        `query`. Primero las que coinciden desde el principio del nombre; dentro
+        de cada grupo, en orden alfabético (los nombres más cortos primero).
+        """
+        prefix = normalize_name(query)
+        if not prefix or limit < 1:
+            return []
+
+        found: List[CityMatch] = []
+        seen = set()
+        for keys in (self._names, self._words):
+            for _, city_id in self._prefix_range(keys, prefix):
+                if city_id not in seen:
+                    seen.add(city_id)
+                    found.append(self.cities[city_id])
+                    if len(found) == limit:
+                        return found
+        return found
+
+
+_index: Optional[CitySearchIndex] = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def build_search_index() -> CitySearchIndex:
+    return CitySearchIndex([
+        CityMatch(*row)
+        for row in City.objects.values_list("id", "name", "latitud", "longitud")
+    ])
+
+
+def get_search_index() -> CitySearchIndex:
+    global _index, _index_version
+    version = cities_version()
+    index = _index
+    if index is not None and _index_version == version:
+        return index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            _index = build_search_index()
+            _index_version = version
+        return _index
+
+
+def search_cities(query: str, limit: int = 10) -> List[CityMatch]:
+    return get_search_index().search(query, limit)
+
+
+def find_city_id(name: str) -> Optional[int]:
+    """Resuelve un nombre de ciudad (sin distinguir mayúsculas ni tildes) sin consultar la BD."""
+    return get_search_index().find(name)
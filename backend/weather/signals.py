@@ -0,0 +1,58 @@
+# backend/weather/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .live import publish_latest_observations
+from .models import City, PhotoCatalogEntry, WeatherObservation
+from .photo_catalog import invalidate_photo_catalog
+from .response_cache import invalidate_city_on_commit
+from .rollups import add_to_rollups
+from .spatial import invalidate_city_index
+
+
+@receiver(post_save, sender=WeatherObservation)
+@receiver(post_delete, sender=WeatherObservation)
+def invalidate_city_responses(sender, instance, **kwargs):
+    # Una observación nueva/modificada/borrada cambia el clima actual de su ciudad
+    try:
+        city_name = instance.city.name
+    except City.DoesNotExist:
+        # Borrado en cascada de la ciudad
+        city_name = None
+    invalidate_city_on_commit(instance.city_id, city_name)
+
+
+@receiver(post_save, sender=WeatherObservation)
+def add_observation_to_rollups(sender, instance, created, **kwargs):
+    # Solo las altas; ediciones y borrados se corrigen con rebuild_rollups
+    if created:
+        add_to_rollups([instance])
+
+
+@receiver(post_save, sender=WeatherObservation)
+def publish_live_update(sender, instance, **kwargs):
+    # Empuja el nuevo clima actual a los clientes conectados por SSE (ver live.py)
+    publish_latest_observations([instance])
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_city_on_change(sender, instance, **kwargs):
+    invalidate_city_on_commit(instance.pk, instance.name)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_city_indexes(sender, instance, update_fields=None, **kwargs):
+    # Índices en memoria (espacial y de búsqueda); los guardados parciales que
+    # no tocan nombre ni coordenadas no los cambian
+    if update_fields is not None and not {"name", "latitud", "longitud"} & set(update_fields):
+        return
+    invalidate_city_index()
+
+
+@receiver(post_save, sender=PhotoCatalogEntry)
+@receiver(post_delete, sender=PhotoCatalogEntry)
+def invalidate_photo_catalog_on_change(sender, instance, **kwargs):
+    invalidate_photo_catalog()
@@ -0,0 +1,111 @@
+# backend/weather/solar.py
+#
+# Orto, ocaso y mediodía solar con las aproximaciones de la NOAA ("General
+# Solar Position Calculations"): error de un par de minutos, suficiente para
+# decidir si es de día o de noche. Todo acepta arrays de NumPy, así que se
+# calcula a la vez para muchas ciudades y muchos días.
+#
+# Los tiempos se devuelven en minutos UTC desde la medianoche UTC del día
+# pedido; pueden salir de [0, 1440) en longitudes lejanas (p.ej. el ocaso de
+# Honolulu cae en el día UTC siguiente). NaN cuando el sol no sale o no se
+# pone ese día (noche o día polar).
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+
+# Refracción atmosférica + radio del disco solar: el sol "sale" a -0.833º
+SUNRISE_ZENITH = np.radians(90.833)
+
+MINUTES_PER_DAY = 1440
+
+
+@dataclass
+class SunTimes:
+    """Arrays con la forma difundida de (latitudes, longitudes, días)."""
+    sunrise: np.ndarray
+    sunset: np.ndarray
+    solar_noon: np.ndarray
+    # +1 día polar (sol todo el día), -1 noche polar, 0 día normal
+    polar: np.ndarray
+
+
+def day_of_year(dates) -> np.ndarray:
+    """Día del año (1..366) de fechas datetime64 o date."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    return (days - days.astype("datetime64[Y]")).astype(int) + 1
+
+
+def _equation_and_declination(doy):
+    # Fracción de año en radianes, a mediodía
+    gamma = 2 * np.pi / 365 * (np.asarray(doy, dtype=float) - 1)
+    equation_of_time = 229.18 * (
+        0.000075
+        + 0.001868 * np.cos(gamma)
+        - 0.032077 * np.sin(gamma)
+        - 0.014615 * np.cos(2 * gamma)
+        - 0.040849 * np.sin(2 * gamma)
+    )
+    declination = (
+        0.006918
+        - 0.399912 * np.cos(gamma)
+        + 0.070257 * np.sin(gamma)
+        - 0.006758 * np.cos(2 * gamma)
+        + 0.000907 * np.sin(2 * gamma)
+        - 0.002697 * np.cos(3 * gamma)
+        + 0.00148 * np.sin(3 * gamma)
+    )
+    return equation_of_time, declination
+
+
+def sun_times(latitudes, longitudes, doy) -> SunTimes:
+    """
+    Orto/ocaso/mediodía (minutos UTC) para latitudes/longitudes en grados y
+    días del año; las entradas se difunden entre sí como en cualquier ufunc.
+    """
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.asarray(longitudes, dtype=float)
+    equation_of_time, declination = _equation_and_declination(doy)
+
+    cos_hour_angle = (
+        np.cos(SUNRISE_ZENITH) / (np.cos(latitudes) * np.cos(declination))
+        - np.tan(latitudes) * np.tan(declination)
+    )
+    polar = np.where(cos_hour_angle > 1, -1, np.where(cos_hour_angle < -1, 1, 0))
+    hour_angle = np.degrees(np.arccos(np.clip(cos_hour_angle, -1, 1)))
+    hour_angle = np.where(polar == 0, hour_angle, np.nan)
+
+    solar_noon = 720 - 4 * longitudes - equation_of_time
+    return SunTimes(
+        sunrise=solar_noon - 4 * hour_angle,
+        sunset=solar_noon + 4 * hour_angle,
+        solar_noon=solar_noon + np.zeros_like(hour_angle),
+        polar=polar,
+    )
+
+
+def daytime_mask(sunrise, sunset, polar, minutes) -> np.ndarray:
+    """
+    True donde `minutes` (minutos UTC del día) cae entre orto y ocaso. Se compara
+    en aritmética modular para que un ocaso pasada la medianoche UTC funcione.
+    """
+    minutes = np.asarray(minutes, dtype=float)
+    with np.errstate(invalid="ignore"):
+        since_sunrise = np.mod(minutes - sunrise, MINUTES_PER_DAY)
+        inside = since_sunrise < (sunset - sunrise)
+    return np.where(polar == 0, inside, polar > 0)
+
+
+def is_daytime(latitude: float, longitude: float, when: datetime) -> bool:
+    """¿Está el sol sobre el horizonte en ese lugar y momento?"""
+    when = when.astimezone(dt_timezone.utc)
+    times = sun_times(latitude, longitude, day_of_year(np.datetime64(when.date())))
+    minutes = when.hour * 60 + when.minute + when.second / 60
+    return bool(daytime_mask(times.sunrise, times.sunset, times.polar, minutes))
+
+
+def minutes_to_datetime(day: date, minutes: float) -> datetime:
+    """Minutos UTC del día `day` -> datetime UTC (para mostrar orto/ocaso)."""
+    base = datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+    return base + timedelta(seconds=round(float(minutes) * 60))
@@ -0,0 +1,170 @@
+# backend/weather/spatial.py
+#
+# Índice espacial en memoria de las ciudades para resolver coordenadas GPS a la
+# ciudad más cercana sin recorrer la tabla calculando haversine en Python.
+#
+# Es un KD-tree sobre los puntos proyectados en la esfera unidad (x, y, z): la
+# distancia euclídea entre esos puntos (cuerda) crece igual que la distancia
+# sobre la superficie, así que el árbol no sufre con el antimeridiano ni con los
+# polos y la distancia en km sale directamente de la cuerda.
+#
+# Cada proceso guarda su propio índice y lo reconstruye cuando cambia la
+# "versión" de las ciudades en la caché compartida (igual que response_cache),
+# de modo que una ciudad creada en un worker se ve en todos.
+
+import heapq
+import math
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import City
+from .response_cache import get_cache
+
+EARTH_RADIUS_KM = 6371.0088
+
+_VERSION_KEY = "weather:spatial:version"
+
+
+def to_unit_vectors(latitudes, longitudes) -> np.ndarray:
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+class CityIndex:
+    """
+    KD-tree inmutable de ciudades. Los nodos van en listas paralelas (punto,
+    eje, hijo izquierdo, hijo derecho) para que la búsqueda sea Python puro
+    sobre tuplas, sin objetos por nodo.
+    """
+
+    def __init__(self, city_ids: Sequence[int], latitudes: Sequence[float], longitudes: Sequence[float]):
+        self.city_ids = list(city_ids)
+        self.latitudes = np.asarray(latitudes, dtype=float)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        points = to_unit_vectors(self.latitudes, self.longitudes)
+
+        self._points: List[Tuple[float, float, float]] = []
+        self._items: List[int] = []  # posición en city_ids
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(points, np.arange(len(self.city_ids)))
+
+    def __len__(self):
+        return len(self.city_ids)
+
+    def _build(self, points: np.ndarray, items: np.ndarray) -> int:
+        if len(items) == 0:
+            return -1
+        # Partir por el eje de mayor extensión en este subconjunto
+        subset = points[items]
+        axis = int(np.argmax(subset.max(axis=0) - subset.min(axis=0)))
+        order = items[np.argsort(subset[:, axis], kind="stable")]
+        middle = len(order) // 2
+
+        node = len(self._items)
+        self._items.append(int(order[middle]))
+        self._points.append(tuple(points[order[middle]].tolist()))
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(points, order[:middle])
+        self._right[node] = self._build(points, order[middle + 1:])
+        return node
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[int, float]]:
+        """Las `k` ciudades más cercanas como [(city_id, distancia_km)], de menor a mayor."""
+        if self._root < 0 or k < 1:
+            return []
+        target = tuple(to_unit_vectors([latitude], [longitude])[0].tolist())
+        best: List[Tuple[float, int]] = []  # montículo de máximos: (-distancia², item)
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            point = self._points[node]
+            dist2 = (
+                (point[0] - target[0]) ** 2
+                + (point[1] - target[1]) ** 2
+                + (point[2] - target[2]) ** 2
+            )
+            if len(best) < k:
+                heapq.heappush(best, (-dist2, self._items[node]))
+            elif dist2 < -best[0][0]:
+                heapq.heapreplace(best, (-dist2, self._items[node]))
+
+            diff = target[self._axis[node]] - point[self._axis[node]]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            # El lado lejano solo puede mejorar si el plano de corte está más cerca que el peor candidato
+            if far >= 0 and (len(best) < k or diff * diff < -best[0][0]):
+                stack.append(far)
+            if near >= 0:
+                stack.append(near)
+
+        return [
+            (self.city_ids[item], chord_to_km(math.sqrt(-neg_dist2)))
+            for neg_dist2, item in sorted(best, reverse=True)
+        ]
+
+
+_index: Optional[CityIndex] = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def build_city_index() -> CityIndex:
+    rows = list(City.objects.order_by("id").values_list("id", "latitud", "longitud"))
+    return CityIndex(
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+    )
+
+
+def cities_version():
+    """Versión compartida de las ciudades; cambia al crear, mover o borrar una."""
+    version = get_cache().get(_VERSION_KEY)
+    if version is None:
+        # Caché vaciada o expulsada: no se sabe qué cambió, empezar una versión nueva
+        get_cache().add(_VERSION_KEY, time.time_ns(), None)
+        version = get_cache().get(_VERSION_KEY)
+    return version
+
+
+def get_city_index() -> CityIndex:
+    """Índice de este proceso, reconstruido si otra parte cambió las ciudades."""
+    global _index, _index_version
+    version = cities_version()
+    index = _index
+    if index is not None and _index_version == version:
+        return index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            _index = build_city_index()
+            _index_version = version
+        return _index
+
+
+def invalidate_city_index() -> None:
+    """
+    Cambia la versión de las ciudades: todos los procesos rehacen este índice y
+    los que dependen de ella (search.py, interpolation.py). Ver signals.py.
+    """
+    global _index
+    get_cache().set(_VERSION_KEY, time.time_ns(), None)
+    _index = None
+
+
+def nearest_city(latitude: float, longitude: float) -> Optional[Tuple[int, float]]:
+    """(city_id, distancia_km) de la ciudad más cercana, o None si no hay ciudades."""
+    found = get_city_index().nearest(latitude, longitude)
+    return found[0] if found else None
@@ -0,0 +1,387 @@
+# backend/weather/synthetic.py
+#
+# Generación vectorizada (NumPy) de datos meteorológicos sintéticos pero
+# verosímiles para pruebas de carga, benchmarks y planificación de capacidad:
+# ciclos diario y estacional de temperatura, frentes que duran días, y
+# humedad / presión / viento / lluvia correlacionados con ellos.
+#
+# Todo se calcula sobre matrices (ciudades x horas) y las observaciones se
+# insertan por bloques directamente en la tabla (create_cities / write_observations).
+# Lo usan el comando generate_observations y benchmark_api.
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .derived_fields import DERIVED_FIELDS, compute_derived_fields
+from .models import City, ObservationRollup, WeatherObservation
+from .response_cache import city_scope, invalidate_scopes
+from .rollups import RESOLUTIONS, bucket_start
+from .spatial import invalidate_city_index
+
+# Caja aproximada de la península ibérica: (lat_min, lat_max, lon_min, lon_max)
+DEFAULT_BBOX = (36.0, 43.8, -9.3, 3.3)
+
+# Gradiente térmico vertical estándar (ºC por metro)
+LAPSE_RATE = 0.0065
+
+# Nombres para las primeras ciudades (el resto se numeran)
+CITY_NAMES = (
+    "Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao", "Zaragoza", "Málaga",
+    "Murcia", "Palma", "Valladolid", "Vigo", "Gijón", "A Coruña", "Granada",
+    "Vitoria-Gasteiz", "Alicante", "Córdoba", "Pamplona", "Santander", "Salamanca",
+)
+
+OBSERVATION_FIELDS = (
+    "temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "wind_direction",
+    "wind_gust",
+    "precipitation",
+    "visibility",
+    "cloud_cover",
+)
+
+
+def city_names(count: int, offset: int = 0) -> List[str]:
+    return [
+        CITY_NAMES[i] if i < len(CITY_NAMES) else f"Ciudad {i:05d}"
+        for i in range(offset, offset + count)
+    ]
+
+
+def free_city_names(count: int, lookup_batch: int = 500) -> List[str]:
+    """
+    Los `count` primeros nombres de city_names que no usa ya ninguna ciudad:
+    relanzar el generador añade ciudades nuevas en vez de duplicar "Madrid".
+    """
+    names: List[str] = []
+    offset = 0
+    while len(names) < count:
+        candidates = city_names(min(count - len(names), lookup_batch), offset)
+        taken = set(City.objects.filter(name__in=candidates).values_list("name", flat=True))
+        names.extend(name for name in candidates if name not in taken)
+        offset += len(candidates)
+    return names
+
+
+@dataclass
+class CityProfiles:
+    """Clima de referencia de cada ciudad (un array por atributo, misma longitud)."""
+    latitud: np.ndarray
+    longitud: np.ndarray
+    altitud: np.ndarray
+    mean_temperature: np.ndarray
+    seasonal_amplitude: np.ndarray
+    diurnal_amplitude: np.ndarray
+    mean_humidity: np.ndarray
+    mean_wind: np.ndarray
+
+    def __len__(self):
+        return len(self.latitud)
+
+    def slice(self, start: int, stop: int) -> "CityProfiles":
+        return CityProfiles(**{name: values[start:stop] for name, values in self.__dict__.items()})
+
+
+def generate_city_profiles(count: int, rng: np.random.Generator, bbox=DEFAULT_BBOX) -> CityProfiles:
+    lat_min, lat_max, lon_min, lon_max = bbox
+    latitud = rng.uniform(lat_min, lat_max, count)
+    longitud = rng.uniform(lon_min, lon_max, count)
+    # Mayoría de ciudades bajas, algunas de montaña
+    altitud = np.round(rng.gamma(1.5, 300, count), 0)
+    # Interior (lejos de la costa oeste/este) -> más contraste térmico
+    continentality = 1 - np.abs((longitud - (lon_min + lon_max) / 2) / ((lon_max - lon_min) / 2))
+
+    return CityProfiles(
+        latitud=np.round(latitud, 5),
+        longitud=np.round(longitud, 5),
+        altitud=altitud,
+        mean_temperature=26 - 0.6 * np.abs(latitud) - LAPSE_RATE * altitud + rng.normal(0, 1, count),
+        seasonal_amplitude=6 + 4 * continentality + rng.normal(0, 0.5, count),
+        diurnal_amplitude=4 + 3 * continentality + rng.normal(0, 0.5, count),
+        mean_humidity=np.clip(75 - 20 * continentality + rng.normal(0, 5, count), 35, 90),
+        mean_wind=np.clip(rng.gamma(3, 3, count), 2, 40),
+    )
+
+
+def _smooth_noise(rng: np.random.Generator, cities: int, hours: int, knot_hours: int) -> np.ndarray:
+    """
+    Ruido suave N(0, 1) interpolando linealmente valores aleatorios cada
+    `knot_hours` horas: simula frentes y anticiclones que duran días.
+    """
+    knots = rng.standard_normal((cities, hours // knot_hours + 2))
+    position = np.arange(hours) / knot_hours
+    left = position.astype(np.int64)
+    frac = position - left
+    return knots[:, left] * (1 - frac) + knots[:, left + 1] * frac
+
+
+def generate_block(
+    profiles: CityProfiles,
+    start: datetime,
+    hours: int,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """
+    Observaciones horarias de todas las ciudades de `profiles` desde `start`.
+    Devuelve un array (ciudades x horas) por campo de OBSERVATION_FIELDS.
+    """
+    cities = len(profiles)
+    col = lambda values: np.asarray(values)[:, None]  # noqa: E731 - por ciudad, difundido a las horas
+
+    hour_index = np.arange(hours)
+    hour_of_day = (start.hour + hour_index) % 24
+    day_of_year = (start.timetuple().tm_yday - 1 + (start.hour + hour_index) / 24) % 365.25
+    # Hemisferio sur: estaciones invertidas
+    season_sign = np.where(profiles.latitud >= 0, 1.0, -1.0)
+
+    seasonal = np.sin(2 * np.pi * (day_of_year - 110) / 365.25)[None, :] * col(season_sign)
+    diurnal = np.sin(2 * np.pi * (hour_of_day - 9) / 24)[None, :]
+    front = _smooth_noise(rng, cities, hours, 36)        # masas de aire frías/cálidas
+    pressure_system = _smooth_noise(rng, cities, hours, 60)  # altas (+) y bajas (-) presiones
+
+    temperature = (
+        col(profiles.mean_temperature)
+        + col(profiles.seasonal_amplitude) * seasonal
+        + col(profiles.diurnal_amplitude) * diurnal
+        + 3.0 * front
+        + rng.normal(0, 0.6, (cities, hours))
+    )
+
+    # La humedad relativa baja cuando sube la temperatura del día y con altas presiones
+    humidity = np.clip(
+        col(profiles.mean_humidity)
+        - 15 * diurnal
+        - 10 * pressure_system
+        + rng.normal(0, 4, (cities, hours)),
+        5,
+        100,
+    )
+
+    pressure = 1013 + 8 * pressure_system + rng.normal(0, 0.5, (cities, hours))
+
+    # Más viento con bajas presiones y por la tarde
+    wind_speed = np.clip(
+        col(profiles.mean_wind) * (1 + 0.6 * np.maximum(-pressure_system, 0))
+        + 2 * diurnal
+        + rng.normal(0, 2, (cities, hours)),
+        0,
+        None,
+    )
+    wind_direction = (225 + 90 * front + 30 * rng.standard_normal((cities, hours))) % 360
+    wind_gust = wind_speed * (1.2 + 0.4 * rng.random((cities, hours)))
+
+    # Lluvia solo bajo borrascas con aire húmedo
+    raining = (pressure_system < -0.7) & (humidity > 70) & (rng.random((cities, hours)) < 0.6)
+    precipitation = np.where(raining, rng.exponential(1.5, (cities, hours)), 0.0)
+
+    cloud_cover = np.clip(45 - 35 * pressure_system + 25 * raining + rng.normal(0, 10, (cities, hours)), 0, 100)
+    visibility = np.clip(20 - 2 * precipitation - 8 * (humidity > 95), 0.2, 20)
+
+    values = {
+        "temperature": temperature,
+        "humidity": humidity,
+        "pressure": pressure,
+        "wind_speed": wind_speed,
+        "wind_direction": wind_direction,
+        "wind_gust": wind_gust,
+        "precipitation": precipitation,
+        "visibility": visibility,
+        "cloud_cover": cloud_cover,
+    }
+    return {name: np.round(array, 2) for name, array in values.items()}
+
+
+def iter_blocks(
+    city_ids: Sequence[int],
+    profiles: CityProfiles,
+    start: datetime,
+    hours: int,
+    seed: int,
+    chunk_rows: int,
+) -> Iterator[Tuple[Sequence[int], Dict[str, np.ndarray]]]:
+    """
+    Recorre las ciudades por grupos de tamaño acotado (unas `chunk_rows` filas)
+    para que la memoria no dependa del total. Devuelve (ids del grupo, arrays
+    ciudades x horas de OBSERVATION_FIELDS + DERIVED_FIELDS).
+    """
+    rng = np.random.default_rng(seed)
+    cities_per_block = max(1, chunk_rows // max(hours, 1))
+    for first in range(0, len(city_ids), cities_per_block):
+        block_ids = city_ids[first:first + cities_per_block]
+        block = generate_block(profiles.slice(first, first + len(block_ids)), start, hours, rng)
+        block.update(compute_derived_fields(block["temperature"], block["humidity"], block["wind_speed"]))
+        yield block_ids, block
+
+
+def block_rows(block_ids: Sequence[int], block: Dict[str, np.ndarray], timestamps: list) -> Iterator[Tuple]:
+    """Filas (city_id, timestamp, *OBSERVATION_FIELDS, *DERIVED_FIELDS) de un bloque; NaN -> None."""
+    hours = len(timestamps)
+    columns = [np.repeat(np.asarray(block_ids), hours).tolist(), timestamps * len(block_ids)]
+    columns += [block[name].ravel().tolist() for name in OBSERVATION_FIELDS]
+    columns += [_nullable(block[name].ravel()) for name in DERIVED_FIELDS]
+    return zip(*columns)
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Array con NaN -> lista con None (NULL en la BD)."""
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result.tolist()
+
+
+def iter_rows(
+    city_ids: Sequence[int],
+    profiles: CityProfiles,
+    start: datetime,
+    hours: int,
+    seed: int,
+    chunk_rows: int,
+) -> Iterator[List[Tuple]]:
+    """Las filas de iter_blocks en listas de como mucho `chunk_rows` filas."""
+    timestamps = [start + timedelta(hours=h) for h in range(hours)]
+    rows = chain.from_iterable(
+        block_rows(block_ids, block, timestamps)
+        for block_ids, block in iter_blocks(city_ids, profiles, start, hours, seed, chunk_rows)
+    )
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def block_rollups(block_ids: Sequence[int], block: Dict[str, np.ndarray], timestamps: List[datetime]) -> Iterator[Tuple]:
+    """
+    Agregados horarios/diarios/mensuales de un bloque calculados con NumPy, con
+    los mismos valores que rebuild_rollups. Las horas son consecutivas, así que
+    cada tramo es un segmento contiguo y basta reduceat sobre el eje de horas.
+    Filas (city_id, resolution, bucket_start, count, temperature_min,
+    temperature_max, temperature_sum, humidity_sum, pressure_sum,
+    wind_speed_sum, wind_gust_max, precipitation_sum).
+    """
+    for resolution in RESOLUTIONS:
+        buckets = [bucket_start(ts, resolution) for ts in timestamps]
+        starts = np.array([h for h in range(len(buckets)) if h == 0 or buckets[h] != buckets[h - 1]])
+        counts = np.diff(np.append(starts, len(buckets)))
+        values = [
+            np.minimum.reduceat(block["temperature"], starts, axis=1),
+            np.maximum.reduceat(block["temperature"], starts, axis=1),
+            np.add.reduceat(block["temperature"], starts, axis=1),
+            np.add.reduceat(block["humidity"], starts, axis=1),
+            np.add.reduceat(block["pressure"], starts, axis=1),
+            np.add.reduceat(block["wind_speed"], starts, axis=1),
+            np.maximum.reduceat(block["wind_gust"], starts, axis=1),
+            np.add.reduceat(block["precipitation"], starts, axis=1),
+        ]
+        segments = len(starts)
+        columns = [
+            np.repeat(np.asarray(block_ids), segments).tolist(),
+            [resolution] * (segments * len(block_ids)),
+            [buckets[h] for h in starts.tolist()] * len(block_ids),
+            np.tile(counts, len(block_ids)).tolist(),
+        ]
+        columns += [array.ravel().tolist() for array in values]
+        yield from zip(*columns)
+
+
+def _insert_sql(model, columns: Sequence[str]) -> str:
+    quote = connection.ops.quote_name
+    return "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+
+OBSERVATION_INSERT = ("city_id", "timestamp", *OBSERVATION_FIELDS, *DERIVED_FIELDS, "updated_at")
+ROLLUP_INSERT = (
+    "city_id", "resolution", "bucket_start", "count", "temperature_min", "temperature_max",
+    "temperature_sum", "humidity_sum", "pressure_sum", "wind_speed_sum", "wind_gust_max",
+    "precipitation_sum", "updated_at",
+)
+
+
+def create_cities(
+    count: int,
+    seed: int,
+    bbox=DEFAULT_BBOX,
+) -> Tuple[List[int], CityProfiles]:
+    """Crea `count` ciudades con coordenadas y altitud sintéticas (nombres aún libres)."""
+    profiles = generate_city_profiles(count, np.random.default_rng(seed), bbox)
+    cities = City.objects.bulk_create(
+        City(name=name, latitud=lat, longitud=lon, altitud=alt)
+        for name, lat, lon, alt in zip(
+            free_city_names(count),
+            profiles.latitud.tolist(),
+            profiles.longitud.tolist(),
+            profiles.altitud.tolist(),
+        )
+    )
+    # bulk_create no emite post_save
+    invalidate_city_index()
+    return [city.id for city in cities], profiles
+
+
+def write_observations(
+    city_ids: Sequence[int],
+    profiles: CityProfiles,
+    start: datetime,
+    hours: int,
+    seed: int,
+    chunk_size: int = 5000,
+    rollups: bool = True,
+) -> Iterator[int]:
+    """
+    Genera e inserta `hours` observaciones horarias por ciudad por bloques de
+    `chunk_size` filas. Devuelve un iterador con las filas escritas en cada
+    bloque (para informar del progreso).
+
+    Es una carga de histórico de ciudades recién creadas: las filas van directas
+    a la tabla con executemany, sin instancias del modelo ni el trabajo por
+    bloque de bulk_create_observations (puntero, publicación en directo,
+    invalidación). Con rollups=True los agregados se calculan con NumPy desde
+    los mismos arrays y se insertan igual. Al terminar se fijan los punteros de
+    última observación con una sola UPDATE y se invalidan las respuestas
+    cacheadas de las ciudades.
+    """
+    adapt = connection.ops.adapt_datetimefield_value
+    updated_at = (adapt(timezone.now()),)
+    timestamps = [start + timedelta(hours=h) for h in range(hours)]
+    adapted = [adapt(ts) for ts in timestamps]
+    observation_sql = _insert_sql(WeatherObservation, OBSERVATION_INSERT)
+    rollup_sql = _insert_sql(ObservationRollup, ROLLUP_INSERT)
+
+    for block_ids, block in iter_blocks(city_ids, profiles, start, hours, seed, chunk_size):
+        rows = block_rows(block_ids, block, adapted)
+        while True:
+            chunk = [row + updated_at for row in islice(rows, chunk_size)]
+            if not chunk:
+                break
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(observation_sql, chunk)
+            yield len(chunk)
+
+        if rollups:
+            rollup_rows = [
+                (*row[:2], adapt(row[2]), *row[3:]) + updated_at
+                for row in block_rollups(block_ids, block, timestamps)
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(rollup_sql, rollup_rows)
+
+    City.objects.filter(id__in=city_ids).update(
+        latest_observation=Subquery(
+            WeatherObservation.objects.filter(city=OuterRef("pk")).order_by("-timestamp", "-id").values("id")[:1]
+        )
+    )
+    invalidate_scopes([city_scope(city_id) for city_id in city_ids])
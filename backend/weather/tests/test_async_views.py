@@ -0,0 +1,130 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from weather import async_views
+from weather.models import City, ForecastPoint, WeatherObservation
+from weather.prophet_service import run_forecast_plan
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=30)
+        WeatherObservation.objects.bulk_create(
+            WeatherObservation(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+                humidity=60 - i,
+            )
+            for i in range(30)
+        )
+        self.city.refresh_latest_observation()
+
+    async def test_current_weather_matches_sync_view_and_shares_cache(self):
+        sync_response = await sync_to_async(self.client.get)(reverse("current-weather"), {"city_id": self.city.id})
+        response = await self.async_client.get(reverse("async-current-weather"), {"city_id": self.city.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+        not_modified = await self.async_client.get(
+            reverse("async-current-weather"),
+            {"city_id": self.city.id},
+            headers={"if-none-match": response["ETag"]},
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_current_weather_errors(self):
+        url = reverse("async-current-weather")
+        self.assertEqual((await self.async_client.get(url)).status_code, 400)
+        self.assertEqual((await self.async_client.get(url, {"city_id": 999999})).status_code, 404)
+
+    async def test_conditions(self):
+        response = await self.async_client.get(
+            reverse("async-current-conditions"), {"city_id": self.city.id, "city_name": "Madrid"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city_id"], self.city.id)
+        self.assertIn("emblem_photo_url", response.json())
+
+    async def test_conditions_by_name_see_new_observation(self):
+        url = reverse("async-current-conditions")
+        cadiz = await City.objects.acreate(name="Cádiz")
+
+        def save(temperature):
+            with self.captureOnCommitCallbacks(execute=True):
+                WeatherObservation.objects.create(city=cadiz, temperature=temperature)
+
+        await sync_to_async(save)(18.0)
+        self.assertEqual((await self.async_client.get(url, {"city_name": "cadiz"})).json()["temp_c"], 18.0)
+        await sync_to_async(save)(21.0)
+        self.assertEqual((await self.async_client.get(url, {"city_name": "cadiz"})).json()["temp_c"], 21.0)
+
+    async def test_forecast_single_and_multi_variable(self):
+        url = reverse("async-forecast")
+        single = await self.async_client.get(url, {"city_id": self.city.id, "periods": 3, "engine": "holt_winters"})
+        self.assertEqual(single.status_code, 200)
+        self.assertEqual(single.json()["source"], "live")
+        self.assertEqual(len(single.json()["points"]), 3)
+
+        multi = await self.async_client.get(
+            url, {"city_id": self.city.id, "periods": 3, "engine": "holt_winters", "variables": "temperature,humidity"},
+        )
+        self.assertEqual(list(multi.json()["series"]), ["temperature", "humidity"])
+
+        invalid = await self.async_client.get(url, {"city_id": self.city.id, "periods": 0})
+        self.assertEqual(invalid.status_code, 400)
+
+    async def test_precomputed_forecast_skips_fitting(self):
+        start = timezone.now()
+        await ForecastPoint.objects.abulk_create(
+            ForecastPoint(
+                city=self.city,
+                ts=start + timezone.timedelta(hours=h),
+                yhat=20.0,
+                yhat_lower=19.0,
+                yhat_upper=21.0,
+                model_version="test",
+                generated_at=start,
+            )
+            for h in range(1, 4)
+        )
+
+        with mock.patch.object(async_views, "run_forecast_plan") as run:
+            response = await self.async_client.get(reverse("async-forecast"), {"city_id": self.city.id, "periods": 3})
+
+        run.assert_not_called()
+        self.assertEqual(response.json()["source"], "precomputed")
+
+    async def test_slow_forecast_does_not_block_cheap_requests(self):
+        """Mientras una predicción entrena en el executor, otra petición se atiende"""
+        finished = []
+
+        def slow_run(*args, **kwargs):
+            time.sleep(0.5)
+            return run_forecast_plan(*args, **kwargs)
+
+        async def request(name, url, params):
+            response = await self.async_client.get(url, params)
+            finished.append(name)
+            return response
+
+        with mock.patch.object(async_views, "run_forecast_plan", side_effect=slow_run):
+            forecast, current = await asyncio.gather(
+                request("forecast", reverse("async-forecast"), {"city_id": self.city.id, "engine": "holt_winters"}),
+                request("current", reverse("async-current-weather"), {"city_id": self.city.id}),
+            )
+
+        self.assertEqual(finished, ["current", "forecast"])
+        self.assertEqual(forecast.status_code, 200)
+        self.assertEqual(current.status_code, 200)
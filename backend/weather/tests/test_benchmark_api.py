@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase, TestCase
+
+from weather.management.commands.benchmark_api import percentile_summary, run_benchmark
+from weather.models import City, WeatherObservation
+
+
+class PercentileSummaryTests(SimpleTestCase):
+    def test_percentiles_and_throughput(self):
+        timings = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+        summary = percentile_summary("x", timings, elapsed=sum(timings), units=10)
+
+        self.assertEqual(summary["requests"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5)
+        self.assertAlmostEqual(summary["p95_ms"], 95.05)
+        self.assertAlmostEqual(summary["throughput_rps"], round(100 / sum(timings), 2))
+        self.assertAlmostEqual(summary["rows_per_second"], round(1000 / sum(timings), 1))
+
+
+class RunBenchmarkTests(TestCase):
+    def test_report_covers_requested_scenarios(self):
+        report = run_benchmark({
+            "cities": 3,
+            "hours": 30,
+            "requests": 4,
+            "slow_requests": 2,
+            "warmup": 1,
+            "bulk_rows": 5,
+            "seed": 1,
+            "scenarios": ["current_uncached", "conditions", "forecast_holt_winters", "bulk_ingest_api"],
+        })
+
+        self.assertEqual(City.objects.count(), 3)
+        # Siembra + lotes de la API (calentamiento incluido)
+        self.assertEqual(WeatherObservation.objects.count(), 3 * 30 + 3 * 5)
+        self.assertEqual(report["dataset"]["observations"], 90)
+        self.assertEqual(
+            [row["scenario"] for row in report["results"]],
+            ["current_uncached", "conditions", "forecast_holt_winters", "bulk_ingest_api"],
+        )
+        for row in report["results"]:
+            self.assertEqual(row["errors"], 0, row)
+            self.assertGreater(row["p95_ms"], 0)
+        self.assertEqual(report["results"][-1]["requests"], 2)
+        self.assertIn("rows_per_second", report["results"][-1])
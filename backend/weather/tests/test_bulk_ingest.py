@@ -0,0 +1,89 @@
+import json
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.models import City, WeatherObservation
+
+
+class BulkIngestTests(APITestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Madrid")
+        self.user = User.objects.create_user(username="estacion", password="testpass123")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("observations-bulk")
+
+    def test_bulk_json_creates_observations_with_derived_fields(self):
+        """Una lista JSON se inserta entera y con los campos derivados calculados"""
+        payload = [
+            {"city_id": self.city.id, "temperature": 30.0 + i, "humidity": 40, "timestamp": f"2025-07-01T{i:02d}:00:00Z"}
+            for i in range(5)
+        ]
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+        self.assertEqual(response.data["errors"], [])
+        self.assertFalse(WeatherObservation.objects.filter(wind_chill__isnull=True).exists())
+        self.assertFalse(WeatherObservation.objects.filter(heat_index__isnull=True).exists())
+
+    def test_invalid_rows_are_reported_without_aborting_batch(self):
+        """Las filas inválidas se devuelven por índice y el resto se guarda"""
+        payload = [
+            {"city_id": self.city.id, "temperature": 20.5},
+            {"city_id": 9999, "temperature": 20.5},
+            {"city_id": self.city.id, "temperature": "caliente"},
+            {"city_id": self.city.id, "temperature": 18, "humidity": 150},
+            {"city_id": self.city.id, "temperature": 19, "timestamp": "ayer"},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2, 3, 4])
+        self.assertIn("city_id", response.data["errors"][0]["errors"])
+        self.assertIn("humidity", response.data["errors"][2]["errors"])
+        self.assertEqual(WeatherObservation.objects.count(), 1)
+
+    def test_nonexistent_date_is_a_row_error(self):
+        """Una fecha bien formada pero inexistente no tumba el lote"""
+        payload = [
+            {"city_id": self.city.id, "temperature": 20.5, "timestamp": "2025-02-28T10:00:00Z"},
+            {"city_id": self.city.id, "temperature": 21.0, "timestamp": "2025-02-30T10:00:00"},
+            {"city_id": self.city.id, "temperature": 22.0, "timestamp": "2025-03-01T25:00:00"},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2])
+        self.assertIn("timestamp", response.data["errors"][0]["errors"])
+
+    def test_ndjson_stream_with_broken_line(self):
+        """NDJSON: cada línea es una observación y una línea rota no tumba el lote"""
+        lines = [
+            json.dumps({"city_id": self.city.id, "temperature": 10.0, "wind_speed": 20}),
+            "{esto no es json",
+            json.dumps({"city_id": self.city.id, "temperature": 11.0}),
+        ]
+        response = self.client.post(
+            self.url + "?chunk_size=1",
+            data="\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+
+    def test_all_rows_invalid_returns_400(self):
+        response = self.client.post(self.url, [{"temperature": 20}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["created"], 0)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
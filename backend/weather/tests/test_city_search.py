@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather.models import City
+from weather.search import CityMatch, CitySearchIndex, normalize_name
+
+
+class NormalizeNameTests(SimpleTestCase):
+    def test_accents_case_and_separators(self):
+        self.assertEqual(normalize_name("València"), "valencia")
+        self.assertEqual(normalize_name("  A CORUÑA "), "a coruna")
+        self.assertEqual(normalize_name("Vitoria-Gasteiz"), "vitoria gasteiz")
+        self.assertEqual(normalize_name("L'Hospitalet"), "l hospitalet")
+
+
+class CitySearchIndexTests(SimpleTestCase):
+    def setUp(self):
+        names = ["Valencia", "València d'Àneu", "Valladolid", "A Coruña", "Vitoria-Gasteiz", "Alcalá de Henares"]
+        self.index = CitySearchIndex([CityMatch(i, name, 0.0, 0.0) for i, name in enumerate(names)])
+
+    def names(self, query, limit=10):
+        return [city.name for city in self.index.search(query, limit)]
+
+    def test_prefix_accent_insensitive(self):
+        self.assertEqual(self.names("vàlen"), ["Valencia", "València d'Àneu"])
+        self.assertEqual(self.names("VALL"), ["Valladolid"])
+
+    def test_word_matches_after_name_matches(self):
+        self.assertEqual(self.names("coru"), ["A Coruña"])
+        self.assertEqual(self.names("a"), ["A Coruña", "Alcalá de Henares", "València d'Àneu"])
+        self.assertEqual(self.names("gasteiz"), ["Vitoria-Gasteiz"])
+
+    def test_limit_and_empty(self):
+        self.assertEqual(len(self.names("v", limit=2)), 2)
+        self.assertEqual(self.names("   "), [])
+        self.assertEqual(self.names("zz"), [])
+
+
+class CitySearchViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        City.objects.create(name="València", latitud=39.47, longitud=-0.38)
+        City.objects.create(name="Valladolid", latitud=41.65, longitud=-4.72)
+        self.url = reverse("city-search")
+
+    def test_search(self):
+        response = self.client.get(self.url, {"q": "valencia"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["name"] for row in response.data["results"]], ["València"])
+        self.assertEqual(response.data["results"][0]["latitud"], 39.47)
+
+    def test_index_follows_renames(self):
+        self.client.get(self.url, {"q": "val"})
+        city = City.objects.get(name="Valladolid")
+        city.name = "Pucela"
+        city.save(update_fields=["name"])
+
+        response = self.client.get(self.url, {"q": "puc"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [city.id])
+
+    def test_validation(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"q": "v", "limit": 0}).status_code, status.HTTP_400_BAD_REQUEST)
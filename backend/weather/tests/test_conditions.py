@@ -0,0 +1,160 @@
+import math
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather import ephemeris, solar
+from weather.conditions import derive_condition
+from weather.models import City, WeatherObservation
+from weather.photo_catalog import get_photo_catalog
+from weather.views import conditions_payload
+
+
+class DeriveConditionTests(SimpleTestCase):
+    def test_precipitation(self):
+        self.assertEqual(derive_condition(12.0, precipitation=2.0), "rain")
+        self.assertEqual(derive_condition(12.0, precipitation=0.2), "drizzle")
+        self.assertEqual(derive_condition(-1.0, precipitation=2.0), "snow")
+        self.assertEqual(derive_condition(1.5, precipitation=2.0), "sleet")
+        self.assertEqual(derive_condition(20.0, precipitation=12.0, wind_gust=80.0), "storm")
+
+    def test_sky(self):
+        self.assertEqual(derive_condition(15.0, cloud_cover=90.0), "overcast")
+        self.assertEqual(derive_condition(15.0, cloud_cover=50.0), "clouds")
+        self.assertEqual(derive_condition(15.0, cloud_cover=10.0), "clear")
+        self.assertEqual(derive_condition(15.0, cloud_cover=10.0, visibility=0.3), "fog")
+        self.assertEqual(derive_condition(15.0, cloud_cover=10.0, visibility=0.0), "clear")
+        self.assertEqual(derive_condition(15.0), "clear")
+
+
+class SolarTests(SimpleTestCase):
+    def test_madrid_summer_solstice(self):
+        times = solar.sun_times(40.4168, -3.7038, solar.day_of_year(np.datetime64("2025-06-21")))
+        # Efemérides oficiales: orto 04:44 UTC, ocaso 19:48 UTC
+        self.assertEqual(solar.minutes_to_datetime(date(2025, 6, 21), times.sunrise).strftime("%H:%M"), "04:44")
+        self.assertEqual(solar.minutes_to_datetime(date(2025, 6, 21), times.sunset).strftime("%H:%M"), "19:48")
+
+    def test_vectorized_over_cities_and_days(self):
+        doy = solar.day_of_year(np.arange("2025-01-01", "2026-01-01", dtype="datetime64[D]"))
+        times = solar.sun_times(np.array([[40.0], [60.0]]), np.array([[0.0], [0.0]]), doy[None, :])
+        self.assertEqual(times.sunrise.shape, (2, 365))
+        day_length = times.sunset - times.sunrise
+        # Más al norte, días más largos en verano y más cortos en invierno
+        self.assertGreater(day_length[1, 171], day_length[0, 171])
+        self.assertLess(day_length[1, 354], day_length[0, 354])
+
+    def test_is_daytime(self):
+        utc = dt_timezone.utc
+        self.assertTrue(solar.is_daytime(40.4, -3.7, datetime(2025, 1, 15, 12, tzinfo=utc)))
+        self.assertFalse(solar.is_daytime(40.4, -3.7, datetime(2025, 1, 15, 22, tzinfo=utc)))
+        # Honolulu: el ocaso cae en el día UTC siguiente
+        self.assertTrue(solar.is_daytime(21.3, -157.85, datetime(2025, 1, 11, 3, tzinfo=utc)))
+        # Día y noche polares
+        self.assertTrue(solar.is_daytime(78.0, 15.0, datetime(2025, 6, 21, 0, tzinfo=utc)))
+        self.assertFalse(solar.is_daytime(78.0, 15.0, datetime(2025, 12, 21, 12, tzinfo=utc)))
+
+
+class CurrentConditionsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="València", latitud=39.4699, longitud=-0.3763)
+        self.observation = WeatherObservation.objects.create(
+            city=self.city, temperature=14.0, precipitation=3.0, cloud_cover=100.0,
+        )
+        self.url = reverse("current-conditions")
+
+    def test_conditions_from_latest_observation(self):
+        noon = datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc)
+        get_photo_catalog()  # el catálogo se carga una vez por proceso
+        with mock.patch("weather.views.timezone.now", return_value=noon):
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, {"city_id": self.city.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["condition"], "rain")
+        self.assertEqual(response.data["temp_c"], 14.0)
+        self.assertTrue(response.data["is_daytime"])
+        self.assertEqual(response.data["emblem_photo"], "rain_city_01.jpg")
+        self.assertTrue(response.data["emblem_photo_url"].endswith("/rain_city_01.jpg"))
+        self.assertIn("Last-Modified", response)
+
+    def test_night_and_clear_sky(self):
+        WeatherObservation.objects.create(
+            city=self.city, temperature=9.0, cloud_cover=5.0, timestamp=timezone.now() + timezone.timedelta(minutes=1),
+        )
+        midnight = datetime(2025, 3, 1, 23, tzinfo=dt_timezone.utc)
+        with mock.patch("weather.views.timezone.now", return_value=midnight):
+            response = self.client.get(self.url, {"city_id": self.city.id})
+
+        self.assertEqual(response.data["condition"], "clear")
+        self.assertFalse(response.data["is_daytime"])
+        self.assertEqual(response.data["emblem_photo"], "clear_night_city_01.jpg")
+
+    def test_sunset_changes_validators_and_caps_cache(self):
+        """is_daytime cambia sin observación nueva: tras el ocaso no hay 304 y la entrada caduca en él"""
+        WeatherObservation.objects.filter(pk=self.observation.pk).update(
+            updated_at=datetime(2025, 3, 1, 5, tzinfo=dt_timezone.utc),
+        )
+        self.observation.refresh_from_db()
+        afternoon = datetime(2025, 3, 1, 16, tzinfo=dt_timezone.utc)
+        night = datetime(2025, 3, 1, 20, tzinfo=dt_timezone.utc)
+
+        data, last_modified, timeout = conditions_payload(self.city, self.observation, afternoon)
+        sunrise, sunset = ephemeris.sun_events(self.city, afternoon)
+        self.assertTrue(data["is_daytime"])
+        self.assertEqual(last_modified, sunrise.timestamp())
+        self.assertEqual(timeout, math.ceil((sunset - afternoon).total_seconds()))
+
+        with mock.patch("weather.views.timezone.now", return_value=afternoon):
+            first = self.client.get(self.url, {"city_id": self.city.id})
+        cache.clear()  # la entrada habría caducado en el ocaso
+        with mock.patch("weather.views.timezone.now", return_value=night):
+            response = self.client.get(
+                self.url, {"city_id": self.city.id}, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["is_daytime"])
+
+    def test_city_name_is_accent_insensitive(self):
+        response = self.client.get(self.url, {"city_name": "valencia"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["city_id"], self.city.id)
+        self.assertEqual(response.data["city_name"], "València")
+
+    def test_new_observation_invalidates(self):
+        self.client.get(self.url, {"city_name": "València"})
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(
+                city=self.city, temperature=-2.0, precipitation=1.0,
+                timestamp=timezone.now() + timezone.timedelta(minutes=1),
+            )
+        response = self.client.get(self.url, {"city_name": "València"})
+        self.assertEqual(response.data["condition"], "snow")
+
+    def test_new_observation_invalidates_unaccented_name(self):
+        """El nombre se resuelve sin tildes ni mayúsculas: la caché de esa variante también se invalida"""
+        self.assertEqual(self.client.get(self.url, {"city_name": "VALENCIA"}).data["temp_c"], 14.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(
+                city=self.city, temperature=-2.0, precipitation=1.0,
+                timestamp=timezone.now() + timezone.timedelta(minutes=1),
+            )
+        response = self.client.get(self.url, {"city_name": "VALENCIA"})
+        self.assertEqual(response.data["temp_c"], -2.0)
+        self.assertEqual(response.data["condition"], "snow")
+
+    def test_unknown_city_and_no_data(self):
+        self.assertEqual(self.client.get(self.url, {"city_name": "Atlantis"}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        empty = City.objects.create(name="Soria")
+        response = self.client.get(self.url, {"city_id": empty.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["city_name"], "Soria")
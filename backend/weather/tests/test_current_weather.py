@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APITestCase
@@ -9,6 +10,7 @@ from weather.models import City, WeatherObservation
 class CurrentWeatherTests(APITestCase):
     def setUp(self):
         """Crear datos de prueba"""
+        cache.clear()
         self.city_madrid = City.objects.create(name="Madrid")
         self.city_barcelona = City.objects.create(name="Barcelona")
 
@@ -50,6 +52,18 @@ class CurrentWeatherTests(APITestCase):
         self.assertEqual(data["temperature"], 18.3)  # La más reciente
         self.assertIn("timestamp", data)
 
+    def test_condition_matches_conditions_endpoint(self):
+        """La condición sale de la observación, igual que en /conditions"""
+        WeatherObservation.objects.create(
+            city=self.city_barcelona, temperature=12.0, precipitation=2.5,
+            timestamp=timezone.now() + timezone.timedelta(minutes=1),
+        )
+        current = self.client.get(reverse("current-weather"), {"city_id": self.city_barcelona.id})
+        conditions = self.client.get(reverse("current-conditions"), {"city_id": self.city_barcelona.id})
+
+        self.assertEqual(current.data["condition"], "rain")
+        self.assertEqual(current.data["condition"], conditions.data["condition"])
+
     def test_current_weather_missing_city_id(self):
         """Verificar que sin city_id devuelve error 400"""
         url = reverse("current-weather")
@@ -0,0 +1,52 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.models import City, WeatherObservation
+
+
+class CurrentWeatherBatchTests(APITestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.cities = []
+        for i, name in enumerate(["Madrid", "Barcelona", "Valencia"]):
+            city = City.objects.create(name=name)
+            WeatherObservation.objects.create(city=city, timestamp=now - timezone.timedelta(hours=1), temperature=10.0 + i)
+            WeatherObservation.objects.create(city=city, timestamp=now, temperature=20.0 + i)
+            self.cities.append(city)
+        self.empty = City.objects.create(name="Sevilla")
+        self.url = reverse("current-weather")
+
+    def test_batch_returns_latest_for_each_city_in_one_query(self):
+        """?city_ids= devuelve la última observación de cada ciudad con una sola consulta"""
+        ids = ",".join(str(city.id) for city in reversed(self.cities))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"city_ids": ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["city_name"] for item in response.data["results"]], ["Valencia", "Barcelona", "Madrid"])
+        self.assertEqual([item["temperature"] for item in response.data["results"]], [22.0, 21.0, 20.0])
+        self.assertEqual(response.data["missing"], [])
+
+    def test_batch_reports_missing_cities(self):
+        ids = f"{self.cities[0].id},{self.empty.id},9999"
+        response = self.client.get(self.url, {"city_ids": ids})
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["missing"], [self.empty.id, 9999])
+
+    def test_batch_without_pointer_uses_single_subquery(self):
+        """Ciudades sin puntero se resuelven con una subconsulta común, no una por ciudad"""
+        City.objects.update(latest_observation=None)
+        response = self.client.post(self.url, {"city_ids": [city.id for city in self.cities]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["temperature"] for item in response.data["results"]], [20.0, 21.0, 22.0])
+
+    def test_batch_invalid_ids(self):
+        response = self.client.get(self.url, {"city_ids": "1,dos"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {"city_ids": "1"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
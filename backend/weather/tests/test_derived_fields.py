@@ -0,0 +1,70 @@
+import itertools
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from weather.derived_fields import compute_derived_fields
+from weather.ingest import bulk_create_observations
+from weather.models import City, WeatherObservation
+
+
+TEMPERATURES = [-15.0, 0.0, 5.5, 10.0, 18.3, 26.9, 27.0, 32.4, 41.0]
+HUMIDITIES = [0.0, 12.0, 50.0, 85.5, 100.0]
+WIND_SPEEDS = [0.0, 4.8, 4.9, 20.0, 65.0]
+
+
+class VectorizedDerivedFieldsTests(SimpleTestCase):
+    def test_matches_scalar_calculators(self):
+        """El cálculo vectorizado coincide con los métodos del modelo fila a fila"""
+        combos = list(itertools.product(TEMPERATURES, HUMIDITIES, WIND_SPEEDS))
+        temperature, humidity, wind_speed = (list(col) for col in zip(*combos))
+        derived = compute_derived_fields(temperature, humidity, wind_speed)
+
+        for i, (t, h, w) in enumerate(combos):
+            obs = WeatherObservation(temperature=t, humidity=h, wind_speed=w)
+            expected = {
+                "wind_chill": obs.wind_chill_calculator(),
+                "dew_point": obs.dew_point_calculator(),
+                "heat_index": obs.heat_index_calculator(),
+            }
+            for name, value in expected.items():
+                got = derived[name][i]
+                if value is None:
+                    self.assertTrue(got != got, f"{name}{(t, h, w)} debería ser NaN")
+                else:
+                    self.assertAlmostEqual(got, value, places=2, msg=f"{name}{(t, h, w)}")
+
+
+class BulkDerivedFieldsTests(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Sevilla")
+
+    def test_bulk_create_observations_fills_derived_fields(self):
+        """La carga en bloque no deja los campos derivados a NULL"""
+        bulk_create_observations([
+            WeatherObservation(city=self.city, temperature=35.0, humidity=40.0, wind_speed=10.0),
+            WeatherObservation(city=self.city, temperature=2.0, humidity=80.0, wind_speed=30.0),
+        ])
+
+        hot, cold = WeatherObservation.objects.order_by("-temperature")
+        self.assertIsNotNone(hot.heat_index)
+        self.assertEqual(hot.wind_chill, hot.heat_index)
+        self.assertIsNotNone(hot.dew_point)
+        self.assertLess(cold.wind_chill, cold.temperature)
+        self.assertIsNone(cold.heat_index)
+
+    def test_backfill_command_recomputes_missing_fields(self):
+        """El backfill rellena filas insertadas con bulk_create sin save()"""
+        WeatherObservation.objects.bulk_create([
+            WeatherObservation(city=self.city, temperature=30.0 + i, humidity=50.0, wind_speed=5.0)
+            for i in range(7)
+        ])
+        self.assertEqual(WeatherObservation.objects.filter(wind_chill__isnull=True).count(), 7)
+
+        call_command("backfill_derived_fields", chunk_size=3, only_missing=True, stdout=StringIO())
+
+        for obs in WeatherObservation.objects.all():
+            self.assertEqual(obs.heat_index, obs.heat_index_calculator())
+            self.assertEqual(obs.dew_point, obs.dew_point_calculator())
+            self.assertEqual(obs.wind_chill, obs.wind_chill_calculator())
@@ -0,0 +1,54 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from weather import model_cache
+from weather.models import City, ForecastPoint, WeatherObservation
+from weather.prophet_service import build_forecasts_batch
+
+
+class ForecastBatchTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        settings_override = override_settings(PROPHET_MODEL_CACHE_DIR=self.tmp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        model_cache._memory_cache.clear()
+        self.addCleanup(model_cache._memory_cache.clear)
+
+        self.madrid = City.objects.create(name="Madrid")
+        self.barcelona = City.objects.create(name="Barcelona")
+        self.empty = City.objects.create(name="CiudadSinDatos")
+
+        base_time = timezone.now() - timezone.timedelta(hours=10)
+        for city, base_temp in ((self.madrid, 20), (self.barcelona, 15)):
+            for i in range(10):
+                WeatherObservation.objects.create(
+                    city=city,
+                    timestamp=base_time + timezone.timedelta(hours=i),
+                    temperature=base_temp + i * 0.5,
+                )
+
+    def test_batch_fits_cities_in_process_pool(self):
+        """El lote entrena en paralelo y guarda los puntos de todas las ciudades"""
+        results = {r.city_id: r for r in build_forecasts_batch(periods=4, workers=2)}
+
+        for city in (self.madrid, self.barcelona):
+            self.assertIsNone(results[city.id].error)
+            self.assertTrue(results[city.id].refitted)
+            self.assertGreater(results[city.id].fit_seconds, 0)
+            self.assertEqual(len(results[city.id].points), 4)
+            self.assertEqual(ForecastPoint.objects.filter(city=city).count(), 4)
+
+        self.assertIsNone(results[self.empty.id].version)
+        self.assertFalse(ForecastPoint.objects.filter(city=self.empty).exists())
+
+    def test_batch_reuses_models_fitted_by_workers(self):
+        """Los modelos entrenados en los workers quedan en la caché del proceso principal"""
+        build_forecasts_batch(periods=4, workers=2)
+        results = build_forecasts_batch(city_ids=[self.madrid.id], periods=4, workers=2)
+
+        self.assertFalse(results[0].refitted)
+        self.assertEqual(len(results[0].points), 4)
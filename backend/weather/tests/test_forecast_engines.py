@@ -0,0 +1,91 @@
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.forecast_engines import ForecastEngine, HoltWintersEngine
+from weather.models import City, WeatherObservation
+from weather.management.commands.benchmark_forecast_engines import synthetic_series
+
+
+class HoltWintersEngineTests(SimpleTestCase):
+    def test_forecast_follows_daily_cycle(self):
+        """Con varios días de datos horarios el error frente a la serie real es pequeño"""
+        ds, y = synthetic_series(days=15, seed=1)
+        points = HoltWintersEngine().forecast(ds[:-24], y[:-24], 24, "H")
+
+        self.assertEqual(len(points), 24)
+        predicted = np.array([p["yhat"] for p in points])
+        self.assertLess(np.mean(np.abs(predicted - y[-24:])), 2.0)
+        for p in points:
+            self.assertLessEqual(p["yhat_lower"], p["yhat"])
+            self.assertGreaterEqual(p["yhat_upper"], p["yhat"])
+
+    def test_timestamps_continue_after_last_observation(self):
+        ds, y = synthetic_series(days=3, seed=2)
+        points = HoltWintersEngine().forecast(ds, y, 3, "H")
+
+        last = ds[-1].astype("datetime64[us]").item()
+        self.assertEqual(
+            [datetime.fromisoformat(p["ts"]) for p in points],
+            [last + timezone.timedelta(hours=h) for h in (1, 2, 3)],
+        )
+
+    def test_short_series_falls_back_to_last_value(self):
+        ds = np.array(["2025-01-01T00:00", "2025-01-01T01:00"], dtype="datetime64[ns]")
+        points = HoltWintersEngine().forecast(ds, np.array([10.0, 12.0]), 2, "H")
+        self.assertEqual([p["yhat"] for p in points], [12.0, 12.0])
+
+    def test_timestamps_are_anchored_on_the_grid(self):
+        """Con observaciones fuera de la hora en punto el horizonte sigue en horas en punto"""
+        ds, y = synthetic_series(days=3, seed=3)
+        ds = ds + np.timedelta64(17, "m")
+        points = HoltWintersEngine().forecast(ds, y, 2, "H")
+
+        last = ds[-1].astype("datetime64[h]").astype("datetime64[us]").item()
+        self.assertEqual(
+            [datetime.fromisoformat(p["ts"]) for p in points],
+            [last + timezone.timedelta(hours=h) for h in (1, 2)],
+        )
+
+    def test_engine_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ForecastEngine()
+
+
+class ForecastEngineSelectionTests(APITestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=10)
+        for i in range(10):
+            WeatherObservation.objects.create(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+            )
+        self.url = reverse("prophet-forecast")
+
+    def test_holt_winters_engine_skips_prophet(self):
+        with mock.patch("weather.views.build_prophet_forecast") as prophet:
+            response = self.client.get(self.url, {"city_id": self.city.id, "periods": 4, "engine": "holt_winters"})
+
+        prophet.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["engine"], "holt_winters")
+        self.assertEqual(len(response.data["points"]), 4)
+        for key in ("ts", "yhat", "yhat_lower", "yhat_upper"):
+            self.assertIn(key, response.data["points"][0])
+
+    def test_unknown_engine_returns_400(self):
+        response = self.client.get(self.url, {"city_id": self.city.id, "engine": "arima"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_holt_winters_without_data_returns_empty_list(self):
+        empty = City.objects.create(name="CiudadSinDatos")
+        response = self.client.get(self.url, {"city_id": empty.id, "engine": "holt_winters"})
+        self.assertEqual(response.data["points"], [])
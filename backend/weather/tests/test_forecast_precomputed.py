@@ -0,0 +1,87 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather import model_cache
+from weather.models import City, ForecastPoint, WeatherObservation
+from weather.prophet_service import get_precomputed_forecast
+
+
+class PrecomputedForecastTests(APITestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        settings_override = override_settings(PROPHET_MODEL_CACHE_DIR=self.tmp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        model_cache._memory_cache.clear()
+        self.addCleanup(model_cache._memory_cache.clear)
+
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=10)
+        for i in range(10):
+            WeatherObservation.objects.create(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+            )
+
+        call_command("refresh_forecasts", periods=6, stdout=StringIO())
+
+    def test_refresh_command_stores_forecast_points(self):
+        """El job guarda un punto por hora del horizonte con su versión de modelo"""
+        points = ForecastPoint.objects.filter(city=self.city)
+        self.assertEqual(points.count(), 6)
+        self.assertTrue(all(p.model_version.startswith("prophet-") for p in points))
+
+    def test_refresh_command_replaces_previous_points(self):
+        """Refrescar de nuevo no duplica filas"""
+        call_command("refresh_forecasts", periods=4, stdout=StringIO())
+        self.assertEqual(ForecastPoint.objects.filter(city=self.city).count(), 4)
+
+    def test_view_reads_precomputed_points(self):
+        """Si el horizonte está precalculado el endpoint no calcula en vivo"""
+        url = reverse("prophet-forecast")
+        with mock.patch("weather.views.build_prophet_forecast") as live:
+            response = self.client.get(url, {"city_id": self.city.id, "periods": 5})
+
+        live.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["source"], "precomputed")
+        self.assertEqual(len(response.data["points"]), 5)
+        for key in ("ts", "yhat", "yhat_lower", "yhat_upper"):
+            self.assertIn(key, response.data["points"][0])
+
+    def test_view_falls_back_to_live_beyond_stored_horizon(self):
+        """Un horizonte mayor que el guardado se calcula en vivo"""
+        url = reverse("prophet-forecast")
+        response = self.client.get(url, {"city_id": self.city.id, "periods": 8})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["source"], "live")
+        self.assertEqual(len(response.data["points"]), 8)
+
+    def test_stale_points_fall_back_to_live(self):
+        """Una predicción antigua o con horas ya pasadas no se sirve"""
+        url = reverse("prophet-forecast")
+        points = ForecastPoint.objects.filter(city=self.city)
+        points.update(generated_at=timezone.now() - timezone.timedelta(days=1))
+        self.assertIsNone(get_precomputed_forecast(self.city.id, 5))
+        self.assertEqual(self.client.get(url, {"city_id": self.city.id, "periods": 5}).data["source"], "live")
+
+        points.update(generated_at=timezone.now(), ts=F("ts") - timezone.timedelta(hours=3))
+        self.assertIsNone(get_precomputed_forecast(self.city.id, 5))
+        self.assertEqual(len(get_precomputed_forecast(self.city.id, 2)), 2)
+
+    def test_view_rejects_non_positive_periods(self):
+        url = reverse("prophet-forecast")
+        response = self.client.get(url, {"city_id": self.city.id, "periods": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from weather.models import City, ObservationRollup, WeatherObservation
+from weather.rollups import rebuild_rollups
+from weather.synthetic import generate_block, generate_city_profiles, iter_rows
+
+
+class SyntheticBlockTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.profiles = generate_city_profiles(20, rng)
+        self.start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        self.block = generate_block(self.profiles, self.start, 24 * 365, rng)
+
+    def test_shapes_and_ranges(self):
+        for values in self.block.values():
+            self.assertEqual(values.shape, (20, 24 * 365))
+        self.assertTrue(((self.block["humidity"] >= 0) & (self.block["humidity"] <= 100)).all())
+        self.assertTrue(((self.block["cloud_cover"] >= 0) & (self.block["cloud_cover"] <= 100)).all())
+        self.assertTrue((self.block["wind_gust"] >= self.block["wind_speed"]).all())
+        self.assertTrue((self.block["precipitation"] >= 0).all())
+
+    def test_diurnal_and_seasonal_cycles(self):
+        temperature = self.block["temperature"].reshape(20, 365, 24)
+        hourly = temperature.mean(axis=(0, 1))
+        self.assertGreater(hourly[15], hourly[3] + 4)  # tarde más cálida que madrugada
+
+        daily = temperature.mean(axis=(0, 2))
+        self.assertGreater(daily[180:240].mean(), daily[0:40].mean() + 8)  # verano frente a invierno
+
+    def test_correlated_variables(self):
+        corr = lambda a, b: np.corrcoef(self.block[a].ravel(), self.block[b].ravel())[0, 1]  # noqa: E731
+        self.assertLess(corr("temperature", "humidity"), -0.2)
+        self.assertLess(corr("pressure", "wind_speed"), -0.2)
+        self.assertLess(corr("pressure", "cloud_cover"), -0.5)
+
+    def test_iter_rows_respects_chunk_size(self):
+        chunks = list(iter_rows([1, 2, 3], self.profiles.slice(0, 3), self.start, 10, seed=1, chunk_rows=7))
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        rows = [row for chunk in chunks for row in chunk]
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[10][:2], (2, self.start))
+
+
+class GenerateObservationsCommandTests(TestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("generate_observations", *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_cities_and_hourly_rows(self):
+        output = self.run_command("--cities", "3", "--days", "2", "--end", "2024-06-01T12:30", "--chunk-size", "20")
+
+        self.assertIn("filas/s", output)
+        self.assertEqual(
+            list(City.objects.order_by("id").values_list("name", flat=True)), ["Madrid", "Barcelona", "Valencia"],
+        )
+        self.assertEqual(WeatherObservation.objects.count(), 3 * 48)
+
+        city = City.objects.order_by("id").first()
+        self.assertIsNotNone(city.altitud)
+        self.assertEqual(city.latest_observation.timestamp, datetime(2024, 6, 1, 12, tzinfo=dt_timezone.utc))
+        # Campos derivados calculados por la ingesta en bloque
+        self.assertIsNotNone(city.latest_observation.dew_point)
+
+    def test_rerun_adds_new_city_names(self):
+        self.run_command("--cities", "2", "--days", "1")
+        City.objects.filter(name="Madrid").delete()
+        self.run_command("--cities", "2", "--days", "1")
+
+        self.assertEqual(
+            sorted(City.objects.values_list("name", flat=True)), ["Barcelona", "Madrid", "Valencia"],
+        )
+        self.assertEqual(WeatherObservation.objects.count(), 3 * 24)
+
+    def test_rejects_nonexistent_end(self):
+        with self.assertRaisesMessage(CommandError, "--end"):
+            self.run_command("--cities", "1", "--days", "1", "--end", "2024-02-30T10:00")
+        self.assertFalse(City.objects.exists())
+
+    def test_rollup_modes(self):
+        self.run_command("--cities", "1", "--days", "1", "--rollups", "none")
+        self.assertFalse(ObservationRollup.objects.exists())
+
+        City.objects.all().delete()
+        self.run_command("--cities", "1", "--days", "1", "--end", "2024-03-10T23:00")
+        daily = ObservationRollup.objects.get(resolution="day")
+        self.assertEqual(daily.count, 24)
+        self.assertEqual(ObservationRollup.objects.filter(resolution="hour").count(), 24)
+
+    def test_direct_insert_matches_model_and_rebuild(self):
+        self.run_command("--cities", "3", "--days", "40", "--end", "2024-03-10T05:00", "--chunk-size", "1000")
+        fields = ("city_id", "resolution", "bucket_start", "count", "temperature_min", "temperature_max",
+                  "temperature_sum", "humidity_sum", "wind_gust_max", "precipitation_sum")
+        generated = list(ObservationRollup.objects.order_by(*fields[:3]).values_list(*fields))
+        rebuild_rollups()
+        rebuilt = list(ObservationRollup.objects.order_by(*fields[:3]).values_list(*fields))
+        self.assertEqual(len(generated), len(rebuilt))
+        for row, expected in zip(generated, rebuilt):
+            self.assertEqual(row[:4], expected[:4])
+            for value, other in zip(row[4:], expected[4:]):
+                self.assertAlmostEqual(value, other, places=6)
+
+        # Campos derivados iguales a los que calcula save()
+        for obs in WeatherObservation.objects.order_by("?")[:50]:
+            self.assertEqual(obs.dew_point, obs.dew_point_calculator())
+            self.assertEqual(obs.heat_index, obs.heat_index_calculator())
+            self.assertEqual(obs.wind_chill, obs.wind_chill_calculator())
+
+    def test_same_seed_same_data(self):
+        self.run_command("--cities", "1", "--days", "1", "--end", "2024-01-01", "--rollups", "none")
+        first = list(WeatherObservation.objects.order_by("timestamp").values_list("temperature", flat=True))
+        WeatherObservation.objects.all().delete()
+        self.run_command("--cities", "1", "--days", "1", "--end", "2024-01-01", "--rollups", "none")
+        second = list(WeatherObservation.objects.order_by("timestamp").values_list("temperature", flat=True))
+        self.assertEqual(first, second)
@@ -0,0 +1,107 @@
+import numpy as np
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather import interpolation
+from weather.interpolation import get_snapshot, interpolate
+from weather.models import City, WeatherObservation
+
+
+@override_settings(INTERPOLATION_NEIGHBOURS=4, INTERPOLATION_POWER=2.0, INTERPOLATION_SNAPSHOT_TTL=0)
+class InterpolationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        interpolation.reset_snapshot()
+        stations = [
+            ("A", 40.0, -4.0, 0.0, 10.0),
+            ("B", 40.0, -3.0, 1000.0, 20.0),
+            ("C", 41.0, -4.0, None, 30.0),
+        ]
+        self.cities = {}
+        for name, lat, lon, alt, temperature in stations:
+            city = City.objects.create(name=name, latitud=lat, longitud=lon, altitud=alt)
+            WeatherObservation.objects.create(city=city, temperature=temperature, humidity=50.0, cloud_cover=None)
+            self.cities[name] = city
+
+    def test_exact_station_and_midpoint(self):
+        snapshot = get_snapshot()
+        result = interpolate(snapshot, [40.0, 40.0], [-4.0, -3.5], ["temperature"])
+
+        self.assertAlmostEqual(result.values["temperature"][0], 10.0)
+        # A y B equidistantes y C más lejos: la media queda entre A y B, sesgada hacia C
+        self.assertTrue(15.0 < result.values["temperature"][1] < 20.0)
+
+    def test_matches_explicit_idw(self):
+        snapshot = get_snapshot()
+        result = interpolate(snapshot, [40.3], [-3.8], ["temperature"])
+        distances = result.distances_km[0]
+        temperatures = snapshot.values["temperature"][result.neighbours[0]]
+        weights = 1 / distances ** 2
+        self.assertAlmostEqual(result.values["temperature"][0], (weights * temperatures).sum() / weights.sum())
+
+    def test_altitude_correction(self):
+        snapshot = get_snapshot()
+        plain = interpolate(snapshot, [40.0], [-3.0], ["temperature"]).values["temperature"][0]
+        corrected = interpolate(snapshot, [40.0], [-3.0], ["temperature"], altitudes=[0.0]).values["temperature"][0]
+        # B está a 1000 m: a nivel del mar serían 6.5 ºC más
+        self.assertAlmostEqual(plain, 20.0)
+        self.assertAlmostEqual(corrected, 26.5)
+
+    def test_missing_values_are_skipped(self):
+        result = interpolate(get_snapshot(), [40.2], [-3.7], ["humidity", "cloud_cover"])
+        self.assertAlmostEqual(result.values["humidity"][0], 50.0)
+        self.assertTrue(np.isnan(result.values["cloud_cover"][0]))
+
+    def test_point_endpoint(self):
+        response = self.client.get(
+            reverse("weather-interpolate"), {"lat": 40.0, "lon": -3.0, "alt": 0, "variables": "temperature,cloud_cover"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["values"], {"temperature": 26.5, "cloud_cover": None})
+        self.assertEqual(response.data["neighbours"][0], {"city_id": self.cities["B"].id, "distance_km": 0.0})
+
+    def test_point_endpoint_validation(self):
+        url = reverse("weather-interpolate")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {"lat": 40, "lon": -3, "variables": "nieve"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_grid_endpoint(self):
+        response = self.client.get(
+            reverse("weather-interpolate-grid"), {"bbox": "-4.5,39.5,-2.5,41.5", "rows": 4, "cols": 5},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["values"]), 4)
+        self.assertEqual(len(response.data["values"][0]), 5)
+        self.assertEqual(len(response.data["lons"]), 5)
+        # Filas de norte a sur: arriba domina C (30 ºC), abajo A/B
+        self.assertGreater(response.data["lats"][0], response.data["lats"][-1])
+        self.assertGreater(response.data["values"][0][0], response.data["values"][-1][0])
+
+    def test_grid_step_and_limits(self):
+        url = reverse("weather-interpolate-grid")
+        response = self.client.get(url, {"bbox": "-4,40,-3,41", "step": 0.25})
+        self.assertEqual((response.data["rows"], response.data["cols"]), (4, 4))
+
+        self.assertEqual(self.client.get(url, {"bbox": "1,2,3"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {"bbox": "-4,40,-3,41", "step": 0.0001}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_snapshot_reused_within_ttl(self):
+        with override_settings(INTERPOLATION_SNAPSHOT_TTL=3600):
+            first = get_snapshot()
+            WeatherObservation.objects.create(city=self.cities["A"], temperature=99.0)
+            self.assertIs(get_snapshot(), first)
+
+            # Una ciudad nueva cambia la versión de las ciudades y fuerza a rehacerla
+            City.objects.create(name="D", latitud=39.0, longitud=-4.0)
+            self.assertIsNot(get_snapshot(), first)
@@ -0,0 +1,60 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.ingest import bulk_create_observations
+from weather.models import City, WeatherObservation
+
+
+class LatestObservationPointerTests(APITestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Valencia")
+        self.now = timezone.now()
+        self.latest = WeatherObservation.objects.create(
+            city=self.city, timestamp=self.now, temperature=21.0,
+        )
+
+    def test_save_advances_pointer_only_for_newer_observations(self):
+        """Una observación atrasada no mueve el puntero"""
+        WeatherObservation.objects.create(
+            city=self.city, timestamp=self.now - timezone.timedelta(hours=3), temperature=15.0,
+        )
+        self.city.refresh_from_db()
+        self.assertEqual(self.city.latest_observation_id, self.latest.id)
+
+        newer = WeatherObservation.objects.create(
+            city=self.city, timestamp=self.now + timezone.timedelta(hours=1), temperature=23.0,
+        )
+        self.city.refresh_from_db()
+        self.assertEqual(self.city.latest_observation_id, newer.id)
+
+    def test_bulk_ingest_advances_pointer(self):
+        """La ingesta en bloque actualiza el puntero con la más reciente del lote"""
+        bulk_create_observations([
+            WeatherObservation(city=self.city, timestamp=self.now + timezone.timedelta(hours=h), temperature=20 + h)
+            for h in (2, 5, 1)
+        ])
+        self.city.refresh_from_db()
+        self.assertEqual(self.city.latest_observation.temperature, 25.0)
+
+    def test_current_weather_is_a_single_query(self):
+        """Con el puntero al día el clima actual es una sola lectura"""
+        url = reverse("current-weather")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"city_id": self.city.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["temperature"], 21.0)
+
+    def test_deleted_latest_falls_back_to_previous(self):
+        """Si se borra la última observación se recalcula el puntero"""
+        WeatherObservation.objects.create(
+            city=self.city, timestamp=self.now - timezone.timedelta(hours=1), temperature=19.0,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.latest.delete()
+
+        response = self.client.get(reverse("current-weather"), {"city_id": self.city.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["temperature"], 19.0)
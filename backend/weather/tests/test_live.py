@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import json
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from weather import live
+from weather.ingest import bulk_create_observations
+from weather.models import City, WeatherObservation
+
+
+def event_data(frame: str) -> dict:
+    return json.loads(next(line[6:] for line in frame.splitlines() if line.startswith("data: ")))
+
+
+class LiveHubTests(TestCase):
+    async def test_dispatch_from_another_thread(self):
+        hub = live.LiveHub()
+        subscription = hub.subscribe(1)
+        thread = threading.Thread(target=hub.dispatch, args=(1, "hola"))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(await asyncio.wait_for(subscription.queue.get(), 1), "hola")
+        hub.unsubscribe(subscription)
+        self.assertFalse(hub.has_subscribers(1))
+
+    async def test_slow_client_keeps_latest_events(self):
+        hub = live.LiveHub()
+        subscription = hub.subscribe(1)
+        subscription.queue = asyncio.Queue(maxsize=2)
+        for message in ("a", "b", "c"):
+            subscription.offer(message)
+        self.assertEqual([subscription.queue.get_nowait() for _ in range(2)], ["b", "c"])
+
+
+class FakeBrokerMixin:
+    def setUp(self):
+        live.reset_broker()
+        self.city = City.objects.create(name="Madrid")
+        self.published = []
+        broker = live.get_broker()
+        broker.has_subscribers = lambda city_id: True
+        broker.publish = lambda city_id, message: self.published.append((city_id, message))
+
+    def tearDown(self):
+        live.reset_broker()
+
+
+class AutocommitPublishTests(FakeBrokerMixin, TransactionTestCase):
+    # Sin la transacción que envuelve cada TestCase, on_commit se ejecuta dentro
+    # de post_save, antes de que save() avance el puntero latest_observation
+    def test_plain_create_is_published(self):
+        WeatherObservation.objects.create(city=self.city, temperature=21.5)
+        self.assertEqual(len(self.published), 1)
+        self.assertEqual(event_data(self.published[0][1])["temperature"], 21.5)
+
+        WeatherObservation.objects.create(
+            city=self.city, temperature=5.0, timestamp=timezone.now() - timezone.timedelta(days=30),
+        )
+        self.assertEqual(len(self.published), 1)
+
+
+class PublishTests(FakeBrokerMixin, TestCase):
+    def test_new_observation_is_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(city=self.city, temperature=21.5)
+
+        self.assertEqual(len(self.published), 1)
+        city_id, frame = self.published[0]
+        self.assertEqual(city_id, self.city.id)
+        self.assertIn("event: current", frame)
+        self.assertEqual(event_data(frame)["temperature"], 21.5)
+
+    def test_backfill_is_not_published(self):
+        WeatherObservation.objects.create(city=self.city, temperature=20.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(
+                city=self.city, temperature=5.0, timestamp=timezone.now() - timezone.timedelta(days=30),
+            )
+        self.assertEqual(self.published, [])
+
+    def test_bulk_publishes_newest_per_city(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_observations([
+                WeatherObservation(city=self.city, timestamp=now - timezone.timedelta(hours=h), temperature=10.0 + h)
+                for h in range(5)
+            ])
+        self.assertEqual(len(self.published), 1)
+        self.assertEqual(event_data(self.published[0][1])["temperature"], 10.0)
+
+    def test_no_listeners_no_work(self):
+        live.reset_broker()
+        with mock.patch("weather.live._publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                WeatherObservation.objects.create(city=self.city, temperature=21.5)
+        publish.assert_not_called()
+
+
+class CityStreamViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        live.reset_broker()
+        self.city = City.objects.create(name="Bilbao")
+        WeatherObservation.objects.create(city=self.city, temperature=12.0)
+
+    def save_observation(self, temperature):
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(city=self.city, temperature=temperature)
+
+    async def test_stream_sends_initial_and_new_observations(self):
+        response = await self.async_client.get(reverse("weather-stream"), {"city_id": self.city.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        initial = (await anext(stream)).decode()
+        self.assertEqual(event_data(initial)["temperature"], 12.0)
+
+        self.assertTrue(live.hub.has_subscribers(self.city.id))
+        await sync_to_async(self.save_observation)(18.5)
+        update = (await asyncio.wait_for(anext(stream), 2)).decode()
+        self.assertEqual(event_data(update)["temperature"], 18.5)
+
+        # Al desconectarse el cliente, el servidor ASGI cancela la espera
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await pending
+        self.assertFalse(live.hub.has_subscribers(self.city.id))
+
+    async def test_unknown_city(self):
+        response = await self.async_client.get(reverse("weather-stream"), {"city_id": 999})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_observation_before_stream_starts_is_not_lost(self):
+        response = await self.async_client.get(reverse("weather-stream"), {"city_id": self.city.id})
+        # Llega entre la respuesta y el primer evento: el estado inicial ya la incluye
+        await sync_to_async(self.save_observation)(18.5)
+
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        initial = (await anext(stream)).decode()
+        self.assertEqual(event_data(initial)["temperature"], 18.5)
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await pending
+        self.assertFalse(live.hub.has_subscribers(self.city.id))
@@ -0,0 +1,96 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather import metrics
+from weather.models import City, WeatherObservation
+
+
+def server_timing(response) -> dict:
+    """Server-Timing -> {fase: duración en ms}"""
+    return {
+        match.group(1): float(match.group(2))
+        for match in re.finditer(r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+    }
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_metrics()
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=30)
+        WeatherObservation.objects.bulk_create(
+            WeatherObservation(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+            )
+            for i in range(30)
+        )
+
+    def test_server_timing_reports_db_and_render(self):
+        response = self.client.get(reverse("current-weather"), {"city_id": self.city.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        phases = server_timing(response)
+        self.assertIn("db", phases)
+        self.assertIn("render", phases)
+        self.assertIn("total", phases)
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+    def test_cached_response_has_no_queries(self):
+        url = reverse("current-weather")
+        self.client.get(url, {"city_id": self.city.id})
+        response = self.client.get(url, {"city_id": self.city.id})
+
+        self.assertIn('desc="0 queries"', response["Server-Timing"])
+        self.assertEqual(metrics.CACHE_REQUESTS.value(cache="response", result="miss"), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.value(cache="response", result="hit"), 1)
+
+    def test_forecast_fit_is_timed(self):
+        response = self.client.get(
+            reverse("prophet-forecast"), {"city_id": self.city.id, "periods": 3, "engine": "holt_winters"},
+        )
+
+        self.assertIn("fit", server_timing(response))
+        self.assertEqual(metrics.FORECAST_FIT_DURATION.count(engine="holt_winters", variable="temperature"), 1)
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.get(reverse("current-weather"), {"city_id": self.city.id})
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE atmos_http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'atmos_http_request_duration_seconds_count{view="current-weather",method="GET",status="200"} 1',
+            body,
+        )
+        self.assertIn('atmos_cache_requests_total{cache="response",result="miss"} 1', body)
+        self.assertRegex(body, r'atmos_db_queries_total\{view="current-weather"\} [1-9]')
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="Madrid")
+        WeatherObservation.objects.create(city=self.city, temperature=14.0)
+
+    async def test_async_views_count_queries(self):
+        response = await self.async_client.get(reverse("async-current-weather"), {"city_id": self.city.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
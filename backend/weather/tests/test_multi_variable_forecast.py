@@ -0,0 +1,84 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prophet import Prophet
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather import model_cache
+from weather.models import City, WeatherObservation
+from weather.prophet_service import build_multi_variable_forecast, load_training_arrays
+
+
+class MultiVariableForecastTests(APITestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        settings_override = override_settings(PROPHET_MODEL_CACHE_DIR=self.tmp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        model_cache._memory_cache.clear()
+        self.addCleanup(model_cache._memory_cache.clear)
+
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=30)
+        WeatherObservation.objects.bulk_create(
+            WeatherObservation(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+                humidity=60 - i,
+                pressure=1013 + (i % 3),
+                cloud_cover=None,
+            )
+            for i in range(30)
+        )
+        self.url = reverse("prophet-forecast")
+
+    def test_all_variables_come_from_one_read(self):
+        with self.assertNumQueries(2):  # última observación + lectura de la ventana
+            series = load_training_arrays(self.city.id, ["temperature", "humidity", "cloud_cover"])
+
+        self.assertEqual(len(series["temperature"][1]), 30)
+        self.assertEqual(series["humidity"][1][0], 60)
+        # Sin valores no nulos la serie queda vacía
+        self.assertEqual(len(series["cloud_cover"][1]), 0)
+
+    def test_response_contains_one_series_per_variable(self):
+        response = self.client.get(
+            self.url,
+            {"city_id": self.city.id, "periods": 4, "engine": "holt_winters", "variables": "humidity,pressure,cloud_cover"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data["series"]
+        self.assertEqual(list(series), ["humidity", "pressure", "cloud_cover"])
+        self.assertEqual(len(series["humidity"]["points"]), 4)
+        self.assertEqual(series["humidity"]["source"], "live")
+        self.assertEqual(series["cloud_cover"]["points"], [])
+        self.assertNotIn("points", response.data)
+
+    def test_unknown_variable_returns_400(self):
+        response = self.client.get(self.url, {"city_id": self.city.id, "variables": "temperature,city"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prophet_models_are_cached_per_variable(self):
+        with mock.patch.object(Prophet, "fit", autospec=True, side_effect=Prophet.fit) as fit:
+            first = build_multi_variable_forecast(self.city.id, ["temperature", "humidity"], periods=3)
+            second = build_multi_variable_forecast(self.city.id, ["temperature", "humidity"], periods=3)
+
+        self.assertEqual(fit.call_count, 2)
+        self.assertEqual(len(first["humidity"]), 3)
+        self.assertEqual(len(second["temperature"]), 3)
+        self.assertNotEqual(first["temperature"][0]["yhat"], first["humidity"][0]["yhat"])
+        self.assertEqual(
+            sorted(path.name for path in Path(self.tmp_dir.name).glob("*.json")),
+            [f"city_{self.city.id}.json", f"city_{self.city.id}_humidity.json"],
+        )
+
+        model_cache.invalidate_model(self.city.id)
+        self.assertEqual(list(Path(self.tmp_dir.name).glob("*.json")), [])
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.export import parquet_available
+from weather.ingest import bulk_create_observations
+from weather.models import City, WeatherObservation
+
+
+class ObservationExportTests(APITestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Madrid")
+        other = City.objects.create(name="Barcelona")
+        base = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        # Dos observaciones con el mismo timestamp para probar el desempate por id
+        bulk_create_observations(
+            [
+                WeatherObservation(city=self.city, timestamp=base + timedelta(hours=i // 2), temperature=float(i))
+                for i in range(7)
+            ]
+            + [WeatherObservation(city=other, timestamp=base, temperature=99.0)]
+        )
+        self.user = User.objects.create_user(username="analista", password="testpass123")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("observations-export")
+
+    def _content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv_stream(self):
+        response = self.client.get(self.url, {"city_id": self.city.id, "fmt": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(self._content(response).decode())))
+        self.assertEqual([float(r["temperature"]) for r in rows], [float(i) for i in range(7)])
+
+    def test_ndjson_stream(self):
+        response = self.client.get(self.url, {"fmt": "ndjson"})
+        lines = self._content(response).decode().splitlines()
+
+        self.assertEqual(len(lines), 8)
+        self.assertIn("dew_point", json.loads(lines[0]))
+
+    @unittest.skipUnless(parquet_available(), "pyarrow no instalado")
+    def test_parquet_stream(self):
+        import pyarrow.parquet as pq
+
+        response = self.client.get(self.url, {"city_id": self.city.id, "fmt": "parquet"})
+        table = pq.read_table(io.BytesIO(self._content(response)))
+
+        self.assertEqual(table.num_rows, 7)
+        self.assertEqual(table.column("temperature").to_pylist(), [float(i) for i in range(7)])
+
+    def test_json_keyset_pagination_walks_all_rows(self):
+        """Recorrer las páginas con next_cursor devuelve todas las filas una sola vez"""
+        seen = []
+        params = {"city_id": self.city.id, "fmt": "json", "limit": 3}
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row["temperature"] for row in response.data["results"])
+            if response.data["next_cursor"] is None:
+                break
+            params["cursor"] = response.data["next_cursor"]
+
+        self.assertEqual(seen, [float(i) for i in range(7)])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {"fmt": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(self.url, {"fmt": "json", "cursor": "???"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        # Fecha bien formada pero inexistente
+        self.assertEqual(self.client.get(self.url, {"from": "2025-02-30"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from weather.city_photos import select_city_photo
+from weather.emblem_photos import select_emblem_photo
+from weather.models import City, PhotoCatalogEntry, WeatherObservation
+from weather.photo_catalog import get_photo_catalog
+
+
+class PhotoCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seeded_emblem_rules(self):
+        cases = [
+            (("clear", 35.0, True), "heatwave_city_01.jpg"),
+            (("rain", 35.0, True), "heatwave_city_01.jpg"),
+            (("clear", -3.0, True), "snow_city_01.jpg"),
+            (("sleet", 1.0, False), "snow_city_01.jpg"),
+            (("Rain ", 12.0, True), "rain_city_01.jpg"),
+            (("thunderstorm", 20.0, True), "storm_city_01.jpg"),
+            (("scattered clouds", 20.0, False), "cloudy_city_01.jpg"),
+            (("clear", 20.0, True), "clear_day_city_01.jpg"),
+            (("", 20.0, False), "clear_night_city_01.jpg"),
+            (("fog", 10.0, True), "default_city_01.jpg"),
+        ]
+        for args, code in cases:
+            self.assertEqual(select_emblem_photo(*args).code, code, args)
+
+    def test_lookups_do_not_query(self):
+        get_photo_catalog()
+        with self.assertNumQueries(0):
+            select_emblem_photo("rain", 12.0, True)
+            select_city_photo(city_id=99, city_name="Madrid")
+
+    def test_city_photo_by_id_name_and_fallback(self):
+        city = City.objects.create(name="Bilbao")
+        PhotoCatalogEntry.objects.create(kind="city", city=city, code="bilbao_guggenheim_01.jpg")
+
+        self.assertEqual(select_city_photo(city_id=city.id, city_name="Bilbao").code, "bilbao_guggenheim_01.jpg")
+        self.assertEqual(select_city_photo(city_name="PARÍS").code, "paris_skyline_01.jpg")
+        self.assertEqual(select_city_photo(city_id=12345, city_name="Soria").code, "default_city_01.jpg")
+
+    def test_variants_and_specific_rows(self):
+        PhotoCatalogEntry.objects.create(kind="city", city_name="Madrid", code="madrid_skyline_02.jpg")
+        PhotoCatalogEntry.objects.create(
+            kind="city", city_name="Madrid", condition="rain", code="madrid_rain_01.jpg",
+        )
+        self.assertEqual(select_city_photo(city_name="Madrid", variant=0).code, "madrid_skyline_01.jpg")
+        self.assertEqual(select_city_photo(city_name="Madrid", variant=1).code, "madrid_skyline_02.jpg")
+        self.assertEqual(select_city_photo(city_name="Madrid", condition="rain").code, "madrid_rain_01.jpg")
+
+    def test_inactive_and_deleted_rows(self):
+        entry = PhotoCatalogEntry.objects.get(kind="emblem", code="rain_city_01.jpg", condition="rain")
+        entry.active = False
+        entry.save()
+        self.assertEqual(select_emblem_photo("rain", 12.0, True).code, "default_city_01.jpg")
+        entry.delete()
+        self.assertEqual(select_emblem_photo("drizzle", 12.0, True).code, "rain_city_01.jpg")
+
+    def test_catalog_change_invalidates_conditions_response(self):
+        city = City.objects.create(name="Vigo")
+        WeatherObservation.objects.create(city=city, temperature=14.0, precipitation=3.0)
+        url = reverse("current-conditions")
+        self.assertEqual(self.client.get(url, {"city_id": city.id}).data["city_photo"], "default_city_01.jpg")
+
+        PhotoCatalogEntry.objects.create(kind="city", city=city, code="vigo_ria_01.jpg")
+        self.assertEqual(self.client.get(url, {"city_id": city.id}).data["city_photo"], "vigo_ria_01.jpg")
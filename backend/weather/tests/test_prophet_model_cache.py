@@ -0,0 +1,72 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prophet import Prophet
+
+from weather import model_cache
+from weather.models import City, WeatherObservation
+from weather.prophet_service import build_prophet_forecast
+
+
+class ProphetModelCacheTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        settings_override = override_settings(
+            PROPHET_MODEL_CACHE_DIR=self.tmp_dir.name,
+            PROPHET_MODEL_MAX_AGE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        model_cache._memory_cache.clear()
+        self.addCleanup(model_cache._memory_cache.clear)
+
+        self.city = City.objects.create(name="Madrid")
+        base_time = timezone.now() - timezone.timedelta(hours=10)
+        for i in range(10):
+            WeatherObservation.objects.create(
+                city=self.city,
+                timestamp=base_time + timezone.timedelta(hours=i),
+                temperature=20 + i * 0.5,
+            )
+
+        # Contamos los entrenamientos sin cambiar el comportamiento de Prophet.fit
+        patcher = mock.patch.object(Prophet, "fit", autospec=True, side_effect=Prophet.fit)
+        self.fit_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_second_forecast_reuses_fitted_model(self):
+        """Dos predicciones seguidas sin datos nuevos entrenan una sola vez"""
+        build_prophet_forecast(city_id=self.city.id, periods=3)
+        build_prophet_forecast(city_id=self.city.id, periods=6)
+
+        self.assertEqual(self.fit_mock.call_count, 1)
+
+    def test_model_is_loaded_from_disk_after_restart(self):
+        """Tras vaciar la memoria (reinicio del worker) el modelo se lee de disco"""
+        first = build_prophet_forecast(city_id=self.city.id, periods=3)
+        model_cache._memory_cache.clear()
+        second = build_prophet_forecast(city_id=self.city.id, periods=3)
+
+        self.assertEqual(self.fit_mock.call_count, 1)
+        self.assertEqual(len(first), len(second))
+
+    def test_new_observation_invalidates_model(self):
+        """Una observación nueva para la ciudad provoca un reentrenamiento"""
+        build_prophet_forecast(city_id=self.city.id, periods=3)
+        WeatherObservation.objects.create(city=self.city, temperature=26.0)
+        build_prophet_forecast(city_id=self.city.id, periods=3)
+
+        self.assertEqual(self.fit_mock.call_count, 2)
+
+    def test_staleness_window_tolerates_new_observations(self):
+        """Dentro de PROPHET_MODEL_MAX_AGE se reutiliza el modelo aunque haya datos nuevos"""
+        build_prophet_forecast(city_id=self.city.id, periods=3)
+        WeatherObservation.objects.create(city=self.city, temperature=26.0)
+
+        with override_settings(PROPHET_MODEL_MAX_AGE=3600):
+            build_prophet_forecast(city_id=self.city.id, periods=3)
+
+        self.assertEqual(self.fit_mock.call_count, 1)
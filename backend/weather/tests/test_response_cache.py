@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.ingest import bulk_create_observations
+from weather.models import City, WeatherObservation
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="Bilbao")
+        WeatherObservation.objects.create(city=self.city, temperature=14.0)
+        self.url = reverse("current-weather")
+
+    def test_second_request_is_served_without_queries(self):
+        """Mientras no haya datos nuevos la respuesta sale de la caché"""
+        first = self.client.get(self.url, {"city_id": self.city.id})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {"city_id": self.city.id})
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_if_none_match_returns_304(self):
+        first = self.client.get(self.url, {"city_id": self.city.id})
+        response = self.client.get(self.url, {"city_id": self.city.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], first["ETag"])
+
+    def test_if_modified_since_returns_304(self):
+        first = self.client.get(self.url, {"city_id": self.city.id})
+        response = self.client.get(
+            self.url, {"city_id": self.city.id}, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_observation_invalidates_cached_response(self):
+        """Guardar una observación invalida la caché y cambia el ETag"""
+        first = self.client.get(self.url, {"city_id": self.city.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherObservation.objects.create(
+                city=self.city, timestamp=timezone.now() + timezone.timedelta(minutes=5), temperature=16.5,
+            )
+        response = self.client.get(self.url, {"city_id": self.city.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["temperature"], 16.5)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_bulk_ingest_invalidates_cached_response(self):
+        """La ingesta en bloque (sin post_save) también invalida"""
+        self.client.get(self.url, {"city_id": self.city.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_observations([
+                WeatherObservation(city=self.city, timestamp=timezone.now() + timezone.timedelta(hours=1), temperature=9.0),
+            ])
+        response = self.client.get(self.url, {"city_id": self.city.id})
+        self.assertEqual(response.data["temperature"], 9.0)
+
+    def test_invalidation_waits_for_commit(self):
+        """
+        Antes del commit no se invalida: una petición concurrente que aún lee los
+        datos antiguos los guardaría bajo la versión nueva
+        """
+        first = self.client.get(self.url, {"city_id": self.city.id})
+        with self.captureOnCommitCallbacks() as callbacks:
+            bulk_create_observations([
+                WeatherObservation(city=self.city, timestamp=timezone.now() + timezone.timedelta(hours=1), temperature=9.0),
+            ])
+            response = self.client.get(self.url, {"city_id": self.city.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for callback in callbacks:
+            callback()
+        response = self.client.get(self.url, {"city_id": self.city.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.data["temperature"], 9.0)
+
+    def test_conditions_are_cached_per_city_name(self):
+        url = reverse("current-conditions")
+        first = self.client.get(url, {"city_name": "Bilbao"})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"city_name": "Bilbao"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from weather.export import parquet_available
+from weather.models import City, ObservationRollup, RetentionRun, WeatherObservation
+from weather.retention import apply_retention, months_to_purge, retention_cutoff
+from weather.rollups import rebuild_rollups
+
+UTC = dt_timezone.utc
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        # 2 ciudades con datos horarios del 1 de enero al 31 de marzo de 2024
+        call_command(
+            "generate_observations", "--cities", "2", "--days", "91", "--end", "2024-03-31T23:00",
+            stdout=StringIO(),
+        )
+        self.cutoff = datetime(2024, 3, 1, tzinfo=UTC)
+
+    def monthly_counts(self):
+        return dict(
+            ObservationRollup.objects.filter(resolution="month")
+            .values("bucket_start")
+            .annotate(n=Sum("count"))
+            .values_list("bucket_start", "n")
+        )
+
+    def test_cutoff_keeps_whole_months(self):
+        now = datetime(2024, 4, 20, 10, tzinfo=UTC)
+        self.assertEqual(retention_cutoff(30, now=now), datetime(2024, 3, 1, tzinfo=UTC))
+        self.assertEqual(retention_cutoff(365, now=now), datetime(2023, 4, 1, tzinfo=UTC))
+
+    def test_purges_old_months_and_keeps_rollups(self):
+        rollups_before = self.monthly_counts()
+        self.assertEqual(
+            [(month.month, count) for month, count in months_to_purge(self.cutoff)],
+            [(1, 2 * 31 * 24), (2, 2 * 29 * 24)],
+        )
+
+        results = list(apply_retention(self.cutoff, chunk_size=500))
+
+        self.assertEqual([r.deleted for r in results], [2 * 31 * 24, 2 * 29 * 24])
+        self.assertFalse(WeatherObservation.objects.filter(timestamp__lt=self.cutoff).exists())
+        self.assertEqual(WeatherObservation.objects.count(), 2 * 31 * 24)
+        self.assertEqual(self.monthly_counts(), rollups_before)
+
+        run = RetentionRun.objects.get()
+        self.assertEqual(run.purged_before, self.cutoff)
+        self.assertEqual(run.observations_deleted, 2 * 60 * 24)
+        self.assertIsNotNone(run.finished_at)
+
+        # Un rebuild completo ya no borra los agregados de los meses purgados
+        rebuild_rollups()
+        self.assertEqual(self.monthly_counts(), rollups_before)
+
+    def test_missing_rollups_are_built_before_deleting(self):
+        ObservationRollup.objects.filter(bucket_start__lt=datetime(2024, 2, 1, tzinfo=UTC)).delete()
+        results = list(apply_retention(self.cutoff))
+        self.assertGreater(results[0].rollups_rebuilt, 0)
+        self.assertEqual(results[1].rollups_rebuilt, 0)
+        january = ObservationRollup.objects.filter(resolution="month", bucket_start=datetime(2024, 1, 1, tzinfo=UTC))
+        self.assertEqual(sum(january.values_list("count", flat=True)), 2 * 31 * 24)
+
+    def test_latest_observation_is_kept(self):
+        city = City.objects.order_by("id").first()
+        old = WeatherObservation.objects.filter(city=city).order_by("timestamp").first()
+        City.objects.filter(pk=city.pk).update(latest_observation=old)
+
+        list(apply_retention(self.cutoff))
+        self.assertTrue(WeatherObservation.objects.filter(pk=old.pk).exists())
+        city.refresh_from_db()
+        self.assertEqual(city.latest_observation_id, old.pk)
+
+    def test_only_latest_pointer_references_observations(self):
+        # delete_month borra con SQL directo: otra FK exigiría revisarlo
+        relations = [
+            (field.related_model, field.field.name)
+            for field in WeatherObservation._meta.get_fields(include_hidden=True)
+            if field.auto_created and not field.concrete
+        ]
+        self.assertEqual(relations, [(City, "latest_observation")])
+
+    @unittest.skipUnless(parquet_available(), "pyarrow no instalado")
+    def test_archive_to_parquet(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = list(apply_retention(self.cutoff, archive_dir=Path(directory), chunk_size=1000))
+            paths = sorted(path.name for path in Path(directory).iterdir())
+            self.assertEqual(len(paths), 2)
+            self.assertTrue(paths[0].startswith("observations_2024-01_"))
+
+            table = pq.read_table(results[0].archive_path)
+            self.assertEqual(table.num_rows, 2 * 31 * 24)
+            self.assertEqual(results[0].archived, results[0].deleted)
+
+    def test_command(self):
+        with mock.patch("weather.retention.timezone.now", return_value=datetime(2024, 3, 31, tzinfo=UTC)):
+            out = StringIO()
+            call_command("apply_retention", "--days", "20", "--dry-run", stdout=out)
+            self.assertIn("2024-02: 1392 observaciones", out.getvalue())
+            self.assertEqual(WeatherObservation.objects.count(), 2 * 91 * 24)
+
+            out = StringIO()
+            call_command("apply_retention", "--days", "20", stdout=out)
+            self.assertIn(f"✓ {2 * 60 * 24} observaciones purgadas", out.getvalue())
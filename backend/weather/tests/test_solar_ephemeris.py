@@ -0,0 +1,105 @@
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from weather import ephemeris, solar
+from weather.models import City
+
+
+class SolarEphemerisTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(SOLAR_EPHEMERIS_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        ephemeris._tables.clear()
+        self.addCleanup(ephemeris._tables.clear)
+
+        self.madrid = City.objects.create(name="Madrid", latitud=40.4168, longitud=-3.7038)
+        self.svalbard = City.objects.create(name="Longyearbyen", latitud=78.22, longitud=15.65)
+        self.honolulu = City.objects.create(name="Honolulu", latitud=21.3, longitud=-157.85)
+
+    def test_command_builds_table(self):
+        out = StringIO()
+        call_command("build_solar_ephemeris", "--year", "2024", stdout=out)
+        self.assertIn("3 ciudades × 366 días", out.getvalue())
+
+        table = ephemeris.load_table(2024)
+        self.assertEqual(table.sunrise.shape, (3, 366))
+        self.assertEqual(table.sunrise.dtype.itemsize, 2)
+
+        # Coincide con el cálculo al vuelo (redondeado al minuto)
+        sunrise, sunset, noon, polar = ephemeris.sun_times_for(self.madrid, date(2024, 6, 21))
+        times = solar.sun_times(40.4168, -3.7038, 173)
+        self.assertEqual(polar, 0)
+        self.assertAlmostEqual(sunrise, float(times.sunrise), delta=0.5)
+        self.assertAlmostEqual(sunset, float(times.sunset), delta=0.5)
+        self.assertAlmostEqual(noon, float(times.solar_noon), delta=0.5)
+
+        self.assertEqual(ephemeris.sun_times_for(self.svalbard, date(2024, 6, 21))[3], 1)
+        self.assertEqual(ephemeris.sun_times_for(self.svalbard, date(2024, 12, 21))[3], -1)
+
+    def test_is_daytime_matches_solar(self):
+        ephemeris.build_ephemeris(2025)
+        start = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        for city in (self.madrid, self.svalbard, self.honolulu):
+            for hours in range(0, 365 * 24, 37):
+                when = start + timedelta(hours=hours)
+                sunrise, sunset, _, polar = ephemeris.sun_times_for(city, when.date())
+                if not polar and min(abs(when.hour * 60 - sunrise) % 1440, abs(when.hour * 60 - sunset) % 1440) < 2:
+                    continue  # en el minuto del orto/ocaso el redondeo puede cambiar el resultado
+                self.assertEqual(
+                    ephemeris.is_daytime(city, when),
+                    solar.is_daytime(city.latitud, city.longitud, when),
+                    (city.name, when),
+                )
+
+    def test_sun_events_bracket_daylight_changes(self):
+        ephemeris.build_ephemeris(2025)
+        margin = timedelta(minutes=2)
+        for city in (self.madrid, self.honolulu):
+            for when in (datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc), datetime(2025, 3, 1, 23, tzinfo=dt_timezone.utc)):
+                previous, following = ephemeris.sun_events(city, when)
+                self.assertLessEqual(previous, when)
+                self.assertGreater(following, when)
+                self.assertLess(following - previous, timedelta(hours=24))
+                daytime = ephemeris.is_daytime(city, when)
+                self.assertEqual(ephemeris.is_daytime(city, previous + margin), daytime, (city.name, when))
+                self.assertEqual(ephemeris.is_daytime(city, following - margin), daytime, (city.name, when))
+                self.assertNotEqual(ephemeris.is_daytime(city, following + margin), daytime, (city.name, when))
+
+        self.assertEqual(ephemeris.sun_events(self.svalbard, datetime(2025, 6, 21, tzinfo=dt_timezone.utc)), (None, None))
+
+    def test_lookup_does_not_recompute(self):
+        ephemeris.build_ephemeris(2025)
+        ephemeris.load_table(2025)
+        with mock.patch("weather.ephemeris.solar.sun_times") as sun_times:
+            self.assertTrue(ephemeris.is_daytime(self.madrid, datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc)))
+        sun_times.assert_not_called()
+
+    def test_fallback_for_new_or_moved_cities(self):
+        ephemeris.build_ephemeris(2025)
+        new = City.objects.create(name="Sídney", latitud=-33.87, longitud=151.21)
+        self.madrid.longitud = 140.0
+        noon_utc = datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc)
+        with mock.patch("weather.ephemeris.solar.sun_times", wraps=solar.sun_times) as sun_times:
+            self.assertFalse(ephemeris.is_daytime(new, noon_utc))
+            self.assertFalse(ephemeris.is_daytime(self.madrid, noon_utc))
+        self.assertEqual(sun_times.call_count, 2)
+
+    def test_rebuilt_file_is_reloaded(self):
+        ephemeris.build_ephemeris(2025)
+        self.assertEqual(len(ephemeris.load_table(2025).city_ids), 3)
+        City.objects.create(name="Sídney", latitud=-33.87, longitud=151.21)
+        ephemeris.build_ephemeris(2025)
+        self.assertEqual(len(ephemeris.load_table(2025).city_ids), 4)
+
+    @override_settings(SOLAR_EPHEMERIS_DIR="")
+    def test_without_directory_computes_on_the_fly(self):
+        self.assertIsNone(ephemeris.load_table(2025))
+        self.assertTrue(ephemeris.is_daytime(self.madrid, datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc)))
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from weather.models import City, WeatherObservation
+from weather.spatial import CityIndex, get_city_index
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+class CityIndexTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        lats, lons = rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000)
+        index = CityIndex(range(2000), lats, lons)
+
+        for lat, lon in zip(rng.uniform(-90, 90, 200), rng.uniform(-180, 180, 200)):
+            distances = [haversine_km(lat, lon, a, b) for a, b in zip(lats, lons)]
+            expected = np.argsort(distances)[:3]
+            found = index.nearest(lat, lon, k=3)
+            self.assertEqual([city_id for city_id, _ in found], expected.tolist())
+            self.assertAlmostEqual(found[0][1], distances[expected[0]], places=6)
+
+    def test_antimeridian(self):
+        index = CityIndex([1, 2], [0.0, 0.0], [179.5, 170.0])
+        self.assertEqual(index.nearest(0.0, -179.9)[0][0], 1)
+
+    def test_empty(self):
+        self.assertEqual(CityIndex([], [], []).nearest(40.0, -3.0), [])
+
+
+class NearestCityViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.madrid = City.objects.create(name="Madrid", latitud=40.4168, longitud=-3.7038)
+        self.bilbao = City.objects.create(name="Bilbao", latitud=43.2630, longitud=-2.9350)
+        for city in (self.madrid, self.bilbao):
+            WeatherObservation.objects.create(city=city, temperature=15.0)
+        self.url = reverse("current-weather")
+
+    def test_resolves_nearest_city(self):
+        response = self.client.get(self.url, {"lat": 40.3, "lon": -3.9})  # Móstoles
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["city_id"], self.madrid.id)
+
+        response = self.client.get(self.url, {"lat": 43.3, "lon": -2.0})  # San Sebastián
+        self.assertEqual(response.data["city_id"], self.bilbao.id)
+
+    def test_index_follows_city_changes(self):
+        get_city_index()
+        self.bilbao.latitud, self.bilbao.longitud = 40.5, -3.8
+        self.bilbao.save()
+        response = self.client.get(self.url, {"lat": 40.52, "lon": -3.81})
+        self.assertEqual(response.data["city_id"], self.bilbao.id)
+
+        self.bilbao.delete()
+        response = self.client.get(self.url, {"lat": 40.52, "lon": -3.81})
+        self.assertEqual(response.data["city_id"], self.madrid.id)
+
+    def test_invalid_coordinates(self):
+        for params in ({"lat": 40}, {"lat": "x", "lon": 1}, {"lat": 91, "lon": 0}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    @override_settings(NEAREST_CITY_MAX_DISTANCE_KM=100)
+    def test_max_distance(self):
+        response = self.client.get(self.url, {"lat": 28.1, "lon": -15.4})  # Canarias
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncNearestCityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="Sevilla", latitud=37.3891, longitud=-5.9845)
+        WeatherObservation.objects.create(city=self.city, temperature=25.0)
+
+    async def test_async_view_accepts_coordinates(self):
+        response = await self.async_client.get(reverse("async-current-weather"), {"lat": 37.4, "lon": -6.0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city_id"], self.city.id)
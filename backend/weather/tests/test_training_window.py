@@ -0,0 +1,80 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from weather import prophet_service
+from weather.forecast_engines import regularize
+from weather.models import City, WeatherObservation
+
+
+class RegularizeTests(SimpleTestCase):
+    def test_grid_is_aligned_to_the_hour(self):
+        ds = np.array(["2025-01-01T10:20", "2025-01-01T10:50", "2025-01-01T11:10"], dtype="datetime64[ns]")
+        grid, values = regularize(ds, np.array([10.0, 20.0, 30.0]), "H")
+
+        self.assertEqual(list(grid.astype("datetime64[m]").astype(str)), ["2025-01-01T10:00", "2025-01-01T11:00"])
+        self.assertEqual(list(values), [15.0, 30.0])
+
+    def test_gaps_dropped_without_fill(self):
+        ds = np.array(["2025-01-01T00:00", "2025-01-01T03:00"], dtype="datetime64[ns]")
+        grid, values = regularize(ds, np.array([1.0, 4.0]), "H", fill_gaps=False)
+
+        self.assertEqual(len(grid), 2)
+        self.assertEqual(list(values), [1.0, 4.0])
+
+
+class TrainingWindowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name="Madrid")
+        cls.last = datetime(2025, 6, 30, 12, 0, tzinfo=dt_timezone.utc)
+        # 60 días de datos, dos observaciones por hora
+        WeatherObservation.objects.bulk_create(
+            WeatherObservation(
+                city=cls.city,
+                timestamp=cls.last - timezone.timedelta(minutes=30 * i),
+                temperature=float(i % 2),
+            )
+            for i in range(60 * 48)
+        )
+
+    @override_settings(FORECAST_TRAINING_WINDOW_DAYS=7, FORECAST_TRAINING_FREQ="H")
+    def test_window_and_resample_bound_the_series(self):
+        ds, y = prophet_service.load_training_series(self.city.id)
+
+        # 7 días * 24 h + la hora final
+        self.assertEqual(len(ds), 7 * 24 + 1)
+        self.assertEqual(ds[-1].item(), self.last.replace(tzinfo=None))
+        self.assertEqual(ds[0].item(), (self.last - timezone.timedelta(days=7)).replace(tzinfo=None))
+        # Cada hora intermedia promedia sus dos medias horas (0 y 1)
+        self.assertTrue(np.allclose(y[1:-1], 0.5))
+
+    @override_settings(FORECAST_TRAINING_WINDOW_DAYS=0, FORECAST_TRAINING_FREQ="")
+    def test_zero_window_keeps_full_raw_history(self):
+        ds, y = prophet_service.load_training_series(self.city.id)
+        self.assertEqual(len(ds), 60 * 48)
+        self.assertTrue(np.all(np.diff(ds) > np.timedelta64(0)))
+
+    def test_empty_city_returns_empty_arrays(self):
+        other = City.objects.create(name="Sevilla")
+        ds, y = prophet_service.load_training_series(other.id)
+        self.assertEqual(len(ds), 0)
+        self.assertEqual(len(y), 0)
+
+    def test_window_is_part_of_model_fingerprint(self):
+        with override_settings(FORECAST_TRAINING_WINDOW_DAYS=7):
+            short = prophet_service._training_fingerprint(self.city.id)
+        with override_settings(FORECAST_TRAINING_WINDOW_DAYS=30):
+            long = prophet_service._training_fingerprint(self.city.id)
+        self.assertNotEqual(short, long)
+
+    @override_settings(FORECAST_TRAINING_WINDOW_DAYS=2)
+    def test_prophet_trains_on_windowed_frame(self):
+        with mock.patch.object(prophet_service, "fit_prophet") as fit:
+            prophet_service._fit_model(self.city.id)
+        df = fit.call_args.args[0]
+        self.assertEqual(list(df.columns), ["ds", "y"])
+        self.assertEqual(len(df), 2 * 24 + 1)
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from weather.ingest import bulk_create_observations
+from weather.models import City, ObservationRollup, WeatherObservation
+from weather.rollups import rebuild_rollups
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class WeatherHistoryTests(APITestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Madrid")
+        # Dos días con tres observaciones cada uno
+        for day, temps in ((1, (10.0, 14.0, 12.0)), (2, (20.0, 24.0, 22.0))):
+            for hour, temp in zip((6, 12, 18), temps):
+                WeatherObservation.objects.create(
+                    city=self.city,
+                    timestamp=utc(2025, 3, day, hour),
+                    temperature=temp,
+                    precipitation=1.5,
+                    wind_speed=10.0,
+                    wind_gust=hour,
+                )
+        self.url = reverse("weather-history")
+
+    def test_rollups_are_maintained_on_save(self):
+        day = ObservationRollup.objects.get(city=self.city, resolution="day", bucket_start=utc(2025, 3, 1))
+        self.assertEqual(day.count, 3)
+        self.assertEqual(day.temperature_min, 10.0)
+        self.assertEqual(day.temperature_max, 14.0)
+        self.assertEqual(day.wind_gust_max, 18)
+
+        month = ObservationRollup.objects.get(city=self.city, resolution="month")
+        self.assertEqual(month.count, 6)
+        self.assertEqual(ObservationRollup.objects.filter(city=self.city, resolution="hour").count(), 6)
+
+    def test_daily_history_endpoint(self):
+        response = self.client.get(
+            self.url, {"city_id": self.city.id, "resolution": "day", "from": "2025-03-01", "to": "2025-03-31"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data["points"]
+        self.assertEqual(len(points), 2)
+        self.assertEqual(points[0]["temperature_avg"], 12.0)
+        self.assertEqual(points[1]["temperature_max"], 24.0)
+        self.assertEqual(points[1]["precipitation_total"], 4.5)
+        self.assertEqual(points[1]["wind_speed_avg"], 10.0)
+
+    def test_bulk_ingest_updates_rollups(self):
+        bulk_create_observations([
+            WeatherObservation(city=self.city, timestamp=utc(2025, 3, 1, h), temperature=30.0)
+            for h in (20, 21)
+        ])
+        day = ObservationRollup.objects.get(city=self.city, resolution="day", bucket_start=utc(2025, 3, 1))
+        self.assertEqual(day.count, 5)
+        self.assertEqual(day.temperature_max, 30.0)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        expected = list(ObservationRollup.objects.order_by("resolution", "bucket_start").values_list(
+            "resolution", "bucket_start", "count", "temperature_min", "temperature_max", "temperature_sum",
+        ))
+        ObservationRollup.objects.all().delete()
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        rebuilt = list(ObservationRollup.objects.order_by("resolution", "bucket_start").values_list(
+            "resolution", "bucket_start", "count", "temperature_min", "temperature_max", "temperature_sum",
+        ))
+        self.assertEqual(rebuilt, expected)
+
+    def test_rebuild_in_batches_of_cities_and_months(self):
+        other = City.objects.create(name="Soria")
+        WeatherObservation.objects.create(city=other, timestamp=utc(2025, 4, 2, 9), temperature=5.0)
+        # Agregado sin observaciones detrás: la reconstrucción lo elimina
+        ObservationRollup.objects.create(
+            city=other, resolution="day", bucket_start=utc(2025, 1, 5), count=1,
+            temperature_min=1.0, temperature_max=1.0, temperature_sum=1.0,
+        )
+
+        with mock.patch("weather.rollups.REBUILD_CITY_BATCH", 1):
+            written = rebuild_rollups()
+
+        # Madrid: 6 horas + 2 días + 1 mes; Soria: 1 + 1 + 1
+        self.assertEqual(written, 12)
+        self.assertFalse(ObservationRollup.objects.filter(bucket_start=utc(2025, 1, 5)).exists())
+        self.assertEqual(ObservationRollup.objects.get(city=other, resolution="month").count, 1)
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {"city_id": self.city.id, "resolution": "week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"city_id": self.city.id, "from": "ayer"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Bien formadas pero inexistentes
+        for value in ("2025-02-30", "2025-01-01T24:00:00"):
+            response = self.client.get(self.url, {"city_id": self.city.id, "from": value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--from", "2025-02-30", stdout=StringIO())
@@ -1,11 +1,34 @@
 # backend/weather/urls.py
 
 from django.urls import path
-from .views import CurrentWeatherView, ProphetForecastView, CurrentConditionsView
+from .async_views import AsyncCurrentConditionsView, AsyncCurrentWeatherView, AsyncForecastView, CityStreamView
+from .views import (
+    CurrentWeatherView,
+    ProphetForecastView,
+    CurrentConditionsView,
+    ObservationBulkIngestView,
+    WeatherHistoryView,
+    ObservationExportView,
+    MetricsView,
+    InterpolationView,
+    InterpolationGridView,
+    CitySearchView,
+)
 
 urlpatterns = [
     path("api/weather/current/", CurrentWeatherView.as_view(), name="current-weather"),
     path("api/forecast/prophet/", ProphetForecastView.as_view(), name="prophet-forecast"),
     path("api/weather/conditions/", CurrentConditionsView.as_view(), name="current-conditions"),
+    path("api/weather/history/", WeatherHistoryView.as_view(), name="weather-history"),
+    path("api/weather/observations/bulk/", ObservationBulkIngestView.as_view(), name="observations-bulk"),
+    path("api/weather/observations/export/", ObservationExportView.as_view(), name="observations-export"),
+    path("api/weather/interpolate/", InterpolationView.as_view(), name="weather-interpolate"),
+    path("api/weather/interpolate/grid/", InterpolationGridView.as_view(), name="weather-interpolate-grid"),
+    path("api/weather/stream/", CityStreamView.as_view(), name="weather-stream"),
+    path("api/cities/search/", CitySearchView.as_view(), name="city-search"),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+    # Variantes asíncronas para despliegues ASGI (config/asgi.py)
+    path("api/async/weather/current/", AsyncCurrentWeatherView.as_view(), name="async-current-weather"),
+    path("api/async/weather/conditions/", AsyncCurrentConditionsView.as_view(), name="async-current-conditions"),
+    path("api/async/forecast/", AsyncForecastView.as_view(), name="async-forecast"),
 ]
-
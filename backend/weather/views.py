@@ -1,16 +1,91 @@
 # backend/weather/views.py
 
+import math
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
 from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework import status, permissions
 
-from .prophet_service import build_prophet_forecast
+from . import ephemeris, export, metrics
+from .ingest import ingest_observation_rows
+from .parsers import NDJSONParser
+from .forecast_engines import ENGINES
+from .interpolation import INTERPOLATION_VARIABLES, get_snapshot, grid_axes, interpolate, to_json_values
+from .prophet_service import (
+    FORECAST_VARIABLES,
+    build_forecast,
+    build_multi_variable_forecast,
+    build_prophet_forecast,
+    get_precomputed_forecast,
+)
+from .conditions import observation_condition, photo_url
 from .emblem_photos import select_emblem_photo
 from .city_photos import select_city_photo
-from .models import City, WeatherObservation
+from .models import City, ObservationRollup, WeatherObservation
+from .photo_catalog import PHOTO_CATALOG_SCOPE
+from .response_cache import cached_response, city_scope, name_scope
+from .search import find_city_id, search_cities
 from .serializers import CurrentWeatherSerializer
+from .spatial import nearest_city
+
+
+MAX_BATCH_CITY_IDS = 100
+
+
+def current_weather_data(city, observation):
+    """Datos de clima actual de una ciudad para CurrentWeatherSerializer."""
+    return {
+        "city_id": city.id,
+        "city_name": city.name,
+        "temperature": observation.temperature,
+        "timestamp": observation.timestamp,
+        # Misma condición que /conditions para la misma observación
+        "condition": observation_condition(observation),
+    }
+
+
+def parse_coordinates(query_params) -> Tuple[Optional[Tuple[float, float]], Optional[str]]:
+    """
+    (lat, lon) de ?lat=&lon= ya validados y None, o (None, error).
+    (None, None) si la petición no trae coordenadas.
+    """
+    raw_lat, raw_lon = query_params.get("lat"), query_params.get("lon")
+    if raw_lat is None and raw_lon is None:
+        return None, None
+    if raw_lat is None or raw_lon is None:
+        return None, "lat y lon deben ir juntos"
+    try:
+        latitude, longitude = float(raw_lat), float(raw_lon)
+    except ValueError:
+        return None, "lat y lon deben ser números"
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, "lat debe estar entre -90 y 90 y lon entre -180 y 180"
+    return (latitude, longitude), None
+
+
+def nearest_city_id(latitude: float, longitude: float) -> Optional[int]:
+    """
+    Ciudad más cercana según el índice espacial en memoria, o None si no hay
+    ninguna dentro de NEAREST_CITY_MAX_DISTANCE_KM (0 = sin límite).
+    """
+    found = nearest_city(latitude, longitude)
+    if found is None:
+        return None
+    city_id, distance_km = found
+    max_distance = getattr(settings, "NEAREST_CITY_MAX_DISTANCE_KM", 0)
+    if max_distance and distance_km > max_distance:
+        return None
+    return city_id
 
 
 class CurrentWeatherView(APIView):
@@ -20,15 +95,39 @@ class CurrentWeatherView(APIView):
     GET /api/weather/current/?city_id=1
     
     Devuelve la observación más reciente de esa ciudad.
+
+    GET /api/weather/current/?lat=40.42&lon=-3.70
+
+    Igual, para la ciudad más cercana a esas coordenadas (p.ej. el GPS del móvil).
+
+    GET /api/weather/current/?city_ids=1,2,3
+    POST /api/weather/current/  {"city_ids": [1, 2, 3]}
+
+    Devuelve la observación más reciente de varias ciudades en una sola respuesta.
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, *args, **kwargs):
-        city_id = request.query_params.get("city_id")
+        if "city_ids" in request.query_params:
+            raw_ids = request.query_params.get("city_ids", "")
+            return self.batch_response([part for part in raw_ids.split(",") if part.strip()])
+
+        coordinates, error = parse_coordinates(request.query_params)
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        if coordinates is not None:
+            city_id = nearest_city_id(*coordinates)
+            if city_id is None:
+                return Response(
+                    {"detail": "No hay ninguna ciudad cerca de esas coordenadas"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+        else:
+            city_id = request.query_params.get("city_id")
 
         if city_id is None:
             return Response(
-                {"detail": "city_id es obligatorio"},
+                {"detail": "city_id (o lat y lon) es obligatorio"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -40,11 +139,20 @@ class CurrentWeatherView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Obtener la ciudad
-        city = get_object_or_404(City, id=city_id)
+        # Respuesta cacheada hasta que llegue una observación nueva de la ciudad
+        return cached_response(
+            request,
+            "current",
+            [city_scope(city_id)],
+            build=lambda: self.build_payload(city_id),
+        )
+
+    def build_payload(self, city_id):
+        # Obtener la ciudad junto con su última observación (una sola consulta)
+        city = get_object_or_404(City.objects.select_related("latest_observation"), id=city_id)
         
-        # Obtener la observación más reciente
-        latest_observation = city.observations.order_by("-timestamp").first()
+        # Obtener la observación más reciente; si falta el puntero se recalcula
+        latest_observation = city.latest_observation or city.refresh_latest_observation()
         
         if latest_observation is None:
             return Response(
@@ -57,105 +165,795 @@ class CurrentWeatherView(APIView):
             )
 
         # Preparar datos y serializar
-        data = {
-            "city_id": city.id,
-            "city_name": city.name,
-            "temperature": latest_observation.temperature,
-            "timestamp": latest_observation.timestamp,
-            "condition": "Parcialmente nublado",  # TODO: obtener del modelo cuando esté disponible
-        }
+        data = current_weather_data(city, latest_observation)
         
         serializer = CurrentWeatherSerializer(data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return dict(serializer.data), latest_observation.updated_at.timestamp()
+
+    def post(self, request, *args, **kwargs):
+        city_ids = request.data.get("city_ids") if isinstance(request.data, dict) else None
+        if not isinstance(city_ids, list):
+            return Response(
+                {"detail": "city_ids debe ser una lista de enteros"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.batch_response(city_ids)
+
+    def batch_response(self, raw_ids):
+        try:
+            # Sin duplicados y respetando el orden pedido
+            city_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "city_ids debe ser una lista de enteros"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not city_ids:
+            return Response(
+                {"detail": "city_ids es obligatorio"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(city_ids) > MAX_BATCH_CITY_IDS:
+            return Response(
+                {"detail": f"Máximo {MAX_BATCH_CITY_IDS} ciudades por petición"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cities = {city.id: city for city in City.with_latest_observations(city_ids)}
+
+        items = []
+        missing = []
+        for city_id in city_ids:
+            city = cities.get(city_id)
+            if city is None or city.latest_observation is None:
+                missing.append(city_id)
+            else:
+                items.append(current_weather_data(city, city.latest_observation))
+
+        serializer = CurrentWeatherSerializer(items, many=True)
+        return Response(
+            {
+                "results": serializer.data,
+                # Ciudades inexistentes o sin observaciones
+                "missing": missing,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+@dataclass
+class ForecastParams:
+    """Parámetros ya validados de los endpoints de predicción (síncrono y async)."""
+    city_id: int
+    periods: int
+    engine: str
+    variables: Optional[List[str]] = None
+
+
+def parse_forecast_params(query_params) -> Tuple[Optional[ForecastParams], Optional[str]]:
+    """Devuelve (parámetros, None) o (None, mensaje de error para un 400)."""
+    city_id = query_params.get("city_id")
+    periods = query_params.get("periods", "24")
+    engine = query_params.get("engine", "prophet")
+
+    if city_id is None:
+        return None, "city_id es obligatorio"
+
+    try:
+        city_id = int(city_id)
+        periods = int(periods)
+    except ValueError:
+        return None, "city_id y periods deben ser enteros"
+
+    if periods < 1:
+        return None, "periods debe ser mayor que 0"
+
+    if engine not in ENGINES:
+        return None, f"engine debe ser uno de: {', '.join(sorted(ENGINES))}"
+
+    variables = None
+    variables_param = query_params.get("variables")
+    if variables_param is not None:
+        # Sin duplicados y respetando el orden pedido
+        variables = list(dict.fromkeys(v.strip() for v in variables_param.split(",") if v.strip()))
+        if not variables or any(v not in FORECAST_VARIABLES for v in variables):
+            return None, f"variables debe ser una lista de: {', '.join(FORECAST_VARIABLES)}"
+
+    return ForecastParams(city_id=city_id, periods=periods, engine=engine, variables=variables), None
 
 
 class ProphetForecastView(APIView):
+    """
+    Predicción de temperatura de una ciudad.
+
+    GET /api/forecast/prophet/?city_id=1&periods=24&engine=holt_winters
+
+    engine: prophet (por defecto) o holt_winters (NumPy, milisegundos; pensado
+    para horizontes cortos).
+
+    GET /api/forecast/prophet/?city_id=1&variables=temperature,humidity,pressure
+
+    Con variables= se predicen varias series en una sola petición y la respuesta
+    trae "series": {variable: {"source", "points"}} en lugar de "points".
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        params, error = parse_forecast_params(request.query_params)
+        if error is not None:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        city_id, periods, engine = params.city_id, params.periods, params.engine
+
+        if params.variables is not None:
+            return Response(
+                {
+                    "city_id": city_id,
+                    "periods": periods,
+                    "engine": engine,
+                    "series": self.multi_variable_series(city_id, periods, engine, params.variables),
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        if engine == "prophet":
+            # Lectura indexada de lo precalculado por refresh_forecasts;
+            # si no cubre el horizonte pedido, se calcula en vivo.
+            points = get_precomputed_forecast(city_id=city_id, periods=periods)
+            source = "precomputed"
+            if points is None:
+                points = build_prophet_forecast(city_id=city_id, periods=periods)
+                source = "live"
+        else:
+            points = build_forecast(city_id=city_id, periods=periods, engine=engine)
+            source = "live"
+
+        return Response(
+            {
+                "city_id": city_id,
+                "periods": periods,
+                "engine": engine,
+                "source": source,
+                "points": points,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def multi_variable_series(city_id, periods, engine, variables):
+        series = {}
+        live_variables = list(variables)
+        # refresh_forecasts solo precalcula la temperatura
+        if engine == "prophet" and "temperature" in live_variables:
+            points = get_precomputed_forecast(city_id=city_id, periods=periods)
+            if points is not None:
+                series["temperature"] = {"source": "precomputed", "points": points}
+                live_variables.remove("temperature")
+
+        if live_variables:
+            forecasts = build_multi_variable_forecast(
+                city_id=city_id,
+                variables=live_variables,
+                periods=periods,
+                engine=engine,
+            )
+            for variable, points in forecasts.items():
+                series[variable] = {"source": "live", "points": points}
+
+        # Mismo orden que en la petición
+        return {variable: series[variable] for variable in variables}
+
+
+def conditions_scopes(city_id_param, city_name):
+    """Devuelve (city_id, ámbitos de caché) de una petición de condiciones."""
+    city_id = None
+    if city_id_param is not None:
+        try:
+            city_id = int(city_id_param)
+        except ValueError:
+            # Si no es entero, lo ignoramos y nos quedamos con city_name
+            city_id = None
+
+    scopes = []
+    if city_id is not None:
+        scopes.append(city_scope(city_id))
+    if city_name:
+        scopes.append(name_scope(city_name))
+    # Las fotos salen del catálogo: editarlo también invalida estas respuestas
+    scopes.append(PHOTO_CATALOG_SCOPE)
+    return city_id, scopes
+
+
+def conditions_city_id(city_id, city_name):
+    """
+    Id de la ciudad pedida: el indicado o, si no, el del nombre resuelto en
+    memoria con el índice de búsqueda. None si no se puede resolver.
+    """
+    if city_id is None and city_name:
+        return find_city_id(city_name)
+    return city_id
+
+
+def conditions_data(city, observation, now=None):
+    """
+    Condiciones actuales + fotos del dashboard a partir de la última observación
+    (compartido por la vista síncrona y la async). Las fotos salen del catálogo
+    en memoria, que solo consulta la BD al cargarse o tras un cambio.
+    """
+    condition = observation_condition(observation)
+    temp_c = observation.temperature
+    is_daytime = ephemeris.is_daytime(city, now or timezone.now())
+
+    # Foto emblemática según clima
+    emblem = select_emblem_photo(condition, temp_c, is_daytime, variant=city.id)
+    emblem_base_url = getattr(
+        settings,
+        "EMBLEM_PHOTO_BASE_URL",
+        "https://cdn.example.com/emblems/",
+    )
+
+    # Foto según ciudad elegida
+    city_photo = select_city_photo(
+        city_id=city.id,
+        city_name=city.name,
+        condition=condition,
+        temp_c=temp_c,
+        is_daytime=is_daytime,
+        variant=city.id,
+    )
+    city_base_url = getattr(
+        settings,
+        "CITY_PHOTO_BASE_URL",
+        "https://cdn.example.com/cities/",
+    )
+
+    return {
+        "city_id": city.id,
+        "city_name": city.name,
+        "condition": condition,
+        "temp_c": temp_c,
+        "is_daytime": is_daytime,
+        "observed_at": observation.timestamp,
+        "emblem_photo": emblem.code,
+        "emblem_photo_url": photo_url(emblem_base_url, emblem.code),
+        "city_photo": city_photo.code,
+        "city_photo_url": photo_url(city_base_url, city_photo.code),
+    }
+
+
+def conditions_payload(city, observation, now=None):
+    """
+    (data, last_modified, segundos de validez) de las condiciones para
+    cached_response. is_daytime cambia sin que llegue ninguna observación: el
+    Last-Modified no es anterior al último orto/ocaso (If-Modified-Since no
+    devuelve 304 tras él) y la entrada caduca en el siguiente.
+    """
+    now = now or timezone.now()
+    data = conditions_data(city, observation, now)
+    previous_event, next_event = ephemeris.sun_events(city, now)
+
+    last_modified = observation.updated_at
+    if previous_event is not None:
+        last_modified = max(last_modified, previous_event)
+    timeout = None
+    if next_event is not None:
+        timeout = math.ceil((next_event - now).total_seconds())
+    return data, last_modified.timestamp(), timeout
+
+
+class CurrentConditionsView(APIView):
+    """
+    Endpoint para devolver condiciones actuales + foto emblemática (clima)
+    + foto de ciudad (según ciudad elegida) para el dashboard.
+
+    GET /api/weather/conditions/?city_id=1
+    GET /api/weather/conditions/?city_name=València
+
+    La condición sale de la última observación (nubosidad, precipitación,
+    temperatura, visibilidad) y is_daytime de la posición del sol en la ciudad.
+    """
     permission_classes = [permissions.AllowAny]
 
+    def get(self, request, *args, **kwargs):
+        city_name = request.query_params.get("city_name")
+        city_id, scopes = conditions_scopes(request.query_params.get("city_id"), city_name)
+
+        return cached_response(
+            request,
+            "conditions",
+            scopes,
+            build=lambda: self.build_payload(city_id, city_name),
+            key_parts=(city_id, city_name),
+        )
+
+    def build_payload(self, city_id, city_name):
+        # Ciudad y última observación en una sola consulta
+        resolved_id = conditions_city_id(city_id, city_name)
+        city = (
+            City.objects.select_related("latest_observation").filter(id=resolved_id).first()
+            if resolved_id is not None else None
+        )
+        if city is None:
+            return Response({"detail": "Ciudad no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+        latest_observation = city.latest_observation or city.refresh_latest_observation()
+        if latest_observation is None:
+            return Response(
+                {
+                    "detail": f"No hay datos meteorológicos para la ciudad '{city.name}'",
+                    "city_id": city.id,
+                    "city_name": city.name,
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return conditions_payload(city, latest_observation)
+
+
+class ObservationBulkIngestView(APIView):
+    """
+    Ingesta en bloque de observaciones para las estaciones.
+
+    POST /api/weather/observations/bulk/?chunk_size=500
+    Cuerpo: lista JSON de observaciones o NDJSON (application/x-ndjson).
+
+    Inserta todas las filas válidas en una sola transacción y devuelve
+    los errores de las inválidas por índice, sin abortar el lote.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"detail": "Se esperaba una lista de observaciones"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_rows = getattr(settings, "OBSERVATION_BULK_MAX_ROWS", 50000)
+        if len(rows) > max_rows:
+            return Response(
+                {"detail": f"Máximo {max_rows} observaciones por petición"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        chunk_size = request.query_params.get("chunk_size")
+        if chunk_size is not None:
+            try:
+                chunk_size = int(chunk_size)
+            except ValueError:
+                return Response(
+                    {"detail": "chunk_size debe ser un entero"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        created, errors = ingest_observation_rows(rows, chunk_size=chunk_size)
+
+        data = {
+            "created": created,
+            "failed": len(errors),
+            "errors": errors,
+        }
+        # Solo es un 400 si no se pudo guardar ninguna fila
+        response_status = status.HTTP_201_CREATED if created or not errors else status.HTTP_400_BAD_REQUEST
+        return Response(data, status=response_status)
+
+
+def parse_datetime_param(value):
+    """Acepta fecha (YYYY-MM-DD) o fecha-hora ISO 8601; None si no es válida."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is None:
+                return None
+            parsed = datetime.combine(date, dt_time.min)
+    except ValueError:
+        # Bien formada pero inexistente (p.ej. 2025-02-30)
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+class WeatherHistoryView(APIView):
+    """
+    Serie histórica agregada de una ciudad, leída de los agregados precalculados.
+
+    GET /api/weather/history/?city_id=1&resolution=day&from=2025-01-01&to=2025-12-31
+
+    resolution: hour | day | month (por defecto day). Cada punto trae
+    min/max/media de temperatura, precipitación total y medias de viento,
+    humedad y presión del tramo.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    # Rango por defecto si no se indica `from`
+    DEFAULT_SPAN = {
+        ObservationRollup.RESOLUTION_HOUR: timedelta(days=7),
+        ObservationRollup.RESOLUTION_DAY: timedelta(days=365),
+        ObservationRollup.RESOLUTION_MONTH: timedelta(days=365 * 5),
+    }
+    MAX_POINTS = 10000
+
     def get(self, request, *args, **kwargs):
         city_id = request.query_params.get("city_id")
-        periods = request.query_params.get("periods", "24")
+        resolution = request.query_params.get("resolution", ObservationRollup.RESOLUTION_DAY)
 
         if city_id is None:
             return Response(
                 {"detail": "city_id es obligatorio"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
         try:
             city_id = int(city_id)
-            periods = int(periods)
         except ValueError:
             return Response(
-                {"detail": "city_id y periods deben ser enteros"},
+                {"detail": "city_id debe ser un entero"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if resolution not in self.DEFAULT_SPAN:
+            return Response(
+                {"detail": "resolution debe ser hour, day o month"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        raw_from = request.query_params.get("from")
+        raw_to = request.query_params.get("to")
+        date_from = parse_datetime_param(raw_from) if raw_from else None
+        date_to = parse_datetime_param(raw_to) if raw_to else timezone.now()
+        if date_to is None or (raw_from and date_from is None):
+            return Response(
+                {"detail": "from y to deben ser fechas ISO 8601"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if date_from is None:
+            date_from = date_to - self.DEFAULT_SPAN[resolution]
+
+        city = get_object_or_404(City, id=city_id)
+
+        rows = (
+            ObservationRollup.objects
+            .filter(
+                city_id=city.id,
+                resolution=resolution,
+                bucket_start__gte=date_from,
+                bucket_start__lte=date_to,
+            )
+            .order_by("bucket_start")
+            .values_list(
+                "bucket_start", "count",
+                "temperature_min", "temperature_max", "temperature_sum",
+                "humidity_sum", "pressure_sum", "wind_speed_sum",
+                "wind_gust_max", "precipitation_sum",
+            )[:self.MAX_POINTS]
+        )
 
-        points = build_prophet_forecast(city_id=city_id, periods=periods)
+        points = [
+            {
+                "bucket": bucket.isoformat(),
+                "count": count,
+                "temperature_min": t_min,
+                "temperature_max": t_max,
+                "temperature_avg": round(t_sum / count, 2),
+                "humidity_avg": round(h_sum / count, 2),
+                "pressure_avg": round(p_sum / count, 2),
+                "wind_speed_avg": round(w_sum / count, 2),
+                "wind_gust_max": g_max,
+                "precipitation_total": round(pr_sum, 2),
+            }
+            for bucket, count, t_min, t_max, t_sum, h_sum, p_sum, w_sum, g_max, pr_sum in rows
+            if count
+        ]
 
         return Response(
             {
-                "city_id": city_id,
-                "periods": periods,
+                "city_id": city.id,
+                "city_name": city.name,
+                "resolution": resolution,
+                "from": date_from.isoformat(),
+                "to": date_to.isoformat(),
                 "points": points,
             },
             status=status.HTTP_200_OK,
         )
 
 
-class CurrentConditionsView(APIView):
+class ObservationExportView(APIView):
     """
-    Endpoint para devolver condiciones actuales + foto emblemática (clima)
-    + foto de ciudad (según ciudad elegida) para el dashboard.
+    Exportación completa de observaciones para análisis offline.
+
+    GET /api/weather/observations/export/?city_id=1&fmt=csv&from=2024-01-01&to=2024-12-31
+
+    fmt: csv | ndjson | parquet (streaming, memoria constante) o json
+    (paginado con cursor: ?fmt=json&limit=1000&cursor=<next_cursor>).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    STREAM_FORMATS = {
+        "csv": (export.csv_stream, "text/csv", "csv"),
+        "ndjson": (export.ndjson_stream, "application/x-ndjson", "ndjson"),
+        "parquet": (export.parquet_stream, "application/vnd.apache.parquet", "parquet"),
+    }
+    CHUNK_SIZE = 2000
+    DEFAULT_PAGE_SIZE = 1000
+    MAX_PAGE_SIZE = 10000
+
+    def get(self, request, *args, **kwargs):
+        # "fmt" y no "format": DRF reserva ?format= para elegir renderer
+        fmt = request.query_params.get("fmt", "csv")
+        if fmt != "json" and fmt not in self.STREAM_FORMATS:
+            return Response(
+                {"detail": "fmt debe ser csv, ndjson, parquet o json"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        city_id = request.query_params.get("city_id")
+        if city_id is not None:
+            try:
+                city_id = int(city_id)
+            except ValueError:
+                return Response(
+                    {"detail": "city_id debe ser un entero"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        raw_from = request.query_params.get("from")
+        raw_to = request.query_params.get("to")
+        date_from = parse_datetime_param(raw_from) if raw_from else None
+        date_to = parse_datetime_param(raw_to) if raw_to else None
+        if (raw_from and date_from is None) or (raw_to and date_to is None):
+            return Response(
+                {"detail": "from y to deben ser fechas ISO 8601"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = export.export_queryset(city_id=city_id, date_from=date_from, date_to=date_to)
+
+        if fmt == "json":
+            return self.json_page(request, qs)
+
+        if fmt == "parquet" and not export.parquet_available():
+            return Response(
+                {"detail": "La exportación Parquet requiere el paquete pyarrow"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        stream, content_type, extension = self.STREAM_FORMATS[fmt]
+        response = StreamingHttpResponse(stream(qs, self.CHUNK_SIZE), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="observations.{extension}"'
+        return response
+
+    def json_page(self, request, qs):
+        try:
+            limit = int(request.query_params.get("limit", self.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {"detail": "limit debe ser un entero"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+
+        after = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            after = export.decode_cursor(cursor)
+            if after is None:
+                return Response(
+                    {"detail": "cursor no válido"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        results, next_cursor = export.keyset_page(qs, after, limit)
+        return Response(
+            {
+                "results": results,
+                "next_cursor": next_cursor,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def parse_interpolation_variables(raw: Optional[str]) -> Tuple[List[str], Optional[str]]:
+    if not raw:
+        return list(INTERPOLATION_VARIABLES), None
+    variables = list(dict.fromkeys(part.strip() for part in raw.split(",") if part.strip()))
+    unknown = [variable for variable in variables if variable not in INTERPOLATION_VARIABLES]
+    if unknown or not variables:
+        return [], f"variables admitidas: {', '.join(INTERPOLATION_VARIABLES)}"
+    return variables, None
+
+
+class InterpolationView(APIView):
+    """
+    Tiempo actual estimado en un punto entre ciudades (IDW sobre las ciudades
+    más cercanas, ver interpolation.py).
+
+    GET /api/weather/interpolate/?lat=40.0&lon=-3.5&alt=650&variables=temperature,humidity
+
+    alt (metros, opcional) corrige la temperatura de cada ciudad vecina por su
+    diferencia de altitud antes de promediar.
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, *args, **kwargs):
-        city_id_param = request.query_params.get("city_id")
-        city_name = request.query_params.get("city_name")
+        coordinates, error = parse_coordinates(request.query_params)
+        if coordinates is None:
+            return Response({"detail": error or "lat y lon son obligatorios"}, status=status.HTTP_400_BAD_REQUEST)
+
+        variables, error = parse_interpolation_variables(request.query_params.get("variables"))
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
 
-        city_id = None
-        if city_id_param is not None:
+        altitude = request.query_params.get("alt")
+        if altitude is not None:
             try:
-                city_id = int(city_id_param)
+                altitude = float(altitude)
             except ValueError:
-                # Si no es entero, lo ignoramos y nos quedamos con city_name
-                city_id = None
-
-        # TODO: sustituir estos placeholders con datos reales
-        # Por ahora, dejamos valores fijos para probar la lógica.
-        condition = "clear"   # p.ej. "rain", "snow", "clouds", "clear"...
-        temp_c = 18.0         # temperatura actual en ºC
-        is_daytime = True     # True si es de día, False si es de noche
-
-        # Foto emblemática según clima
-        emblem = select_emblem_photo(condition, temp_c, is_daytime)
-        emblem_base_url = getattr(
-            settings,
-            "EMBLEM_PHOTO_BASE_URL",
-            "https://cdn.example.com/emblems/",
+                return Response({"detail": "alt debe ser un número"}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot = get_snapshot()
+        result = interpolate(
+            snapshot,
+            [coordinates[0]],
+            [coordinates[1]],
+            variables,
+            altitudes=None if altitude is None else [altitude],
         )
-        emblem_photo_url = emblem_base_url.rstrip("/") + "/" + emblem.code
-
-        # Foto según ciudad elegida
-        city_photo = select_city_photo(city_id=city_id, city_name=city_name)
-        city_base_url = getattr(
-            settings,
-            "CITY_PHOTO_BASE_URL",
-            "https://cdn.example.com/cities/",
+        if result is None:
+            return Response({"detail": "No hay observaciones para interpolar"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(
+            {
+                "lat": coordinates[0],
+                "lon": coordinates[1],
+                "altitude": altitude,
+                "values": {variable: to_json_values(result.values[variable])[0] for variable in variables},
+                "neighbours": [
+                    {"city_id": int(snapshot.city_ids[i]), "distance_km": round(float(d), 2)}
+                    for i, d in zip(result.neighbours[0], result.distances_km[0])
+                ],
+                "as_of": snapshot.built_at.isoformat(),
+            },
+            status=status.HTTP_200_OK,
         )
-        city_photo_url = city_base_url.rstrip("/") + "/" + city_photo.code
 
-        data = {
-            "city_id": city_id,
-            "city_name": city_name,
-            "condition": condition,
-            "temp_c": temp_c,
-            "is_daytime": is_daytime,
-            "emblem_photo": emblem.code,
-            "emblem_photo_url": emblem_photo_url,
-            "city_photo": city_photo.code,
-            "city_photo_url": city_photo_url,
-        }
 
-        return Response(data, status=status.HTTP_200_OK)
+class InterpolationGridView(APIView):
+    """
+    Campo interpolado sobre una rejilla, para capas de mapa en una sola petición.
+
+    GET /api/weather/interpolate/grid/?bbox=-9.5,36,3.5,44&step=0.1&variable=temperature
+    GET /api/weather/interpolate/grid/?bbox=-9.5,36,3.5,44&rows=80&cols=130
+
+    bbox = lon_min,lat_min,lon_max,lat_max (el orden de Leaflet/GeoJSON). values
+    es una lista de filas de norte a sur con el valor en el centro de cada celda.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    MAX_CELLS = 100_000
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            bbox = tuple(float(part) for part in params.get("bbox", "").split(","))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4 or not (-180 <= bbox[0] < bbox[2] <= 180 and -90 <= bbox[1] < bbox[3] <= 90):
+            return Response(
+                {"detail": "bbox debe ser lon_min,lat_min,lon_max,lat_max"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            if "step" in params:
+                step = float(params["step"])
+                if step <= 0:
+                    raise ValueError
+                rows = max(1, round((bbox[3] - bbox[1]) / step))
+                cols = max(1, round((bbox[2] - bbox[0]) / step))
+            else:
+                rows = int(params.get("rows", 50))
+                cols = int(params.get("cols", 50))
+                if rows < 1 or cols < 1:
+                    raise ValueError
+        except ValueError:
+            return Response(
+                {"detail": "step debe ser un número positivo y rows/cols enteros positivos"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if rows * cols > self.MAX_CELLS:
+            return Response(
+                {"detail": f"Máximo {self.MAX_CELLS} celdas por rejilla"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        variable = params.get("variable", "temperature")
+        if variable not in INTERPOLATION_VARIABLES:
+            return Response(
+                {"detail": f"variable debe ser una de: {', '.join(INTERPOLATION_VARIABLES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        snapshot = get_snapshot()
+        lats, lons = grid_axes(bbox, rows, cols)
+        grid_lats, grid_lons = np.meshgrid(lats, lons, indexing="ij")
+        result = interpolate(snapshot, grid_lats.ravel(), grid_lons.ravel(), [variable])
+        if result is None:
+            return Response({"detail": "No hay observaciones para interpolar"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(
+            {
+                "bbox": list(bbox),
+                "variable": variable,
+                "rows": rows,
+                "cols": cols,
+                "lats": to_json_values(lats, 5),
+                "lons": to_json_values(lons, 5),
+                "values": to_json_values(result.values[variable].reshape(rows, cols)),
+                "as_of": snapshot.built_at.isoformat(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class CitySearchView(APIView):
+    """
+    Autocompletado de ciudades por prefijo, sin distinguir mayúsculas ni tildes.
+
+    GET /api/cities/search/?q=valen&limit=10
+
+    "valen" encuentra "València" y "coru" encuentra "A Coruña" (ver search.py).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    MAX_LIMIT = 50
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "q es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.MAX_LIMIT:
+            return Response(
+                {"detail": f"limit debe estar entre 1 y {self.MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "query": query,
+                "results": [
+                    {"id": city.id, "name": city.name, "latitud": city.latitud, "longitud": city.longitud}
+                    for city in search_cities(query, limit)
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MetricsView(APIView):
+    """
+    Métricas del proceso en formato de texto de Prometheus.
+
+    GET /api/metrics/
+
+    Si METRICS_TOKEN está configurado hay que enviar "Authorization: Bearer <token>"
+    (el scraper de Prometheus lo admite con bearer_token).
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token and request.META.get("HTTP_AUTHORIZATION", "") != f"Bearer {token}":
+            return Response({"detail": "Token de métricas no válido"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        return HttpResponse(
+            metrics.render_metrics(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )